@@ -1,6 +1,5 @@
 # import required modules to get application setup
 import sys
-from pathlib import Path
 
 # needed for access to QtCore functions
 from PyQt6.QtWidgets import QApplication
@@ -11,19 +10,15 @@ from src.views import MainWindow
         
 # main function to run the application
 if __name__ == "__main__":
-    # Check if database exists, if not initialize it
-    root_dir = Path(__file__).parent
-    db_file = root_dir / "taxi_booking.db"
-    
-    if not db_file.exists():
-        print("Database not found. Initializing database...")
-        try:
-            from scripts.init_db import init_database
-            init_database()
-            print("Database initialized successfully!\n")
-        except Exception as e:
-            print(f"Error initializing database: {e}")
-            sys.exit(1)
+    # Make sure the database exists and its schema is current.
+    # This is a single PRAGMA query when nothing needs to be done.
+    try:
+        from scripts.init_db import ensure_schema
+        if ensure_schema():
+            print("Database schema initialized successfully!\n")
+    except Exception as e:
+        print(f"Error initializing database: {e}")
+        sys.exit(1)
     
     # create a new application
     app = QApplication(sys.argv)
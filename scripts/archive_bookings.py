@@ -0,0 +1,49 @@
+"""
+Move completed bookings older than N days into the archive database.
+Run periodically (e.g. nightly) to keep the live bookings table small.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+from src.archive import archive_completed_bookings
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Archive old completed bookings")
+    parser.add_argument(
+        "--db-name",
+        type=str,
+        default="taxi_booking.db",
+        help="Name of the database file (default: taxi_booking.db)"
+    )
+    parser.add_argument(
+        "--archive-name",
+        type=str,
+        default="taxi_booking_archive.db",
+        help="Name of the archive database file (default: taxi_booking_archive.db)"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=90,
+        help="Archive completed bookings older than this many days (default: 90)"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="Bookings moved per transaction")
+    
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    with Database(args.db_name) as db:
+        db.attach_archive(args.archive_name)
+        archived = archive_completed_bookings(db, args.days, args.batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Archived {archived} bookings in {elapsed:.2f}s")
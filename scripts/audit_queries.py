@@ -0,0 +1,100 @@
+"""
+Audit the query plans of the application's data access paths.
+
+Runs the read paths used by the windows against a database while a
+QueryPlanAuditor records every statement, then reports full scans and
+temporary sort B-trees on large tables. Exits with status 1 if any issue
+is found, so it can run in CI.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+from src.query_audit import QueryPlanAuditor
+from src.read_models import BookingReadModel, LastRidesModel
+from src.booking_stats import BookingStats
+from src.schedule_index import DriverScheduleIndex
+from src.phone_lookup import find_customers_by_phone
+from src.dispatch_queue import DispatchQueue
+
+
+# Statements that scan on purpose (in-memory index builds)
+ALLOWED_SCANS = (
+    r"^SELECT id, driver_id, CAST\(strftime",
+)
+
+
+def exercise(db: Database):
+    """
+    Issue the statements the application uses for its views.
+    
+    Args:
+        db: Database to run against
+    """
+    model = BookingReadModel(db)
+    model.fetch_page()
+    model.fetch_page(status="pending")
+    
+    stats = BookingStats(db)
+    stats.driver_summary(1)
+    stats.driver_summary(1, start_day="2000-01-01")
+    stats.car_summary(1)
+    stats.daily_by_driver(start_day="2000-01-01", end_day="2000-01-07")
+    
+    db.read_bookings(start="2000-01-01", end="2000-01-02")
+    
+    last_rides = LastRidesModel(db, listen=False)
+    last_rides.for_drivers([1, 2, 3])
+    last_rides.for_cars([1, 2, 3])
+    
+    DriverScheduleIndex(db, listen=False)
+    
+    find_customers_by_phone(db, "(416) 555-0123")
+    
+    DispatchQueue(db).depth()
+
+
+def audit(db_name: str = "taxi_booking.db", large_table_rows: int = 1000) -> bool:
+    """
+    Audit the application's statements against a database.
+    
+    Args:
+        db_name: Name of the database file
+        large_table_rows: Row count from which a table counts as large
+        
+    Returns:
+        True if no issue was found
+    """
+    with Database(db_name) as db:
+        with QueryPlanAuditor(db, large_table_rows, allow=ALLOWED_SCANS) as auditor:
+            exercise(db)
+        issues = auditor.audit()
+        print(auditor.report(issues))
+    return not issues
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Audit query plans for full table scans")
+    parser.add_argument(
+        "--db-name",
+        type=str,
+        default="taxi_booking.db",
+        help="Name of the database file (default: taxi_booking.db)"
+    )
+    parser.add_argument(
+        "--large-table-rows",
+        type=int,
+        default=1000,
+        help="Tables with at least this many rows count as large (default: 1000)"
+    )
+    
+    args = parser.parse_args()
+    
+    sys.exit(0 if audit(args.db_name, args.large_table_rows) else 1)
@@ -0,0 +1,68 @@
+"""
+Online backup of the taxi booking database.
+
+Uses the SQLite backup API, copying a few pages at a time with short
+pauses, so it is safe to run while the application is writing.
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+
+
+def backup_database(
+    db_name: str = "taxi_booking.db",
+    output: str = "",
+    pages: int = 64,
+    sleep: float = 0.005
+) -> Path:
+    """
+    Back up the database to a file.
+    
+    Args:
+        db_name: Name of the database file
+        output: Destination file (default: backups/<name>-<timestamp>.db)
+        pages: Pages copied per step
+        sleep: Seconds to pause between steps
+        
+    Returns:
+        Path of the backup file
+    """
+    if output:
+        target = Path(output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        target = parent_dir / "backups" / f"{Path(db_name).stem}-{stamp}.db"
+    
+    with Database(db_name) as db:
+        db.backup_to(target, pages=pages, sleep=sleep)
+    return target
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Back up the taxi booking database")
+    parser.add_argument(
+        "--db-name",
+        type=str,
+        default="taxi_booking.db",
+        help="Name of the database file (default: taxi_booking.db)"
+    )
+    parser.add_argument("--output", type=str, default="", help="Backup file (default: backups/<name>-<timestamp>.db)")
+    parser.add_argument("--pages", type=int, default=64, help="Pages copied per step (default: 64)")
+    parser.add_argument("--sleep", type=float, default=0.005, help="Seconds to pause between steps (default: 0.005)")
+    
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    target = backup_database(args.db_name, args.output, args.pages, args.sleep)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Backed up to {target} in {elapsed:.2f}s")
@@ -0,0 +1,73 @@
+"""
+Find customers sharing a phone number and merge them.
+
+Duplicates are detected on the normalized phone number, so "416-555-0123"
+and "+1 (416) 555 0123" count as the same caller. The oldest customer of
+each group is kept; bookings of the others are moved to it.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+from src.phone_lookup import find_duplicate_customers, merge_customers, phone_sql_mismatches
+
+
+def dedupe_customers(db_name: str = "taxi_booking.db", dry_run: bool = False) -> int:
+    """
+    Merge every group of customers sharing a normalized phone number.
+    
+    Args:
+        db_name: Name of the database file
+        dry_run: Only report the groups, change nothing
+        
+    Returns:
+        Number of customers merged away (or that would be)
+        
+    Raises:
+        ValueError: If the Python and SQL phone normalizations disagree
+    """
+    merged = 0
+    with Database(db_name) as db:
+        # Groups come from the trigger-maintained column, lookups from Python
+        mismatches = phone_sql_mismatches(db)
+        if mismatches:
+            raise ValueError(f"normalize_phone() and phone_sql() disagree on {mismatches!r}")
+        groups = find_duplicate_customers(db)
+        for customer_ids in groups:
+            keep_id, duplicate_ids = customer_ids[0], customer_ids[1:]
+            keep = db.read_one("customers", keep_id)
+            print(f"  {keep['phone_normalized']}: keep #{keep_id}, merge {duplicate_ids}")
+            if dry_run:
+                merged += len(duplicate_ids)
+            else:
+                merged += merge_customers(db, keep_id, duplicate_ids)
+    return merged
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Merge customers sharing a phone number")
+    parser.add_argument(
+        "--db-name",
+        type=str,
+        default="taxi_booking.db",
+        help="Name of the database file (default: taxi_booking.db)"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only list duplicate groups")
+    
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    merged = dedupe_customers(args.db_name, args.dry_run)
+    elapsed = time.perf_counter() - start
+    if args.dry_run:
+        print(f"✓ {merged} duplicate customers found in {elapsed:.2f}s (dry run)")
+    else:
+        print(f"✓ Merged {merged} duplicate customers in {elapsed:.2f}s")
@@ -0,0 +1,175 @@
+"""
+Export bookings to CSV or JSON Lines for hand-off to finance.
+
+Rows are streamed from the database in cursor batches and written
+incrementally, so memory use does not depend on the number of bookings.
+Files ending in .gz are gzip-compressed.
+"""
+
+import csv
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, TextIO
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(path: Path) -> str:
+    """
+    Detect the file format from its extension (ignoring a trailing .gz).
+
+    Args:
+        path: File path
+
+    Returns:
+        "csv" or "jsonl"
+    """
+    suffixes = [suffix.lower() for suffix in path.suffixes]
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes.pop()
+    if suffixes and suffixes[-1] in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffixes and suffixes[-1] == ".csv":
+        return "csv"
+    raise ValueError(f"Cannot detect format of '{path}', use --format")
+
+
+def open_text(path: Path, mode: str) -> TextIO:
+    """
+    Open a text file for streaming, transparently handling .gz files.
+
+    Args:
+        path: File path
+        mode: "r" or "w"
+
+    Returns:
+        Text file object
+    """
+    if path.suffix.lower() == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Return the peak resident set size of this process in MB, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def export_bookings(
+    output_path: str,
+    db_name: str = "taxi_booking.db",
+    file_format: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    batch_size: int = 5000
+) -> Dict[str, Any]:
+    """
+    Stream bookings into a CSV or JSONL file.
+
+    Args:
+        output_path: Destination file (add .gz to compress)
+        db_name: Name of the database file
+        file_format: "csv" or "jsonl" (detected from the extension if None)
+        since: Optional lower bound on booking_date, inclusive
+        until: Optional upper bound on booking_date, exclusive
+        batch_size: Number of rows fetched per cursor batch
+
+    Returns:
+        Dictionary with rows, seconds and rows_per_second
+    """
+    path = Path(output_path)
+    file_format = file_format or detect_format(path)
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+    query = "SELECT * FROM bookings"
+    clauses = []
+    params = []
+    if since is not None:
+        clauses.append("booking_date >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("booking_date < ?")
+        params.append(until)
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY id"
+
+    start = time.perf_counter()
+    rows = 0
+
+    with Database(db_name) as db, open_text(path, "w") as output:
+        writer = None
+        if file_format == "csv":
+            # Written up front so an empty export still has its header
+            writer = csv.writer(output)
+            writer.writerow(db.table_columns("bookings"))
+        for batch in db.iter_batches(query, tuple(params), batch_size):
+            if writer is not None:
+                writer.writerows(tuple(row) for row in batch)
+            else:
+                output.writelines(
+                    json.dumps(dict(row), ensure_ascii=False) + "\n" for row in batch
+                )
+            rows += len(batch)
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds > 0 else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export bookings to CSV or JSONL")
+    parser.add_argument("output", help="Output file (.csv, .jsonl, optionally .gz)")
+    parser.add_argument(
+        "--db-name",
+        type=str,
+        default="taxi_booking.db",
+        help="Name of the database file (default: taxi_booking.db)"
+    )
+    parser.add_argument("--format", choices=FORMATS, help="Output format (default: from extension)")
+    parser.add_argument("--since", help="Only bookings on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Only bookings before this date (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per cursor batch")
+
+    args = parser.parse_args()
+
+    result = export_bookings(
+        args.output,
+        db_name=args.db_name,
+        file_format=args.format,
+        since=args.since,
+        until=args.until,
+        batch_size=args.batch_size,
+    )
+    print(
+        f"✓ Exported {result['rows']} bookings in {result['seconds']:.2f}s "
+        f"({result['rows_per_second']:.0f} rows/s)"
+    )
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"  Peak RSS: {rss:.1f} MB")
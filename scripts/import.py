@@ -0,0 +1,229 @@
+"""
+Bulk import bookings from CSV or JSON Lines files (e.g. partner systems).
+
+Records are parsed incrementally and inserted with executemany in large
+chunks, one transaction per chunk. The number of records committed is
+stored in import_checkpoints within the same transaction, so an
+interrupted import resumes exactly where it stopped. Checkpoints carry a
+fingerprint of the file's contents, so a new file dropped at the same
+path starts from the beginning while a copy of a half-imported file
+resumes.
+Files ending in .gz are read as gzip-compressed.
+"""
+
+import csv
+import hashlib
+import json
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+from scripts.export import FORMATS, detect_format, open_text, peak_rss_mb
+
+
+# Columns accepted from import files; ids are assigned by this database
+IMPORT_COLUMNS = (
+    "driver_id",
+    "customer_id",
+    "pickup_location",
+    "dropoff_location",
+    "pickup_latitude",
+    "pickup_longitude",
+    "dropoff_latitude",
+    "dropoff_longitude",
+    "booking_date",
+    "status",
+    "fare_amount",
+    "distance_km",
+    "duration_minutes",
+    "rating",
+    "notes",
+)
+
+
+def iter_records(path: Path, file_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Parse records from a CSV or JSONL file one at a time.
+
+    Args:
+        path: Input file
+        file_format: "csv" or "jsonl"
+
+    Yields:
+        One dictionary per record
+    """
+    with open_text(path, "r") as source:
+        if file_format == "csv":
+            for record in csv.DictReader(source):
+                # CSV has no NULL, treat empty fields as missing
+                yield {key: value for key, value in record.items() if value != ""}
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _to_params(record: Dict[str, Any], columns: Tuple[str, ...]) -> Tuple:
+    """Order a record's values to match the INSERT column list."""
+    return tuple(record.get(column) for column in columns)
+
+
+# Bytes hashed from each end of a file for its fingerprint
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def file_fingerprint(path: Path) -> str:
+    """
+    Identify a file's contents cheaply: its size and a hash of its first
+    and last bytes.
+
+    Timestamps and the path are left out, so a copied, touched or
+    re-downloaded file keeps its fingerprint (and its checkpoint).
+
+    Args:
+        path: File to identify
+
+    Returns:
+        Fingerprint string
+    """
+    size = path.stat().st_size
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        digest.update(source.read(FINGERPRINT_BYTES))
+        if size > 2 * FINGERPRINT_BYTES:
+            source.seek(-FINGERPRINT_BYTES, 2)
+        digest.update(source.read())
+    return f"{size}:{digest.hexdigest()}"
+
+
+def import_bookings(
+    input_path: str,
+    db_name: str = "taxi_booking.db",
+    file_format: Optional[str] = None,
+    chunk_size: int = 10000,
+    restart: bool = False,
+    progress: bool = False
+) -> Dict[str, Any]:
+    """
+    Import bookings from a file, resuming from the last checkpoint.
+
+    Args:
+        input_path: Source file (.csv, .jsonl, optionally .gz)
+        db_name: Name of the database file
+        file_format: "csv" or "jsonl" (detected from the extension if None)
+        chunk_size: Records per executemany call and transaction
+        restart: Ignore any existing checkpoint and import from the start
+        progress: Print throughput after every chunk
+
+    Returns:
+        Dictionary with rows (imported now), skipped (already imported),
+        seconds and rows_per_second
+    """
+    path = Path(input_path)
+    file_format = file_format or detect_format(path)
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+    source_key = str(path.resolve())
+    fingerprint = file_fingerprint(path)
+    columns = IMPORT_COLUMNS
+    query = (
+        f"INSERT INTO bookings ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+    checkpoint_query = """
+        INSERT INTO import_checkpoints (source, fingerprint, rows_done, completed, updated_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (source) DO UPDATE SET
+            fingerprint = excluded.fingerprint,
+            rows_done = excluded.rows_done,
+            completed = excluded.completed,
+            updated_at = excluded.updated_at
+    """
+
+    start = time.perf_counter()
+    imported = 0
+
+    with Database(db_name) as db:
+        checkpoint = None
+        if not restart:
+            # Progress follows the file's contents, whatever path it was
+            # imported from (a different file at this path starts over)
+            checkpoint = db.execute(
+                "SELECT rows_done, completed FROM import_checkpoints WHERE fingerprint = ? "
+                "ORDER BY completed DESC, rows_done DESC LIMIT 1",
+                (fingerprint,)
+            ).fetchone()
+        if checkpoint and checkpoint["completed"]:
+            return {"rows": 0, "skipped": checkpoint["rows_done"], "seconds": 0.0, "rows_per_second": 0.0}
+        skipped = checkpoint["rows_done"] if checkpoint else 0
+
+        records = islice(iter_records(path, file_format), skipped, None)
+        rows_done = skipped
+        while True:
+            chunk: List[Tuple] = [_to_params(record, columns) for record in islice(records, chunk_size)]
+            if not chunk:
+                break
+
+            with db.transaction():
+                db.executemany(query, chunk)
+                rows_done += len(chunk)
+                db.execute(checkpoint_query, (source_key, fingerprint, rows_done, 0))
+            imported += len(chunk)
+
+            if progress:
+                elapsed = time.perf_counter() - start
+                print(f"  {rows_done} records committed ({imported / elapsed:.0f} rows/s)")
+
+        db.execute(checkpoint_query, (source_key, fingerprint, rows_done, 1))
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": imported,
+        "skipped": skipped,
+        "seconds": seconds,
+        "rows_per_second": imported / seconds if seconds > 0 else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import bookings from CSV or JSONL")
+    parser.add_argument("input", help="Input file (.csv, .jsonl, optionally .gz)")
+    parser.add_argument(
+        "--db-name",
+        type=str,
+        default="taxi_booking.db",
+        help="Name of the database file (default: taxi_booking.db)"
+    )
+    parser.add_argument("--format", choices=FORMATS, help="Input format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Records per transaction")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+
+    args = parser.parse_args()
+
+    result = import_bookings(
+        args.input,
+        db_name=args.db_name,
+        file_format=args.format,
+        chunk_size=args.chunk_size,
+        restart=args.restart,
+        progress=True,
+    )
+    if result["skipped"]:
+        print(f"  Resumed after {result['skipped']} previously imported records")
+    print(
+        f"✓ Imported {result['rows']} bookings in {result['seconds']:.2f}s "
+        f"({result['rows_per_second']:.0f} rows/s)"
+    )
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"  Peak RSS: {rss:.1f} MB")
@@ -1,9 +1,14 @@
 """
 Database initialization script for the student taxi booking application.
 Creates all necessary tables for bookings, drivers, customers, and cars.
+
+The whole schema is applied as a single script inside one transaction and
+a checksum of it is stored in the database (``PRAGMA user_version``), so
+startup only needs one cheap query to know whether any work is required.
 """
 
 import sys
+import zlib
 from pathlib import Path
 
 # Add parent directory to path to import src modules
@@ -11,6 +16,406 @@ parent_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_dir))
 
 from src.database import Database
+from src.booking_stats import BOOKING_STATS_SELECT, STATS_COLUMNS
+from src.phone_lookup import phone_sql
+from src.sync import changelog_sql
+
+
+def _booking_car(row: str) -> str:
+    """SQL for a booking's car: its own car_id, else its driver's current car."""
+    return (
+        f"COALESCE({row}.car_id, "
+        f"(SELECT car_id FROM drivers WHERE id = {row}.driver_id), 0)"
+    )
+
+
+def _stats_day(row: str) -> str:
+    """
+    SQL for a booking's summary day. Dates SQLite cannot parse count under
+    '' instead of failing the booking write (see BOOKING_STATS_SELECT).
+    """
+    return f"COALESCE(date({row}.booking_date), '')"
+
+
+def _stats_subtract(row: str) -> str:
+    """Trigger statements removing a booking from booking_daily_stats."""
+    car = _booking_car(row)
+    return f"""    UPDATE booking_daily_stats SET
+        rides = rides - 1,
+        fare_total = fare_total - COALESCE({row}.fare_amount, 0),
+        distance_total = distance_total - COALESCE({row}.distance_km, 0),
+        rating_total = rating_total - COALESCE({row}.rating, 0),
+        rating_count = rating_count - ({row}.rating IS NOT NULL)
+    WHERE day = {_stats_day(row)}
+      AND driver_id = {row}.driver_id
+      AND car_id = {car}
+      AND status = COALESCE({row}.status, 'pending');
+    DELETE FROM booking_daily_stats
+    WHERE day = {_stats_day(row)}
+      AND driver_id = {row}.driver_id
+      AND car_id = {car}
+      AND status = COALESCE({row}.status, 'pending')
+      AND rides <= 0;"""
+
+
+# Car of an updated booking: the new driver's car if the driver changed
+# and car_id was not set by the same statement
+_NEW_CAR = (
+    "CASE WHEN NEW.driver_id IS NOT OLD.driver_id AND NEW.car_id IS OLD.car_id "
+    "THEN COALESCE((SELECT car_id FROM drivers WHERE id = NEW.driver_id), 0) "
+    f"ELSE {_booking_car('NEW')} END"
+)
+
+
+# Every statement must be idempotent (IF NOT EXISTS) so the script can be
+# re-applied to an existing database whenever the checksum changes.
+SCHEMA_SQL = f"""
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    phone_normalized TEXT,
+    email TEXT,
+    address TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS drivers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    license_number TEXT NOT NULL UNIQUE,
+    phone TEXT NOT NULL,
+    email TEXT,
+    car_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (car_id) REFERENCES cars(id)
+);
+
+CREATE TABLE IF NOT EXISTS cars (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    make TEXT NOT NULL,
+    model TEXT NOT NULL,
+    year INTEGER,
+    license_plate TEXT NOT NULL UNIQUE,
+    color TEXT,
+    driver_id INTEGER,
+    average_rating REAL DEFAULT 0.0,
+    total_rides INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (driver_id) REFERENCES drivers(id)
+);
+
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    driver_id INTEGER NOT NULL,
+    customer_id INTEGER NOT NULL,
+    pickup_location TEXT NOT NULL,
+    dropoff_location TEXT NOT NULL,
+    pickup_latitude REAL,
+    pickup_longitude REAL,
+    dropoff_latitude REAL,
+    dropoff_longitude REAL,
+    car_id INTEGER,
+    booking_date TIMESTAMP NOT NULL,
+    status TEXT DEFAULT 'pending',
+    fare_amount REAL,
+    distance_km REAL,
+    duration_minutes INTEGER,
+    rating INTEGER,
+    notes TEXT,
+    claimed_by TEXT,
+    lease_expires_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (driver_id) REFERENCES drivers(id),
+    FOREIGN KEY (customer_id) REFERENCES customers(id)
+);
+
+-- Junction table for bookings with multiple customers
+CREATE TABLE IF NOT EXISTS booking_customers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    booking_id INTEGER NOT NULL,
+    customer_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (booking_id) REFERENCES bookings(id) ON DELETE CASCADE,
+    FOREIGN KEY (customer_id) REFERENCES customers(id),
+    UNIQUE(booking_id, customer_id)
+);
+
+-- Indexes for better query performance
+-- (driver_id, booking_date) also serves per-driver "last rides" in date order
+DROP INDEX IF EXISTS idx_bookings_driver_id;
+CREATE INDEX IF NOT EXISTS idx_bookings_driver_date ON bookings(driver_id, booking_date);
+CREATE INDEX IF NOT EXISTS idx_bookings_car_date ON bookings(car_id, booking_date);
+CREATE INDEX IF NOT EXISTS idx_bookings_customer_id ON bookings(customer_id);
+-- (status, booking_date) also serves status-filtered listings ordered by date
+DROP INDEX IF EXISTS idx_bookings_status;
+CREATE INDEX IF NOT EXISTS idx_bookings_status_date ON bookings(status, booking_date);
+CREATE INDEX IF NOT EXISTS idx_bookings_booking_date ON bookings(booking_date);
+-- Dispatch queue (see src/dispatch_queue.py): only pending bookings are
+-- indexed, so claiming work costs the queue depth, not the table size.
+-- Lease and status columns make it covering for the claim query.
+CREATE INDEX IF NOT EXISTS idx_bookings_dispatch
+ON bookings(booking_date, lease_expires_at, status) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_drivers_car_id ON drivers(car_id);
+CREATE INDEX IF NOT EXISTS idx_cars_driver_id ON cars(driver_id);
+CREATE INDEX IF NOT EXISTS idx_customers_phone_normalized ON customers(phone_normalized);
+
+-- Keep customers.phone_normalized in step with the free-text phone
+-- (see src/phone_lookup.py) and fill it in (or correct it) for existing customers
+UPDATE customers SET phone_normalized = {phone_sql("phone")}
+WHERE phone IS NOT NULL AND phone_normalized IS NOT {phone_sql("phone")};
+
+DROP TRIGGER IF EXISTS trg_customers_phone_insert;
+CREATE TRIGGER trg_customers_phone_insert AFTER INSERT ON customers
+BEGIN
+    UPDATE customers SET phone_normalized = {phone_sql("NEW.phone")}
+    WHERE id = NEW.id;
+END;
+
+DROP TRIGGER IF EXISTS trg_customers_phone_update;
+CREATE TRIGGER trg_customers_phone_update AFTER UPDATE OF phone ON customers
+BEGIN
+    UPDATE customers SET phone_normalized = {phone_sql("NEW.phone")}
+    WHERE id = NEW.id;
+END;
+
+-- Progress of bulk imports so interrupted runs can resume (see scripts/import.py)
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+    source TEXT PRIMARY KEY,
+    fingerprint TEXT,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Flags set inside maintenance transactions (e.g. 'archiving') that
+-- triggers check to skip their normal bookkeeping
+CREATE TABLE IF NOT EXISTS maintenance_flags (
+    name TEXT PRIMARY KEY
+);
+
+-- Resolved coordinates of normalized location text (see src/geocache.py).
+-- NULL coordinates record locations the resolver could not place.
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    location TEXT PRIMARY KEY,
+    latitude REAL,
+    longitude REAL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+
+-- Estimated distance and duration between normalized locations
+CREATE TABLE IF NOT EXISTS route_cache (
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    distance_km REAL NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (origin, destination)
+) WITHOUT ROWID;
+
+-- Row-level changes waiting to be pushed to the central service
+-- (see src/sync.py); op is 'I', 'U' or 'D'
+CREATE TABLE IF NOT EXISTS changelog (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    changed_at TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+-- Replication settings and progress (station_id, pull_cursor)
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+-- Daily summary of bookings per driver, car and status (see src/booking_stats.py)
+CREATE TABLE IF NOT EXISTS booking_daily_stats (
+    day TEXT NOT NULL,
+    driver_id INTEGER NOT NULL,
+    car_id INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    rides INTEGER NOT NULL DEFAULT 0,
+    fare_total REAL NOT NULL DEFAULT 0,
+    distance_total REAL NOT NULL DEFAULT 0,
+    rating_total INTEGER NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, driver_id, car_id, status)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_booking_daily_stats_driver ON booking_daily_stats(driver_id, day);
+CREATE INDEX IF NOT EXISTS idx_booking_daily_stats_car ON booking_daily_stats(car_id, day);
+
+-- Snapshot each booking's car (see trg_bookings_stats_insert) for
+-- bookings made before the column existed
+UPDATE bookings SET car_id = COALESCE((SELECT car_id FROM drivers WHERE id = bookings.driver_id), 0)
+WHERE car_id IS NULL;
+
+-- Backfill the summary when it is first added to a database with bookings
+INSERT INTO booking_daily_stats ({STATS_COLUMNS})
+{BOOKING_STATS_SELECT.format(source="bookings")}
+HAVING NOT EXISTS (SELECT 1 FROM booking_daily_stats);
+
+-- Keep the summary current. Triggers are dropped and recreated so that a
+-- changed definition replaces the old one when the schema is re-applied.
+-- Rows are keyed on the booking's own car_id, so a driver switching cars
+-- does not move their earlier rides to the new car.
+DROP TRIGGER IF EXISTS trg_bookings_stats_insert;
+CREATE TRIGGER trg_bookings_stats_insert AFTER INSERT ON bookings
+BEGIN
+    INSERT INTO booking_daily_stats ({STATS_COLUMNS})
+    VALUES (
+        {_stats_day("NEW")},
+        NEW.driver_id,
+        {_booking_car("NEW")},
+        COALESCE(NEW.status, 'pending'),
+        1,
+        COALESCE(NEW.fare_amount, 0),
+        COALESCE(NEW.distance_km, 0),
+        COALESCE(NEW.rating, 0),
+        NEW.rating IS NOT NULL
+    )
+    ON CONFLICT (day, driver_id, car_id, status) DO UPDATE SET
+        rides = rides + excluded.rides,
+        fare_total = fare_total + excluded.fare_total,
+        distance_total = distance_total + excluded.distance_total,
+        rating_total = rating_total + excluded.rating_total,
+        rating_count = rating_count + excluded.rating_count;
+    -- Record the driver's car at booking time (after the summary row
+    -- exists, in the same trigger so the order is fixed)
+    UPDATE bookings SET car_id = {_booking_car("NEW")}
+    WHERE id = NEW.id AND car_id IS NULL;
+END;
+
+DROP TRIGGER IF EXISTS trg_bookings_stats_delete;
+CREATE TRIGGER trg_bookings_stats_delete AFTER DELETE ON bookings
+WHEN NOT EXISTS (SELECT 1 FROM maintenance_flags WHERE name = 'archiving')
+BEGIN
+{_stats_subtract("OLD")}
+END;
+
+-- A booking moved to another driver takes that driver's car unless the
+-- statement sets car_id itself. Filling in a missing car_id (see the insert
+-- trigger) leaves the summary unchanged and is skipped.
+DROP TRIGGER IF EXISTS trg_bookings_stats_update;
+CREATE TRIGGER trg_bookings_stats_update
+AFTER UPDATE OF booking_date, driver_id, car_id, status, fare_amount, distance_km, rating ON bookings
+WHEN NOT (
+    OLD.car_id IS NULL
+    AND NEW.booking_date IS OLD.booking_date AND NEW.driver_id IS OLD.driver_id
+    AND NEW.status IS OLD.status AND NEW.fare_amount IS OLD.fare_amount
+    AND NEW.distance_km IS OLD.distance_km AND NEW.rating IS OLD.rating
+)
+BEGIN
+{_stats_subtract("OLD")}
+    INSERT INTO booking_daily_stats ({STATS_COLUMNS})
+    VALUES (
+        {_stats_day("NEW")},
+        NEW.driver_id,
+        {_NEW_CAR},
+        COALESCE(NEW.status, 'pending'),
+        1,
+        COALESCE(NEW.fare_amount, 0),
+        COALESCE(NEW.distance_km, 0),
+        COALESCE(NEW.rating, 0),
+        NEW.rating IS NOT NULL
+    )
+    ON CONFLICT (day, driver_id, car_id, status) DO UPDATE SET
+        rides = rides + excluded.rides,
+        fare_total = fare_total + excluded.fare_total,
+        distance_total = distance_total + excluded.distance_total,
+        rating_total = rating_total + excluded.rating_total,
+        rating_count = rating_count + excluded.rating_count;
+    -- Triggers do not fire themselves, so this does not count the ride twice
+    UPDATE bookings SET car_id = {_NEW_CAR}
+    WHERE id = NEW.id AND car_id IS NOT {_NEW_CAR};
+END;
+
+-- Replication changelog and updated_at triggers
+{changelog_sql()}
+"""
+
+# Columns added to tables after they were first created. CREATE TABLE IF NOT
+# EXISTS leaves existing tables alone, so these are added with ALTER TABLE
+# when missing. Fresh databases get them from the CREATE TABLE above.
+ADDED_COLUMNS = (
+    ("customers", "phone_normalized", "TEXT"),
+    ("bookings", "claimed_by", "TEXT"),
+    ("bookings", "lease_expires_at", "TIMESTAMP"),
+    ("bookings", "car_id", "INTEGER"),
+    ("import_checkpoints", "fingerprint", "TEXT"),
+)
+
+# user_version is a signed 32-bit integer, keep the checksum positive
+SCHEMA_CHECKSUM = zlib.crc32(
+    (SCHEMA_SQL + repr(ADDED_COLUMNS)).encode("utf-8")
+) & 0x7FFFFFFF
+
+
+def schema_is_current(db: Database) -> bool:
+    """
+    Check whether the database already carries the current schema.
+    
+    Args:
+        db: Open database instance
+        
+    Returns:
+        True if the stored checksum matches SCHEMA_CHECKSUM
+    """
+    cursor = db.execute("PRAGMA user_version")
+    return cursor.fetchone()[0] == SCHEMA_CHECKSUM
+
+
+def _missing_columns_sql(db: Database) -> str:
+    """Build ALTER TABLE statements for ADDED_COLUMNS missing from existing tables."""
+    statements = []
+    for table, column, definition in ADDED_COLUMNS:
+        if not db.table_exists(table):
+            continue
+        if column not in db.table_columns(table):
+            statements.append(f"ALTER TABLE {table} ADD COLUMN {column} {definition};")
+    return "\n".join(statements)
+
+
+def apply_schema(db: Database) -> bool:
+    """
+    Apply the schema in a single transaction unless it is already current.
+    
+    Args:
+        db: Open database instance (may be an in-memory database)
+        
+    Returns:
+        True if the schema was applied, False if nothing needed to be done
+    """
+    if schema_is_current(db):
+        return False
+    
+    db.executescript(
+        "BEGIN;\n"
+        f"{_missing_columns_sql(db)}\n"
+        f"{SCHEMA_SQL}\n"
+        f"PRAGMA user_version = {SCHEMA_CHECKSUM};\n"
+        "COMMIT;"
+    )
+    return True
+
+
+def ensure_schema(db_name: str = "taxi_booking.db") -> bool:
+    """
+    Make sure the database exists and carries the current schema.
+    Cheap enough to call on every startup.
+    
+    Args:
+        db_name: Name of the database file
+        
+    Returns:
+        True if the schema had to be applied, False if it was already current
+    """
+    with Database(db_name) as db:
+        return apply_schema(db)
 
 
 def init_database(db_name: str = "taxi_booking.db"):
@@ -23,108 +428,10 @@ def init_database(db_name: str = "taxi_booking.db"):
     db = Database(db_name)
     
     try:
-        # Create customers table
-        db.create_table(
-            "customers",
-            """
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            phone TEXT NOT NULL,
-            email TEXT,
-            address TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            """
-        )
-        print("✓ Created 'customers' table")
-        
-        # Create drivers table
-        db.create_table(
-            "drivers",
-            """
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            license_number TEXT NOT NULL UNIQUE,
-            phone TEXT NOT NULL,
-            email TEXT,
-            car_id INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (car_id) REFERENCES cars(id)
-            """
-        )
-        print("✓ Created 'drivers' table")
-        
-        # Create cars table
-        db.create_table(
-            "cars",
-            """
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            make TEXT NOT NULL,
-            model TEXT NOT NULL,
-            year INTEGER,
-            license_plate TEXT NOT NULL UNIQUE,
-            color TEXT,
-            driver_id INTEGER,
-            average_rating REAL DEFAULT 0.0,
-            total_rides INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (driver_id) REFERENCES drivers(id)
-            """
-        )
-        print("✓ Created 'cars' table")
-        
-        # Create bookings table
-        db.create_table(
-            "bookings",
-            """
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            driver_id INTEGER NOT NULL,
-            customer_id INTEGER NOT NULL,
-            pickup_location TEXT NOT NULL,
-            dropoff_location TEXT NOT NULL,
-            pickup_latitude REAL,
-            pickup_longitude REAL,
-            dropoff_latitude REAL,
-            dropoff_longitude REAL,
-            booking_date TIMESTAMP NOT NULL,
-            status TEXT DEFAULT 'pending',
-            fare_amount REAL,
-            distance_km REAL,
-            duration_minutes INTEGER,
-            rating INTEGER,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (driver_id) REFERENCES drivers(id),
-            FOREIGN KEY (customer_id) REFERENCES customers(id)
-            """
-        )
-        print("✓ Created 'bookings' table")
-        
-        # Create a junction table for bookings with multiple customers (if needed)
-        db.create_table(
-            "booking_customers",
-            """
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            booking_id INTEGER NOT NULL,
-            customer_id INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (booking_id) REFERENCES bookings(id) ON DELETE CASCADE,
-            FOREIGN KEY (customer_id) REFERENCES customers(id),
-            UNIQUE(booking_id, customer_id)
-            """
-        )
-        print("✓ Created 'booking_customers' junction table")
-        
-        # Create indexes for better query performance
-        db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_driver_id ON bookings(driver_id)")
-        db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_customer_id ON bookings(customer_id)")
-        db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings(status)")
-        db.execute("CREATE INDEX IF NOT EXISTS idx_drivers_car_id ON drivers(car_id)")
-        db.execute("CREATE INDEX IF NOT EXISTS idx_cars_driver_id ON cars(driver_id)")
-        print("✓ Created database indexes")
+        if apply_schema(db):
+            print("✓ Created tables and indexes")
+        else:
+            print("✓ Schema already up to date")
         
         print(f"\n✓ Database '{db_name}' initialized successfully!")
         print(f"  Database location: {db.db_path}")
@@ -153,4 +460,3 @@ if __name__ == "__main__":
     print("-" * 50)
     init_database(args.db_name)
     print("-" * 50)
-
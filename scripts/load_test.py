@@ -0,0 +1,345 @@
+"""
+Headless load test simulating concurrent dispatchers (no Qt required).
+
+Starts N worker threads or processes that replay a weighted mix of
+booking creates, status transitions, lookups and listings against a
+seeded database. Reports throughput, latency percentiles, time spent
+waiting for the write lock and "database is locked" (SQLITE_BUSY)
+errors over time, and can write the results as JSON so runs with
+different journal modes and commit strategies can be compared.
+"""
+
+import json
+import random
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+from src.read_models import BookingReadModel
+from scripts.seed_db import create_seeded_database
+
+
+OPERATIONS = ("create", "status", "lookup", "list")
+
+DEFAULT_MIX = "create=20,status=20,lookup=40,list=20"
+
+# Operations that write (and so wait for the database write lock)
+WRITE_OPERATIONS = ("create", "status")
+
+NEXT_STATUS = {"pending": "confirmed", "confirmed": "completed"}
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """
+    Parse an operation mix such as "create=20,lookup=80".
+
+    Args:
+        mix: Comma separated operation=weight pairs
+
+    Returns:
+        Dictionary of operation weights
+    """
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of {OPERATIONS}")
+        weights[name] = int(weight)
+    return weights
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_worker(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one simulated dispatcher until the deadline.
+
+    Module-level so it can run in a separate process.
+
+    Args:
+        config: Worker configuration (see run_load_test)
+
+    Returns:
+        Raw per-operation latencies (ms) of committed operations, busy
+        counts, timeline buckets and write lock waits (ms)
+    """
+    rng = random.Random(config["seed"])
+    db = Database(config["db_name"], timeout=config["busy_timeout"])
+    db.execute(f"PRAGMA synchronous={config['synchronous']}")
+    model = BookingReadModel(db)
+
+    max_booking_id = db.execute("SELECT MAX(id) FROM bookings").fetchone()[0] or 1
+    driver_count = db.execute("SELECT COUNT(*) FROM drivers").fetchone()[0] or 1
+    customer_count = db.execute("SELECT COUNT(*) FROM customers").fetchone()[0] or 1
+
+    names = list(config["mix"].keys())
+    weights = list(config["mix"].values())
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    busy: Dict[str, int] = {name: 0 for name in names}
+    timeline: Dict[int, List[int]] = {}  # bucket -> [operations, busy errors]
+    lock_waits: List[float] = []  # ms spent acquiring the write lock, per transaction
+
+    def create():
+        booking_id = db.create("bookings", {
+            "driver_id": rng.randint(1, driver_count),
+            "customer_id": rng.randint(1, customer_count),
+            "pickup_location": "Main Campus",
+            "dropoff_location": "Union Station",
+            "booking_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "status": "pending",
+        })
+        return booking_id
+
+    def status():
+        booking = db.read_one("bookings", rng.randint(1, max_booking_id))
+        if booking and booking["status"] in NEXT_STATUS:
+            db.update("bookings", booking["id"], {"status": NEXT_STATUS[booking["status"]]})
+
+    def lookup():
+        db.read_one("bookings", rng.randint(1, max_booking_id))
+
+    def listing():
+        model.fetch_page(limit=50)
+
+    actions = {"create": create, "status": status, "lookup": lookup, "list": listing}
+
+    start = config["start"]
+    deadline = start + config["duration"]
+    batch = max(1, config["batch_size"]) if config["commit"] == "batched" else 1
+
+    while time.time() < deadline:
+        chosen = rng.choices(names, weights, k=batch)
+        # Write transactions start with BEGIN IMMEDIATE, which is where a
+        # writer waits for the lock (in WAL mode readers never wait), so
+        # the time spent in BEGIN is the lock wait. Read-only operations
+        # run without a transaction.
+        writes = batch > 1 or chosen[0] in WRITE_OPERATIONS
+        done: List[Tuple[str, float]] = []
+        began = time.perf_counter()
+        locked = False
+        try:
+            if writes:
+                with db.transaction(immediate=True):
+                    locked = True
+                    lock_waits.append((time.perf_counter() - began) * 1000)
+                    for name in chosen:
+                        op_began = time.perf_counter() if batch > 1 else began
+                        actions[name]()
+                        done.append((name, (time.perf_counter() - op_began) * 1000))
+            else:
+                actions[chosen[0]]()
+                done.append((chosen[0], (time.perf_counter() - began) * 1000))
+            # Only operations whose transaction committed count
+            for name, latency in done:
+                latencies[name].append(latency)
+            errors = 0
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            if writes and not locked:
+                # Gave up waiting for the lock after busy_timeout
+                lock_waits.append((time.perf_counter() - began) * 1000)
+            for name in chosen:
+                busy[name] += 1
+            errors = len(chosen)
+
+        bucket = int((time.time() - start) / config["interval"])
+        counts = timeline.setdefault(bucket, [0, 0])
+        counts[0] += len(chosen) - errors
+        counts[1] += errors
+
+    db.close()
+    return {"latencies": latencies, "busy": busy, "timeline": timeline, "lock_waits": lock_waits}
+
+
+def run_load_test(
+    db_name: str = "loadtest.db",
+    workers: int = 4,
+    mode: str = "threads",
+    duration: float = 10.0,
+    mix: str = DEFAULT_MIX,
+    journal_mode: str = "wal",
+    synchronous: str = "normal",
+    commit: str = "autocommit",
+    batch_size: int = 10,
+    busy_timeout: float = 5.0,
+    interval: float = 1.0,
+    seed: bool = True
+) -> Dict[str, Any]:
+    """
+    Run the load test and aggregate the results.
+
+    Args:
+        db_name: Database file to test against
+        workers: Number of concurrent dispatchers
+        mode: "threads" or "processes"
+        duration: Seconds to run
+        mix: Operation mix (see parse_mix)
+        journal_mode: SQLite journal mode (e.g. "wal", "delete")
+        synchronous: SQLite synchronous setting (e.g. "normal", "full")
+        commit: "autocommit" (one commit per operation) or "batched"
+        batch_size: Operations per transaction when commit is "batched"
+        busy_timeout: Seconds a connection waits for a lock
+        interval: Timeline bucket size in seconds
+        seed: Create a fresh seeded database first
+
+    Returns:
+        Dictionary with the configuration, per-operation stats and timeline
+    """
+    if seed:
+        create_seeded_database(db_name)
+    with Database(db_name) as db:
+        db.execute(f"PRAGMA journal_mode={journal_mode}")
+
+    config = {
+        "db_name": db_name,
+        "mix": parse_mix(mix),
+        "synchronous": synchronous,
+        "commit": commit,
+        "batch_size": batch_size,
+        "busy_timeout": busy_timeout,
+        "interval": interval,
+        "duration": duration,
+        "start": time.time(),
+    }
+    configs = [dict(config, seed=index) for index in range(workers)]
+
+    executor_class = ProcessPoolExecutor if mode == "processes" else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        results = list(executor.map(run_worker, configs))
+
+    operations = {}
+    total_ops = 0
+    total_busy = 0
+    for name in config["mix"]:
+        samples = sorted(value for result in results for value in result["latencies"][name])
+        busy = sum(result["busy"][name] for result in results)
+        total_ops += len(samples)
+        total_busy += busy
+        operations[name] = {
+            "count": len(samples),
+            "busy_errors": busy,
+            "p50_ms": percentile(samples, 0.50),
+            "p95_ms": percentile(samples, 0.95),
+            "p99_ms": percentile(samples, 0.99),
+            "max_ms": samples[-1] if samples else 0.0,
+        }
+
+    waits = sorted(value for result in results for value in result["lock_waits"])
+    lock_wait = {
+        "transactions": len(waits),
+        "total_ms": sum(waits),
+        "p50_ms": percentile(waits, 0.50),
+        "p95_ms": percentile(waits, 0.95),
+        "p99_ms": percentile(waits, 0.99),
+        "max_ms": waits[-1] if waits else 0.0,
+    }
+
+    timeline: Dict[int, List[int]] = {}
+    for result in results:
+        for bucket, (ops, busy) in result["timeline"].items():
+            counts = timeline.setdefault(int(bucket), [0, 0])
+            counts[0] += ops
+            counts[1] += busy
+
+    return {
+        "config": {
+            "workers": workers,
+            "mode": mode,
+            "duration": duration,
+            "mix": mix,
+            "journal_mode": journal_mode,
+            "synchronous": synchronous,
+            "commit": commit,
+            "batch_size": batch_size,
+            "busy_timeout": busy_timeout,
+        },
+        "throughput_ops_per_second": total_ops / duration,
+        "busy_errors": total_busy,
+        "operations": operations,
+        "lock_wait": lock_wait,
+        "timeline": [
+            {"t": bucket * interval, "ops_per_second": ops / interval, "busy_errors": busy}
+            for bucket, (ops, busy) in sorted(timeline.items())
+        ],
+    }
+
+
+def print_summary(results: Dict[str, Any]):
+    """Print a human readable summary of run_load_test results."""
+    config = results["config"]
+    print(
+        f"{config['workers']} {config['mode']}, journal={config['journal_mode']}, "
+        f"synchronous={config['synchronous']}, commit={config['commit']}"
+    )
+    print(f"Throughput: {results['throughput_ops_per_second']:.0f} ops/s, "
+          f"busy errors: {results['busy_errors']}")
+    print(f"{'operation':<10}{'count':>8}{'busy':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, stats in results["operations"].items():
+        print(
+            f"{name:<10}{stats['count']:>8}{stats['busy_errors']:>6}"
+            f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+            f"{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}"
+        )
+    wait = results["lock_wait"]
+    print(
+        f"Lock wait: {wait['total_ms']:.0f} ms over {wait['transactions']} write transactions "
+        f"(p50 {wait['p50_ms']:.2f}, p95 {wait['p95_ms']:.2f}, "
+        f"p99 {wait['p99_ms']:.2f}, max {wait['max_ms']:.2f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test the database with concurrent dispatchers")
+    parser.add_argument("--db-name", type=str, default="loadtest.db", help="Database file (default: loadtest.db)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent dispatchers (default: 4)")
+    parser.add_argument("--mode", choices=("threads", "processes"), default="threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run (default: 10)")
+    parser.add_argument("--mix", type=str, default=DEFAULT_MIX, help=f"Operation mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--journal-mode", type=str, default="wal", help="SQLite journal mode (default: wal)")
+    parser.add_argument("--synchronous", type=str, default="normal", help="SQLite synchronous (default: normal)")
+    parser.add_argument("--commit", choices=("autocommit", "batched"), default="autocommit")
+    parser.add_argument("--batch-size", type=int, default=10, help="Operations per batched transaction")
+    parser.add_argument("--busy-timeout", type=float, default=5.0, help="Seconds to wait for locks")
+    parser.add_argument("--interval", type=float, default=1.0, help="Timeline bucket in seconds")
+    parser.add_argument("--no-seed", action="store_true", help="Use the existing database as is")
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+
+    args = parser.parse_args()
+
+    results = run_load_test(
+        db_name=args.db_name,
+        workers=args.workers,
+        mode=args.mode,
+        duration=args.duration,
+        mix=args.mix,
+        journal_mode=args.journal_mode,
+        synchronous=args.synchronous,
+        commit=args.commit,
+        batch_size=args.batch_size,
+        busy_timeout=args.busy_timeout,
+        interval=args.interval,
+        seed=not args.no_seed,
+    )
+    print_summary(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"\n✓ Results written to {args.output}")
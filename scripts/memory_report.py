@@ -0,0 +1,383 @@
+"""
+Memory accounting report for the data layer and the list windows.
+
+Builds each subsystem against a seeded database and measures what it
+keeps alive with tracemalloc snapshots and garbage collector object
+counts:
+
+    database rows      row dicts from Database.read_all for every table
+    statement cache    a fresh connection running the application's statements
+    view models        RowCache, BookingReadModel pages and LastRidesModel
+    widgets            the list windows, rendered offscreen (needs PyQt6)
+
+Each subsystem is then refreshed repeatedly; memory or objects that keep
+growing from one refresh to the next point to a leak. Runs headless and
+exits with status 1 if any subsystem grows by more than --max-growth-kb,
+so it can run in CI.
+
+tracemalloc only sees Python allocations. SQLite's page and statement
+memory and Qt's C++ objects show up in the resident set size (RSS)
+column instead, where the platform reports it. Object counts only cover
+objects the garbage collector tracks, which excludes row dicts holding
+plain values; a few dozen extra weak references (ReferenceType) are
+sqlite3's cursor bookkeeping, pruned every 200 cursors, not a leak.
+"""
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Callable, NamedTuple
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+from src.read_models import BookingReadModel, LastRidesModel
+from src.row_cache import RowCache
+from scripts.audit_queries import exercise
+from scripts.seed_db import create_seeded_database
+
+
+ROW_TABLES = ("customers", "drivers", "cars", "bookings", "booking_customers")
+
+# Allocation sites listed per subsystem
+TOP_SITES = 5
+
+# A refresh callable rebuilds a subsystem's state and returns how many
+# units (rows, statements, list items) it now holds
+Refresh = Callable[[], int]
+
+
+class SubsystemReport(NamedTuple):
+    """Memory use of one subsystem."""
+    name: str
+    units: int                    # Rows, statements or list items held
+    retained_bytes: int           # Python memory held after the first build
+    retained_objects: int         # GC-tracked objects held after the first build
+    rss_bytes: Optional[int]      # Resident set size change during the first build
+    growth_bytes: int             # Python memory gained between first and last refresh
+    growth_objects: int           # Objects gained between first and last refresh
+    top_sites: List[str]          # Largest allocation sites of the build
+    growing_types: List[str]      # Object types whose count grew across refreshes
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, if the platform reports it."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def count_objects() -> Counter:
+    """Number of GC-tracked objects per type name (tracemalloc's own excluded)."""
+    return Counter(
+        type(obj).__name__ for obj in gc.get_objects()
+        if type(obj).__module__ != "tracemalloc"
+    )
+
+
+def _settle():
+    """Collect garbage (and run pending Qt deletions) before measuring."""
+    # Without Qt loaded there is nothing to flush, and a failing PyQt6
+    # import would allocate inside the measured window
+    app = _qt_application(create=False) if "PyQt6.QtWidgets" in sys.modules else None
+    if app is not None:
+        from PyQt6.QtCore import QCoreApplication, QEvent
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+        app.processEvents()
+    gc.collect()
+
+
+def _traced_bytes() -> int:
+    """Python memory currently allocated (tracemalloc's own is not included)."""
+    return tracemalloc.get_traced_memory()[0]
+
+
+def measure(name: str, refresh: Refresh, refreshes: int = 5) -> SubsystemReport:
+    """
+    Measure one subsystem.
+
+    Args:
+        name: Subsystem name
+        refresh: Builds or rebuilds the subsystem (see Refresh)
+        refreshes: Number of refreshes after the first build
+
+    Returns:
+        SubsystemReport
+    """
+    _settle()
+    objects_before = count_objects()
+    rss_before = current_rss_bytes()
+    # Snapshots are large Python objects: take this one before reading the
+    # counter, so it is part of both readings
+    before = tracemalloc.take_snapshot()
+    memory_before = _traced_bytes()
+
+    units = refresh()
+
+    _settle()
+    memory_built = _traced_bytes()
+    objects_built = count_objects()
+    rss_after = current_rss_bytes()
+    ignored = (tracemalloc.__file__, __file__)
+    sites = [
+        stat for stat in tracemalloc.take_snapshot().compare_to(before, "lineno")
+        if stat.traceback[0].filename not in ignored
+    ][:TOP_SITES]
+    del before
+
+    retained_count = sum(objects_built.values()) - sum(objects_before.values())
+    del objects_before
+
+    # The first refresh settles lazily created state; growth is measured
+    # after it. One counter is alive during each count, so they compare.
+    memory_first = memory_last = memory_built
+    objects_first = objects_built
+    del objects_built
+    for index in range(refreshes):
+        units = refresh()
+        _settle()
+        if index == 0:
+            memory_first, objects_first = _traced_bytes(), count_objects()
+    objects_last = objects_first
+    if refreshes >= 2:
+        memory_last, objects_last = _traced_bytes(), count_objects()
+    type_growth = objects_last - objects_first
+
+    return SubsystemReport(
+        name=name,
+        units=units,
+        retained_bytes=memory_built - memory_before,
+        retained_objects=retained_count,
+        rss_bytes=rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        growth_bytes=memory_last - memory_first,
+        growth_objects=sum(objects_last.values()) - sum(objects_first.values()),
+        top_sites=[f"{stat.traceback[0]}: {stat.size_diff / 1024:+.1f} KB" for stat in sites],
+        growing_types=[
+            f"{type_name} +{count}"
+            for type_name, count in type_growth.most_common(TOP_SITES)
+        ],
+    )
+
+
+def database_rows(db: Database) -> Refresh:
+    """Row dicts of every table, as the windows used to load them."""
+    rows: Dict[str, List[Dict[str, Any]]] = {}
+
+    def refresh() -> int:
+        for table in ROW_TABLES:
+            rows[table] = db.read_all(table)
+        return sum(len(table_rows) for table_rows in rows.values())
+
+    return refresh
+
+
+class _StatementRecorder:
+    """Stands in for a query auditor to collect distinct statement texts."""
+
+    def __init__(self):
+        """Start with no statements."""
+        self.statements = set()
+
+    def record(self, query: str):
+        """Called by Database for every statement it runs."""
+        self.statements.add(query)
+
+
+def statement_cache(db_name: str) -> Refresh:
+    """A fresh connection compiling the statements the views use."""
+    db = Database(db_name)
+    recorder = _StatementRecorder()
+    db.auditor = recorder
+
+    def refresh() -> int:
+        exercise(db)
+        return len(recorder.statements)
+
+    return refresh
+
+
+def view_models(db: Database) -> Refresh:
+    """The shared row cache and the read models behind the list windows."""
+    cache = RowCache(db)
+    read_model = BookingReadModel(db)
+    last_rides = LastRidesModel(db, listen=False)
+    held: Dict[str, Any] = {}
+
+    def refresh() -> int:
+        for table in ("customers", "drivers", "cars"):
+            held[table] = cache.load_all(table)
+        held["bookings"] = read_model.fetch_page(limit=200)
+        last_rides.invalidate()
+        held["last_rides"] = last_rides.for_drivers(driver["id"] for driver in held["drivers"][:50])
+        return sum(len(value) for value in held.values())
+
+    return refresh
+
+
+def _qt_application(create: bool = True):
+    """The QApplication (offscreen), or None if PyQt6 is not installed."""
+    try:
+        from PyQt6.QtWidgets import QApplication
+    except ImportError:
+        return None
+    app = QApplication.instance()
+    if app is None and create:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QApplication([])
+    return app
+
+
+def widgets(db: Database) -> Optional[Refresh]:
+    """The four list windows, created offscreen; None without PyQt6."""
+    if _qt_application() is None:
+        return None
+    from PyQt6.QtWidgets import QListWidget
+    from src.change_bus import ChangeBus
+    from src.views.bookings_window import BookingsWindow
+    from src.views.cars_window import CarsWindow
+    from src.views.customers_window import CustomersWindow
+    from src.views.drivers_window import DriversWindow
+
+    windows: List[Any] = []
+
+    def refresh() -> int:
+        if not windows:
+            bus = ChangeBus(db)
+            windows.extend([
+                BookingsWindow(db=db, bus=bus),
+                DriversWindow(db=db, bus=bus),
+                CarsWindow(db=db, bus=bus),
+                CustomersWindow(db=db, bus=bus),
+            ])
+        else:
+            windows[0]._refresh_bookings()
+            windows[1]._refresh_drivers()
+            windows[2]._refresh_cars()
+            windows[3]._refresh_customers()
+        return sum(
+            list_widget.count()
+            for window in windows
+            for list_widget in window.findChildren(QListWidget)
+        )
+
+    return refresh
+
+
+def run_memory_report(
+    db_name: str = "memreport.db",
+    refreshes: int = 5,
+    include_widgets: bool = True,
+    seed: bool = True,
+    **sizes
+) -> List[SubsystemReport]:
+    """
+    Measure every subsystem against a database.
+
+    Args:
+        db_name: Database file to measure against
+        refreshes: Refreshes per subsystem after the first build
+        include_widgets: Measure the windows (skipped without PyQt6)
+        seed: Create a fresh seeded database first
+        **sizes: Keyword arguments passed to seed_database
+
+    Returns:
+        One SubsystemReport per measured subsystem
+    """
+    if seed:
+        create_seeded_database(db_name, **sizes)
+
+    reports = []
+    with Database(db_name) as db:
+        # Import everything up front so module loading is not counted
+        widget_refresh = widgets(db) if include_widgets else None
+
+        tracemalloc.start()
+        try:
+            subsystems = [
+                ("database rows", database_rows(db)),
+                ("statement cache", statement_cache(db_name)),
+                ("view models", view_models(db)),
+            ]
+            if widget_refresh is not None:
+                subsystems.append(("widgets", widget_refresh))
+            for name, refresh in subsystems:
+                reports.append(measure(name, refresh, refreshes))
+            del subsystems, widget_refresh
+        finally:
+            tracemalloc.stop()
+    return reports
+
+
+def print_report(reports: List[SubsystemReport], max_growth_kb: float):
+    """Print a human readable summary of run_memory_report results."""
+    print(
+        f"{'subsystem':<17}{'units':>8}{'retained KB':>13}{'B/unit':>8}"
+        f"{'objects':>9}{'RSS KB':>9}{'growth KB':>11}{'growth obj':>12}"
+    )
+    for report in reports:
+        per_unit = report.retained_bytes / report.units if report.units else 0
+        rss = f"{report.rss_bytes / 1024:.0f}" if report.rss_bytes is not None else "n/a"
+        flag = "  <-- leak?" if report.growth_bytes > max_growth_kb * 1024 else ""
+        print(
+            f"{report.name:<17}{report.units:>8}{report.retained_bytes / 1024:>13.1f}{per_unit:>8.0f}"
+            f"{report.retained_objects:>9}{rss:>9}{report.growth_bytes / 1024:>11.1f}"
+            f"{report.growth_objects:>12}{flag}"
+        )
+
+    for report in reports:
+        print(f"\n{report.name}:")
+        for site in report.top_sites:
+            print(f"  {site}")
+        if report.growing_types:
+            print(f"  growing across refreshes: {', '.join(report.growing_types)}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report memory use of the data layer and list windows")
+    parser.add_argument("--db-name", type=str, default="memreport.db", help="Database file (default: memreport.db)")
+    parser.add_argument("--bookings", type=int, default=10000, help="Seeded bookings (default: 10000)")
+    parser.add_argument("--customers", type=int, default=1000, help="Seeded customers (default: 1000)")
+    parser.add_argument("--drivers", type=int, default=50, help="Seeded drivers and cars (default: 50)")
+    parser.add_argument("--refreshes", type=int, default=5, help="Refreshes per subsystem (default: 5)")
+    parser.add_argument(
+        "--max-growth-kb",
+        type=float,
+        default=256.0,
+        help="Fail if a subsystem grows more than this across refreshes (default: 256)"
+    )
+    parser.add_argument("--no-widgets", action="store_true", help="Skip the windows")
+    parser.add_argument("--no-seed", action="store_true", help="Use the existing database as is")
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+
+    args = parser.parse_args()
+
+    reports = run_memory_report(
+        db_name=args.db_name,
+        refreshes=args.refreshes,
+        include_widgets=not args.no_widgets,
+        seed=not args.no_seed,
+        bookings=args.bookings,
+        customers=args.customers,
+        drivers=args.drivers,
+    )
+    print_report(reports, args.max_growth_kb)
+    if not args.no_widgets and all(report.name != "widgets" for report in reports):
+        print("\nPyQt6 is not installed, widgets were not measured")
+    if args.output:
+        Path(args.output).write_text(json.dumps([report._asdict() for report in reports], indent=2))
+        print(f"\n✓ Results written to {args.output}")
+
+    leaking = [report.name for report in reports if report.growth_bytes > args.max_growth_kb * 1024]
+    if leaking:
+        print(f"\nMemory grew by more than {args.max_growth_kb:.0f} KB across refreshes: {', '.join(leaking)}")
+        sys.exit(1)
@@ -0,0 +1,62 @@
+"""
+Rebuild the booking_daily_stats summary table from the bookings table.
+The summary is normally maintained by triggers; run this after bulk loads
+or to correct drift.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+from src.booking_stats import BookingStats
+
+
+def rebuild_stats(
+    db_name: str = "taxi_booking.db",
+    archive_name: str = "taxi_booking_archive.db"
+) -> int:
+    """
+    Recompute all daily booking statistics.
+    
+    Args:
+        db_name: Name of the database file
+        archive_name: Name of the archive database file; archived bookings
+            are included if it exists
+        
+    Returns:
+        Number of summary rows written
+    """
+    with Database(db_name) as db:
+        if (parent_dir / archive_name).exists():
+            db.attach_archive(archive_name)
+        return BookingStats(db).rebuild()
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Rebuild daily booking statistics")
+    parser.add_argument(
+        "--db-name",
+        type=str,
+        default="taxi_booking.db",
+        help="Name of the database file (default: taxi_booking.db)"
+    )
+    parser.add_argument(
+        "--archive-name",
+        type=str,
+        default="taxi_booking_archive.db",
+        help="Name of the archive database file (default: taxi_booking_archive.db)"
+    )
+    
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    rows = rebuild_stats(args.db_name, args.archive_name)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Rebuilt {rows} summary rows in {elapsed:.2f}s")
@@ -0,0 +1,163 @@
+"""
+Seed a database with synthetic customers, cars, drivers and bookings.
+Used for load tests, query audits and diagnostics at realistic sizes.
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+from scripts.init_db import apply_schema
+
+
+# Campus-style locations with approximate coordinates
+LOCATIONS = [
+    ("Main Campus", 43.6629, -79.3957),
+    ("Union Station", 43.6453, -79.3806),
+    ("Pearson Airport", 43.6777, -79.6248),
+    ("North Residence", 43.6689, -79.3981),
+    ("Downtown Library", 43.6536, -79.3849),
+    ("Science Park", 43.7735, -79.5019),
+    ("Harbourfront", 43.6387, -79.3816),
+    ("East Campus", 43.7845, -79.1872),
+]
+
+STATUSES = ["completed"] * 8 + ["pending", "cancelled"]
+
+MAKES = [("Toyota", "Corolla"), ("Honda", "Civic"), ("Ford", "Focus"), ("Hyundai", "Elantra")]
+
+
+def seed_database(
+    db: Database,
+    customers: int = 1000,
+    drivers: int = 50,
+    bookings: int = 10000,
+    days: int = 90,
+    seed: int = 42
+):
+    """
+    Insert synthetic data. Each driver gets one car.
+    
+    Args:
+        db: Database with the schema applied
+        customers: Number of customers
+        drivers: Number of drivers (and cars)
+        bookings: Number of bookings
+        days: Bookings are spread over this many days up to now
+        seed: Random seed for reproducible data
+    """
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    
+    with db.transaction():
+        db.executemany(
+            "INSERT INTO customers (name, phone, email) VALUES (?, ?, ?)",
+            [
+                (
+                    f"Customer {i}",
+                    f"({rng.randint(200, 999)}) 555-{rng.randint(0, 9999):04d}",
+                    f"customer{i}@example.edu",
+                )
+                for i in range(1, customers + 1)
+            ]
+        )
+        db.executemany(
+            "INSERT INTO cars (id, make, model, year, license_plate, color, driver_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (i, *rng.choice(MAKES), rng.randint(2012, 2025), f"STU-{i:04d}", "white", i)
+                for i in range(1, drivers + 1)
+            ]
+        )
+        db.executemany(
+            "INSERT INTO drivers (id, name, license_number, phone, car_id) VALUES (?, ?, ?, ?, ?)",
+            [
+                (i, f"Driver {i}", f"D{i:06d}", f"555-01{i:02d}", i)
+                for i in range(1, drivers + 1)
+            ]
+        )
+        
+        rows = []
+        for _ in range(bookings):
+            pickup = rng.choice(LOCATIONS)
+            dropoff = rng.choice(LOCATIONS)
+            when = now - timedelta(minutes=rng.randint(0, days * 24 * 60))
+            status = STATUSES[rng.randrange(len(STATUSES))]
+            distance = round(rng.uniform(1.0, 30.0), 1)
+            rows.append((
+                rng.randint(1, drivers),
+                rng.randint(1, customers),
+                pickup[0],
+                dropoff[0],
+                pickup[1],
+                pickup[2],
+                dropoff[1],
+                dropoff[2],
+                when.strftime("%Y-%m-%d %H:%M:%S"),
+                status,
+                round(3.5 + distance * 1.75, 2),
+                distance,
+                int(distance * 2.5) + 5,
+                rng.randint(1, 5) if status == "completed" else None,
+            ))
+        db.executemany(
+            """
+            INSERT INTO bookings (
+                driver_id, customer_id, pickup_location, dropoff_location,
+                pickup_latitude, pickup_longitude, dropoff_latitude, dropoff_longitude,
+                booking_date, status, fare_amount, distance_km, duration_minutes, rating
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows
+        )
+
+
+def create_seeded_database(db_name: str, **sizes) -> Path:
+    """
+    Create a fresh database file with the schema and synthetic data.
+    
+    Args:
+        db_name: Name of the database file (replaced if it exists)
+        **sizes: Keyword arguments passed to seed_database
+        
+    Returns:
+        Path of the database file
+    """
+    path = parent_dir / db_name
+    for suffix in ("", "-wal", "-shm"):
+        Path(str(path) + suffix).unlink(missing_ok=True)
+    
+    with Database(db_name) as db:
+        apply_schema(db)
+        seed_database(db, **sizes)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Create a database filled with synthetic data")
+    parser.add_argument("--db-name", type=str, default="seeded.db", help="Database file to create (default: seeded.db)")
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--drivers", type=int, default=50)
+    parser.add_argument("--bookings", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    
+    args = parser.parse_args()
+    
+    path = create_seeded_database(
+        args.db_name,
+        customers=args.customers,
+        drivers=args.drivers,
+        bookings=args.bookings,
+        days=args.days,
+        seed=args.seed,
+    )
+    print(f"✓ Seeded {path}")
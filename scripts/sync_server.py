@@ -0,0 +1,228 @@
+"""
+Local stand-in for the central sync service of the taxi booking application.
+
+Keeps the newest change of every replicated row in its own database and
+serves the protocol used by src/sync.py:
+
+    POST /push      gzip JSON {"station": ..., "changes": [...]}
+    GET  /pull      ?since=<cursor>&station=<id>&limit=<n>, gzip JSON reply
+
+A change that is older (by updated_at) than the stored one for the same
+row is dropped, so stations that were offline cannot roll rows back.
+Requests are handled one at a time, which is plenty for tests and a
+handful of stations.
+"""
+
+import gzip
+import json
+import sys
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, Any, Tuple
+from urllib.parse import urlparse, parse_qs
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+
+
+CENTRAL_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    station TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    updated_at TEXT,
+    row TEXT,
+    received_at REAL NOT NULL,
+    UNIQUE (table_name, row_id)
+);
+CREATE INDEX IF NOT EXISTS idx_changes_station_seq ON changes(station, seq);
+"""
+
+MAX_PULL_LIMIT = 5000
+
+
+class CentralStore:
+    """The central change store."""
+
+    def __init__(self, db: Database):
+        """
+        Initialize the store.
+
+        Args:
+            db: Central database (the schema is created if missing)
+        """
+        self.db = db
+        self.db.executescript(CENTRAL_SCHEMA_SQL)
+
+    def push(self, station: str, changes: list) -> Tuple[int, int]:
+        """
+        Store changes from a station.
+
+        Args:
+            station: ID of the pushing station
+            changes: Changes as sent by SyncClient
+
+        Returns:
+            (accepted, rejected as older than the stored change)
+        """
+        accepted = rejected = 0
+        received_at = time.time()
+        with self.db.transaction(immediate=True):
+            for change in changes:
+                current = self.db.execute(
+                    "SELECT updated_at FROM changes WHERE table_name = ? AND row_id = ?",
+                    (change["table"], change["id"])
+                ).fetchone()
+                if current is not None and current["updated_at"] > change["updated_at"]:
+                    rejected += 1
+                    continue
+                # Replacing the row gives it a new seq, so every station pulls it again
+                self.db.execute(
+                    "DELETE FROM changes WHERE table_name = ? AND row_id = ?",
+                    (change["table"], change["id"])
+                )
+                self.db.execute(
+                    "INSERT INTO changes (station, table_name, row_id, op, updated_at, row, received_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        station, change["table"], change["id"], change["op"], change["updated_at"],
+                        json.dumps(change["row"]), received_at,
+                    )
+                )
+                accepted += 1
+        return accepted, rejected
+
+    def pull(self, since: int, station: str, limit: int) -> Dict[str, Any]:
+        """
+        Changes after a cursor, excluding the requesting station's own.
+
+        Args:
+            since: Cursor returned by the previous pull (0 at first)
+            station: ID of the pulling station
+            limit: Maximum number of changes
+
+        Returns:
+            {"changes": [...], "cursor": next cursor, "more": bool}
+        """
+        limit = max(1, min(limit, MAX_PULL_LIMIT))
+        rows = self.db.execute(
+            "SELECT seq, table_name, row_id, op, updated_at, row, received_at FROM changes "
+            "WHERE seq > ? AND station != ? ORDER BY seq LIMIT ?",
+            (since, station, limit)
+        ).fetchall()
+        if rows:
+            cursor = rows[-1]["seq"]
+        else:
+            # Skip past the station's own changes
+            cursor = max(since, self.db.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0])
+        return {
+            "changes": [
+                {
+                    "table": row["table_name"],
+                    "id": row["row_id"],
+                    "op": row["op"],
+                    "row": json.loads(row["row"]),
+                    "updated_at": row["updated_at"],
+                    "received_at": row["received_at"],
+                }
+                for row in rows
+            ],
+            "cursor": cursor,
+            "more": len(rows) == limit,
+        }
+
+
+def make_handler(store: CentralStore, quiet: bool = False):
+    """Build the request handler class bound to a store."""
+
+    class SyncHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            """Accept a batch of changes."""
+            if urlparse(self.path).path != "/push":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            request = json.loads(body)
+            accepted, rejected = store.push(request["station"], request["changes"])
+            self._reply({"accepted": accepted, "rejected": rejected})
+
+        def do_GET(self):
+            """Serve changes after a cursor."""
+            url = urlparse(self.path)
+            if url.path != "/pull":
+                self.send_error(404)
+                return
+            query = parse_qs(url.query)
+            self._reply(store.pull(
+                int(query.get("since", ["0"])[0]),
+                query.get("station", [""])[0],
+                int(query.get("limit", ["500"])[0]),
+            ))
+
+        def _reply(self, payload: Dict[str, Any]):
+            """Send a gzip JSON response."""
+            body = gzip.compress(json.dumps(payload).encode("utf-8"))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            """Log requests unless quiet."""
+            if not quiet:
+                super().log_message(format, *args)
+
+    return SyncHandler
+
+
+def create_server(db: Database, host: str = "127.0.0.1", port: int = 8765, quiet: bool = False) -> HTTPServer:
+    """
+    Create the sync server (call serve_forever() on the thread that created db).
+
+    Args:
+        db: Central database
+        host: Interface to listen on
+        port: Port to listen on (0 picks a free port)
+        quiet: Do not log requests
+
+    Returns:
+        HTTPServer instance
+    """
+    return HTTPServer((host, port), make_handler(CentralStore(db), quiet))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the central sync service")
+    parser.add_argument(
+        "--db-name",
+        type=str,
+        default="central.db",
+        help="Name of the central database file (default: central.db)"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--quiet", action="store_true", help="Do not log requests")
+
+    args = parser.parse_args()
+
+    with Database(args.db_name) as db:
+        server = create_server(db, args.host, args.port, args.quiet)
+        print(f"✓ Sync server listening on http://{args.host}:{server.server_address[1]} ({args.db_name})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopped")
+        finally:
+            server.server_close()
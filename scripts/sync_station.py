@@ -0,0 +1,89 @@
+"""
+Synchronize a booking station's database with the central sync service.
+
+Pushes local changes and pulls other stations' changes once, or every
+--interval seconds, and prints throughput and lag of each run.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+from src.sync import SyncClient, SyncStats, reserve_id_block
+from scripts.init_db import ensure_schema
+
+
+def format_stats(stats: SyncStats) -> str:
+    """One-line summary of a sync run."""
+    return (
+        f"pushed {stats.pushed}, pulled {stats.pulled} "
+        f"(applied {stats.applied}, {stats.skipped} older than local), "
+        f"{stats.bytes_sent + stats.bytes_received} bytes in {stats.seconds:.2f}s "
+        f"({stats.changes_per_second:.0f} changes/s), "
+        f"push lag {stats.push_lag:.1f}s, pull lag {stats.pull_lag:.1f}s"
+    )
+
+
+def sync_station(
+    url: str,
+    db_name: str = "taxi_booking.db",
+    interval: float = 0.0,
+    batch_size: int = 500
+):
+    """
+    Synchronize once, or repeatedly until interrupted.
+
+    Args:
+        url: Base URL of the sync service
+        db_name: Name of the database file
+        interval: Seconds between runs (0: run once)
+        batch_size: Changes per request
+    """
+    ensure_schema(db_name)
+    with Database(db_name) as db:
+        client = SyncClient(db, url, batch_size=batch_size)
+        while True:
+            stats = client.sync()
+            print(f"✓ {format_stats(stats)}")
+            if interval <= 0:
+                break
+            time.sleep(interval)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Synchronize with the central sync service")
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8765", help="Sync service URL (default: http://127.0.0.1:8765)")
+    parser.add_argument(
+        "--db-name",
+        type=str,
+        default="taxi_booking.db",
+        help="Name of the database file (default: taxi_booking.db)"
+    )
+    parser.add_argument("--interval", type=float, default=0.0, help="Sync every N seconds (default: once)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Changes per request (default: 500)")
+    parser.add_argument(
+        "--station-number",
+        type=int,
+        default=0,
+        help="Reserve this station's row ID block before syncing (once per station)"
+    )
+
+    args = parser.parse_args()
+
+    if args.station_number:
+        ensure_schema(args.db_name)
+        with Database(args.db_name) as db:
+            reserve_id_block(db, args.station_number)
+        print(f"✓ Reserved row IDs for station {args.station_number}")
+
+    try:
+        sync_station(args.url, args.db_name, args.interval, args.batch_size)
+    except KeyboardInterrupt:
+        print("\nStopped")
@@ -1,12 +1,25 @@
-from .base_window import BaseWindow
 from .database import Database
-from .views import (
-    BookingsWindow,
-    DriversWindow,
-    CustomersWindow,
-    CarsWindow,
-    MainWindow
-)
+
+# The windows need PyQt6; they are imported on first access so the data
+# layer (and the headless scripts using it) work without Qt installed
+_LAZY_EXPORTS = {
+    'BaseWindow': '.base_window',
+    'BookingsWindow': '.views',
+    'DriversWindow': '.views',
+    'CustomersWindow': '.views',
+    'CarsWindow': '.views',
+    'MainWindow': '.views',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'BaseWindow',
@@ -17,4 +30,3 @@ __all__ = [
     'CarsWindow',
     'MainWindow',
 ]
-
@@ -0,0 +1,102 @@
+"""
+Archival of old bookings for the student taxi booking application.
+
+Completed bookings older than a retention window are moved from the live
+database into an attached archive database (see Database.attach_archive),
+so the live bookings table and its indexes stay small.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .database import Database
+
+
+def archive_completed_bookings(
+    db: Database,
+    older_than_days: int,
+    batch_size: int = 1000,
+    now: Optional[datetime] = None
+) -> int:
+    """
+    Move completed bookings older than the retention window to the archive.
+    
+    Each batch is copied with INSERT ... SELECT and removed from the live
+    tables in its own transaction, so the job can be interrupted safely
+    and never holds the write lock for long. Daily statistics are left
+    untouched: archived bookings still count towards them.
+    
+    Args:
+        db: Database with an archive attached
+        older_than_days: Retention window in days
+        batch_size: Number of bookings moved per transaction
+        now: Reference time (defaults to the current time)
+        
+    Returns:
+        Number of bookings archived
+    """
+    if db.archive_path is None:
+        raise ValueError("No archive attached, call attach_archive() first")
+    
+    now = now or datetime.now()
+    cutoff = (now - timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+    
+    booking_columns = ', '.join(db.table_columns("bookings"))
+    link_columns = ', '.join(db.table_columns("booking_customers"))
+    
+    db.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)")
+    
+    archived = 0
+    while True:
+        with db.transaction(immediate=True):
+            db.execute("DELETE FROM temp.archive_batch")
+            cursor = db.execute(
+                """
+                INSERT INTO temp.archive_batch (id)
+                SELECT id FROM main.bookings
+                WHERE status = 'completed' AND booking_date < ?
+                ORDER BY id
+                LIMIT ?
+                """,
+                (cutoff, batch_size)
+            )
+            moved = cursor.rowcount
+            if moved == 0:
+                break
+            
+            db.execute(
+                f"INSERT OR REPLACE INTO archive.bookings ({booking_columns}) "
+                f"SELECT {booking_columns} FROM main.bookings "
+                f"WHERE id IN (SELECT id FROM temp.archive_batch)"
+            )
+            db.execute(
+                f"INSERT OR REPLACE INTO archive.booking_customers ({link_columns}) "
+                f"SELECT {link_columns} FROM main.booking_customers "
+                f"WHERE booking_id IN (SELECT id FROM temp.archive_batch)"
+            )
+            # The flag stops the statistics and changelog triggers from
+            # treating moved rows as deleted
+            db.execute("INSERT OR IGNORE INTO main.maintenance_flags (name) VALUES ('archiving')")
+            db.execute(
+                "DELETE FROM main.booking_customers "
+                "WHERE booking_id IN (SELECT id FROM temp.archive_batch)"
+            )
+            db.execute(
+                "DELETE FROM main.bookings WHERE id IN (SELECT id FROM temp.archive_batch)"
+            )
+            db.execute("DELETE FROM main.maintenance_flags WHERE name = 'archiving'")
+            
+            # Everything before the cutoff that is completed now lives in the archive
+            db.execute(
+                """
+                INSERT INTO archive.archive_meta (key, value) VALUES ('cutoff', ?)
+                ON CONFLICT (key) DO UPDATE SET value = max(value, excluded.value)
+                """,
+                (cutoff,)
+            )
+        archived += moved
+    
+    # Readers only union the archive once it holds something
+    if archived:
+        db.archive_cutoff = max(db.archive_cutoff or cutoff, cutoff)
+    return archived
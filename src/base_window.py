@@ -15,6 +15,9 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QSize
 from typing import Optional, List
 
+from . import instrumentation
+from .instrumentation import span
+
 
 class BaseWindow(QMainWindow):
     """
@@ -25,6 +28,7 @@ class BaseWindow(QMainWindow):
     - Central widget with layout
     - Button toolbar area
     - Common window functionality
+    - Opt-in tracing of UI work and event-loop stalls (see instrumentation)
     """
     
     def __init__(self, name: str, size: Optional[QSize] = None, parent=None):
@@ -38,6 +42,9 @@ class BaseWindow(QMainWindow):
         """
         super().__init__(parent)
         
+        # Starts tracing on first use if TAXI_TRACE is set
+        instrumentation.configure_from_environment()
+        
         # Set window title
         self.setWindowTitle(name)
         
@@ -62,7 +69,8 @@ class BaseWindow(QMainWindow):
         self.buttons: List[QPushButton] = []
         
         # Initialize UI components (to be overridden by child classes)
-        self._setup_ui()
+        with span("setup_ui", window=name):
+            self._setup_ui()
     
     def _setup_ui(self):
         """
@@ -129,10 +137,11 @@ class BaseWindow(QMainWindow):
         Clear all widgets from the central widget (except toolbar).
         Useful for refreshing the view.
         """
-        while self.main_layout.count():
-            child = self.main_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        with span("clear_central_widget", window=self.windowTitle()):
+            while self.main_layout.count():
+                child = self.main_layout.takeAt(0)
+                if child.widget():
+                    child.widget().deleteLater()
     
     def show(self):
         """Override show to ensure window is displayed properly."""
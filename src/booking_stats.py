@@ -0,0 +1,264 @@
+"""
+Daily booking statistics for the student taxi booking application.
+
+The booking_daily_stats table holds one row per (day, driver, car, status)
+with ride counts and fare, distance and rating sums. It is maintained
+incrementally by triggers on the bookings table (see scripts/init_db.py),
+so per-driver and per-car statistics never need to scan bookings.
+"""
+
+from typing import Optional, List, Dict, Any, Tuple
+
+from .database import Database
+
+
+# Aggregates bookings into booking_daily_stats rows. Shared by the schema
+# backfill and rebuild(). A booking's car is the car recorded on it when it
+# was made, falling back to its driver's current car (0 if the driver has
+# none). Booking dates SQLite cannot parse are counted under day '' rather
+# than rejected. {source} is the bookings table, or a union with the
+# archived bookings.
+BOOKING_STATS_SELECT = """
+    SELECT
+        COALESCE(date(b.booking_date), ''),
+        b.driver_id,
+        COALESCE(b.car_id, d.car_id, 0),
+        COALESCE(b.status, 'pending'),
+        COUNT(*),
+        COALESCE(SUM(b.fare_amount), 0),
+        COALESCE(SUM(b.distance_km), 0),
+        COALESCE(SUM(b.rating), 0),
+        COUNT(b.rating)
+    FROM {source} b
+    LEFT JOIN drivers d ON d.id = b.driver_id
+    GROUP BY 1, 2, 3, 4
+"""
+
+STATS_COLUMNS = (
+    "day, driver_id, car_id, status, rides, "
+    "fare_total, distance_total, rating_total, rating_count"
+)
+
+
+class BookingStats:
+    """
+    Query API over the booking_daily_stats summary table.
+    All queries are answered from the summary table alone.
+    """
+
+    def __init__(self, db: Database):
+        """
+        Initialize the stats API.
+
+        Args:
+            db: Database instance to read from
+        """
+        self.db = db
+
+    def driver_summary(
+        self,
+        driver_id: int,
+        start_day: Optional[str] = None,
+        end_day: Optional[str] = None,
+        status: Optional[str] = "completed"
+    ) -> Dict[str, Any]:
+        """
+        Totals for one driver over an optional day range.
+
+        Args:
+            driver_id: Driver ID
+            start_day: Optional first day, inclusive (YYYY-MM-DD)
+            end_day: Optional last day, inclusive (YYYY-MM-DD)
+            status: Booking status to count, or None for all statuses
+
+        Returns:
+            Dictionary with rides, revenue, distance_km and average_rating
+        """
+        return self._summary("driver_id", driver_id, start_day, end_day, status)
+
+    def car_summary(
+        self,
+        car_id: int,
+        start_day: Optional[str] = None,
+        end_day: Optional[str] = None,
+        status: Optional[str] = "completed"
+    ) -> Dict[str, Any]:
+        """
+        Totals for one car over an optional day range.
+
+        Args:
+            car_id: Car ID
+            start_day: Optional first day, inclusive (YYYY-MM-DD)
+            end_day: Optional last day, inclusive (YYYY-MM-DD)
+            status: Booking status to count, or None for all statuses
+
+        Returns:
+            Dictionary with rides, revenue, distance_km and average_rating
+        """
+        return self._summary("car_id", car_id, start_day, end_day, status)
+
+    def daily_by_driver(
+        self,
+        start_day: Optional[str] = None,
+        end_day: Optional[str] = None,
+        status: Optional[str] = "completed"
+    ) -> List[Dict[str, Any]]:
+        """
+        Revenue and rides per driver per day.
+
+        Args:
+            start_day: Optional first day, inclusive (YYYY-MM-DD)
+            end_day: Optional last day, inclusive (YYYY-MM-DD)
+            status: Booking status to count, or None for all statuses
+
+        Returns:
+            List of dictionaries ordered by day and driver
+        """
+        return self._grouped("driver_id", start_day, end_day, status)
+
+    def daily_by_car(
+        self,
+        start_day: Optional[str] = None,
+        end_day: Optional[str] = None,
+        status: Optional[str] = "completed"
+    ) -> List[Dict[str, Any]]:
+        """
+        Revenue and rides per car per day.
+
+        Args:
+            start_day: Optional first day, inclusive (YYYY-MM-DD)
+            end_day: Optional last day, inclusive (YYYY-MM-DD)
+            status: Booking status to count, or None for all statuses
+
+        Returns:
+            List of dictionaries ordered by day and car
+        """
+        return self._grouped("car_id", start_day, end_day, status)
+
+    def rebuild(self) -> int:
+        """
+        Recompute the whole summary table from bookings in one transaction.
+        Use after bulk loads or to correct drift.
+        Archived bookings are included when an archive is attached.
+
+        Returns:
+            Number of summary rows written
+        """
+        source = "main.bookings"
+        if self.db.archive_path is not None:
+            source = (
+                "(SELECT booking_date, driver_id, car_id, status, fare_amount, distance_km, rating "
+                "FROM main.bookings UNION ALL "
+                "SELECT booking_date, driver_id, car_id, status, fare_amount, distance_km, rating "
+                "FROM archive.bookings)"
+            )
+
+        select = BOOKING_STATS_SELECT.format(source=source)
+        with self.db.transaction():
+            self.db.execute("DELETE FROM booking_daily_stats")
+            cursor = self.db.execute(
+                f"INSERT INTO booking_daily_stats ({STATS_COLUMNS}) {select}"
+            )
+        return cursor.rowcount
+
+    @staticmethod
+    def _filters(
+        start_day: Optional[str],
+        end_day: Optional[str],
+        status: Optional[str]
+    ) -> Tuple[List[str], List[Any]]:
+        """Build WHERE fragments and parameters for the common filters."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if start_day is not None:
+            clauses.append("day >= ?")
+            params.append(start_day)
+        if end_day is not None:
+            clauses.append("day <= ?")
+            params.append(end_day)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        return clauses, params
+
+    def _summary(
+        self,
+        column: str,
+        entity_id: int,
+        start_day: Optional[str],
+        end_day: Optional[str],
+        status: Optional[str]
+    ) -> Dict[str, Any]:
+        """Aggregate the summary rows of a single driver or car."""
+        clauses, params = self._filters(start_day, end_day, status)
+        clauses.insert(0, f"{column} = ?")
+        params.insert(0, entity_id)
+
+        query = f"""
+            SELECT
+                COALESCE(SUM(rides), 0) AS rides,
+                COALESCE(SUM(fare_total), 0) AS revenue,
+                COALESCE(SUM(distance_total), 0) AS distance_km,
+                COALESCE(SUM(rating_total), 0) AS rating_total,
+                COALESCE(SUM(rating_count), 0) AS rating_count
+            FROM booking_daily_stats
+            WHERE {' AND '.join(clauses)}
+        """
+        row = dict(self.db.execute(query, tuple(params)).fetchone())
+        return self._with_average(row)
+
+    def _grouped(
+        self,
+        column: str,
+        start_day: Optional[str],
+        end_day: Optional[str],
+        status: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Aggregate summary rows per day and driver or car."""
+        clauses, params = self._filters(start_day, end_day, status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        query = f"""
+            SELECT
+                day,
+                {column},
+                SUM(rides) AS rides,
+                SUM(fare_total) AS revenue,
+                SUM(distance_total) AS distance_km,
+                SUM(rating_total) AS rating_total,
+                SUM(rating_count) AS rating_count
+            FROM booking_daily_stats
+            {where}
+            GROUP BY day, {column}
+            ORDER BY day, {column}
+        """
+        cursor = self.db.execute(query, tuple(params))
+        return [self._with_average(dict(row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _with_average(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace rating sums with an average rating."""
+        rating_total = row.pop("rating_total")
+        rating_count = row.pop("rating_count")
+        row["average_rating"] = rating_total / rating_count if rating_count else None
+        return row
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """
+    Format a driver_summary()/car_summary() result for display.
+
+    Args:
+        summary: Summary dictionary
+
+    Returns:
+        Multi-line human readable text
+    """
+    rating = summary["average_rating"]
+    rating_text = f"{rating:.2f}" if rating is not None else "n/a"
+    return (
+        f"  Rides: {summary['rides']}\n"
+        f"  Revenue: {summary['revenue']:.2f}\n"
+        f"  Distance: {summary['distance_km']:.1f} km\n"
+        f"  Average rating: {rating_text}"
+    )
@@ -0,0 +1,124 @@
+"""
+In-process change bus for the student taxi booking application.
+
+Bridges Database change listeners to a Qt signal, so a write made in one
+window reaches every open window as (table, operation, ids). The shared
+RowCache is brought up to date before the signal is emitted, so windows
+only need to patch the affected rows instead of reloading.
+"""
+
+from typing import Optional, List, Dict, Any, Callable, Set, Tuple
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtWidgets import QListWidget, QListWidgetItem
+
+from .database import Database, MAX_VARIABLES
+from .row_cache import RowCache
+
+
+class ChangeBus(QObject):
+    """
+    Qt signal source for database writes.
+
+    Example:
+        bus = ChangeBus(db)
+        bus.changed.connect(window.on_data_changed)
+    """
+
+    # (table, operation, ids) where operation is "insert", "update" or
+    # "delete"; ids is empty if the written records are unknown
+    changed = pyqtSignal(str, str, list)
+
+    def __init__(self, db: Database, cache: Optional[RowCache] = None, parent=None):
+        """
+        Start listening to writes made through db.
+
+        Args:
+            db: Database instance to observe
+            cache: Shared row cache (created if not provided)
+            parent: Optional parent QObject
+        """
+        super().__init__(parent)
+        self.db = db
+        self.cache = cache if cache is not None else RowCache(db)
+        db.add_listener(self._on_change)
+
+    def close(self):
+        """Stop listening to database writes."""
+        self.db.remove_listener(self._on_change)
+
+    def _on_change(self, table: str, operation: str, ids: List[int]):
+        """Update the shared cache, then tell the windows."""
+        self.cache.apply(table, operation, ids)
+        self.changed.emit(table, operation, list(ids))
+
+
+def patch_list_widget(
+    list_widget: QListWidget,
+    cache: RowCache,
+    table: str,
+    operation: str,
+    ids: List[int],
+    label: Callable[[Dict[str, Any]], str]
+):
+    """
+    Apply a reported write to a list whose items carry record IDs (UserRole).
+
+    Changed items are relabelled, deleted ones removed and inserted records
+    added, all from the shared cache; the list is re-sorted by label.
+
+    Args:
+        list_widget: List to patch
+        cache: Shared row cache (already up to date)
+        table: Table the list shows
+        operation: "insert", "update" or "delete"
+        ids: IDs of the written records
+        label: Builds an item's text from its row
+    """
+    wanted = set(ids)
+    for position in reversed(range(list_widget.count())):
+        item = list_widget.item(position)
+        record_id = item.data(Qt.ItemDataRole.UserRole)
+        if record_id not in wanted:
+            continue
+        wanted.discard(record_id)
+        record = None if operation == "delete" else cache.get(table, record_id)
+        if record is None:
+            list_widget.takeItem(position)
+        else:
+            item.setText(label(record))
+
+    if operation == "insert":
+        for record_id, record in cache.get_many(table, wanted).items():
+            item = QListWidgetItem(label(record))
+            item.setData(Qt.ItemDataRole.UserRole, record_id)
+            list_widget.addItem(item)
+    if operation != "delete":
+        list_widget.sortItems()
+
+
+def booking_owners(db: Database, ids: List[int]) -> Tuple[Set[int], Set[int]]:
+    """
+    Drivers and cars of written bookings, as they are now.
+
+    Args:
+        db: Database instance to read from
+        ids: IDs of the written bookings
+
+    Returns:
+        (driver IDs, car IDs)
+    """
+    drivers: Set[int] = set()
+    cars: Set[int] = set()
+    for start in range(0, len(ids), MAX_VARIABLES):
+        chunk = ids[start:start + MAX_VARIABLES]
+        placeholders = ', '.join('?' for _ in chunk)
+        cursor = db.execute(
+            f"SELECT driver_id, car_id FROM bookings WHERE id IN ({placeholders})",
+            tuple(chunk)
+        )
+        for row in cursor.fetchall():
+            drivers.add(row["driver_id"])
+            if row["car_id"]:
+                cars.add(row["car_id"])
+    return drivers, cars
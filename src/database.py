@@ -5,12 +5,29 @@ Uses SQLite3 for data persistence.
 
 import sqlite3
 import os
-from typing import Optional, List, Dict, Any, Tuple
+import time
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Tuple, Iterator, Callable
 from pathlib import Path
 
 # CRUD
 # Create, Read (One, Many, All), Update, Delete
 
+# Change listener signature: (table, operation, ids) where operation is
+# "insert", "update" or "delete"
+ChangeListener = Callable[[str, str, List[int]], None]
+
+# Tables moved to the attached archive database by the archival job
+ARCHIVE_TABLES = ("bookings", "booking_customers")
+
+# Oldest supported SQLite: the bulk writes, the dispatch queue and customer
+# merging read back the rows they change with RETURNING (3.35)
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+# Bound variables per statement. SQLite 3.35 allows 32766 by default, but
+# builds can lower the limit (SQLITE_MAX_VARIABLE_NUMBER); 999 fits any build
+MAX_VARIABLES = 999
+
 
 class Database:
     """
@@ -18,24 +35,53 @@ class Database:
     Provides CRUD methods for database interactions.
     """
     
-    def __init__(self, db_name: str = "taxi_booking.db"):
+    def __init__(self, db_name: str = "taxi_booking.db", timeout: float = 5.0):
         """
         Initialize the database connection.
         
         Args:
-            db_name: Name of the database file (default: taxi_booking.db)
+            db_name: Name of the database file (default: taxi_booking.db),
+                or ":memory:" for an ephemeral in-memory database
+            timeout: Seconds to wait for a lock held by another connection
+                before raising "database is locked" (default: 5.0)
+        
+        Raises:
+            RuntimeError: If the SQLite library is older than MIN_SQLITE_VERSION
         """
-        # Get the root directory (parent of src)
-        root_dir = Path(__file__).parent.parent
-        self.db_path = root_dir / db_name
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required, "
+                f"found {sqlite3.sqlite_version}"
+            )
+        if db_name == ":memory:":
+            self.db_path = db_name
+        else:
+            # Get the root directory (parent of src)
+            root_dir = Path(__file__).parent.parent
+            self.db_path = root_dir / db_name
+        self.timeout = timeout
         self.connection: Optional[sqlite3.Connection] = None
+        # Number of statements issued through this instance (see count_queries)
+        self.query_count = 0
+        # Nesting depth of transaction() blocks; commits are deferred while > 0
+        self._transaction_depth = 0
+        # Attached archive database (see attach_archive)
+        self.archive_path: Optional[Path] = None
+        self.archive_cutoff: Optional[str] = None
+        # Callbacks notified after committed writes (see add_listener)
+        self._listeners: List[ChangeListener] = []
+        self._pending_changes: List[Tuple[str, str, List[int]]] = []
+        # Optional query plan auditor (see src/query_audit.py)
+        self.auditor = None
         self._connect()
     
     def _connect(self):
         """Establish connection to the database."""
         try:
-            self.connection = sqlite3.connect(str(self.db_path))
+            self.connection = sqlite3.connect(str(self.db_path), timeout=self.timeout)
             self.connection.row_factory = sqlite3.Row  # Return rows as dictionaries
+            if self.archive_path is not None:
+                self._attach_archive()
         except sqlite3.Error as e:
             print(f"Error connecting to database: {e}")
             raise
@@ -65,15 +111,20 @@ class Database:
             Cursor object
         """
         self._ensure_connection()
+        if self.auditor is not None:
+            self.auditor.record(query)
         try:
+            self.query_count += 1
             if params:
                 cursor = self.connection.execute(query, params)
             else:
                 cursor = self.connection.execute(query)
-            self.connection.commit()
+            if not self._transaction_depth:
+                self.connection.commit()
             return cursor
         except sqlite3.Error as e:
-            self.connection.rollback()
+            if not self._transaction_depth:
+                self.connection.rollback()
             print(f"Error executing query: {e}")
             raise
     
@@ -93,15 +144,134 @@ class Database:
             Cursor object
         """
         self._ensure_connection()
+        if self.auditor is not None:
+            self.auditor.record(query)
         try:
+            self.query_count += 1
             cursor = self.connection.executemany(query, params_list)
+            if not self._transaction_depth:
+                self.connection.commit()
+            return cursor
+        except sqlite3.Error as e:
+            if not self._transaction_depth:
+                self.connection.rollback()
+            print(f"Error executing query: {e}")
+            raise
+    
+    def executescript(self, script: str) -> sqlite3.Cursor:
+        """
+        Execute a multi-statement SQL script.
+        
+        The script controls its own transactions (e.g. BEGIN ... COMMIT);
+        any transaction left open by a failing statement is rolled back.
+        
+        Args:
+            script: SQL script with one or more statements
+            
+        Returns:
+            Cursor object
+        """
+        self._ensure_connection()
+        try:
+            self.query_count += 1
+            cursor = self.connection.executescript(script)
             self.connection.commit()
             return cursor
         except sqlite3.Error as e:
             self.connection.rollback()
-            print(f"Error executing query: {e}")
+            print(f"Error executing script: {e}")
             raise
     
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """
+        Group several operations into a single transaction.
+        
+        Statements issued inside the block are committed together when it
+        exits, or rolled back if it raises. Nested blocks join the
+        outermost transaction.
+        
+        Example:
+            with db.transaction():
+                db.create("bookings", booking)
+                db.update("cars", car_id, {"total_rides": rides})
+        
+        Args:
+            immediate: If True, take the write lock up front (BEGIN IMMEDIATE)
+        """
+        self._ensure_connection()
+        if self._transaction_depth == 0:
+            self.connection.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.connection.rollback()
+                self._pending_changes.clear()
+            raise
+        else:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                try:
+                    self.connection.commit()
+                except BaseException:
+                    # Do not leave the connection inside a failed transaction
+                    self.connection.rollback()
+                    self._pending_changes.clear()
+                    raise
+                self._flush_changes()
+    
+    def add_listener(self, listener: ChangeListener):
+        """
+        Register a callback notified after writes made through this instance.
+        
+        The callback receives (table, operation, ids), where operation is
+        "insert", "update" or "delete". Writes inside transaction() are
+        reported once the transaction commits, and dropped on rollback.
+        
+        Args:
+            listener: Callback to register
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: ChangeListener):
+        """
+        Unregister a change callback.
+        
+        Args:
+            listener: Callback to remove
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def notify_changed(self, table: str, operation: str, ids: List[int]):
+        """
+        Report a write to the change listeners.
+        
+        create(), update(), delete() and the batch methods report their own
+        writes; call this after writing through execute() or executemany().
+        Inside transaction() the report is held until the commit.
+        
+        Args:
+            table: Table written to
+            operation: "insert", "update" or "delete"
+            ids: IDs of the written records (empty if unknown)
+        """
+        if not self._listeners:
+            return
+        self._pending_changes.append((table, operation, ids))
+        if not self._transaction_depth:
+            self._flush_changes()
+    
+    def _flush_changes(self):
+        """Deliver queued change notifications."""
+        changes, self._pending_changes = self._pending_changes, []
+        for table, operation, ids in changes:
+            for listener in list(self._listeners):
+                listener(table, operation, ids)
+    
     def create(
         self, 
         table: str, 
@@ -123,6 +293,7 @@ class Database:
         params = tuple(data.values())
         
         cursor = self.execute(query, params)
+        self.notify_changed(table, "insert", [cursor.lastrowid])
         return cursor.lastrowid
     
     def read_all(
@@ -157,6 +328,30 @@ class Database:
         rows = cursor.fetchall()
         return [dict(row) for row in rows]
     
+    def iter_batches(
+        self, 
+        query: str, 
+        params: Optional[Tuple] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[sqlite3.Row]]:
+        """
+        Stream the results of a query in batches instead of loading them all.
+        
+        Args:
+            query: SQL query string
+            params: Optional tuple of parameters for parameterized queries
+            batch_size: Number of rows fetched per batch
+            
+        Yields:
+            Lists of up to batch_size rows
+        """
+        cursor = self.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    
     def read_one(
         self, 
         table: str, 
@@ -174,7 +369,7 @@ class Database:
         Returns:
             Dictionary representing the row, or None if not found
         """
-        query = f"SELECT * FROM {table}"
+        query = "SELECT * FROM {source}"
         params = None
         
         if record_id is not None:
@@ -189,10 +384,69 @@ class Database:
         
         query += " LIMIT 1"
         
-        cursor = self.execute(query, params)
+        cursor = self.execute(query.format(source=table), params)
         row = cursor.fetchone()
+        
+        # Archived records are only looked up when the live table misses
+        if row is None and table in ARCHIVE_TABLES and self.archive_cutoff is not None:
+            cursor = self.execute(query.format(source=f"archive.{table}"), params)
+            row = cursor.fetchone()
+        
         return dict(row) if row else None
     
+    def read_bookings(
+        self, 
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        conditions: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read bookings within a booking_date range.
+        
+        If an archive is attached and the range reaches back before the
+        archive cutoff, archived bookings are included via UNION ALL;
+        otherwise only the live table is queried.
+        
+        Args:
+            start: Optional lower bound on booking_date, inclusive
+            end: Optional upper bound on booking_date, exclusive
+            conditions: Optional dictionary of column:value pairs for WHERE clause
+            order_by: Optional ORDER BY clause (e.g., "booking_date DESC")
+            
+        Returns:
+            List of dictionaries representing rows
+        """
+        clauses = []
+        params: List[Any] = []
+        if start is not None:
+            clauses.append("booking_date >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("booking_date < ?")
+            params.append(end)
+        if conditions:
+            clauses.extend(f"{key} = ?" for key in conditions.keys())
+            params.extend(conditions.values())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        if self.archive_cutoff is not None and (start is None or start < self.archive_cutoff):
+            columns = ', '.join(self.table_columns("bookings"))
+            query = (
+                f"SELECT {columns} FROM main.bookings{where} "
+                f"UNION ALL "
+                f"SELECT {columns} FROM archive.bookings{where}"
+            )
+            params = params + params
+        else:
+            query = f"SELECT * FROM main.bookings{where}"
+        
+        if order_by:
+            query = f"SELECT * FROM ({query}) ORDER BY {order_by}"
+        
+        cursor = self.execute(query, tuple(params))
+        return [dict(row) for row in cursor.fetchall()]
+    
     def update(
         self, 
         table: str, 
@@ -218,6 +472,8 @@ class Database:
         params = tuple(data.values()) + (record_id,)
         
         cursor = self.execute(query, params)
+        if cursor.rowcount > 0:
+            self.notify_changed(table, "update", [record_id])
         return cursor.rowcount > 0
     
     def delete(
@@ -239,8 +495,129 @@ class Database:
         params = (record_id,)
         
         cursor = self.execute(query, params)
+        if cursor.rowcount > 0:
+            self.notify_changed(table, "delete", [record_id])
         return cursor.rowcount > 0
     
+    def update_where(
+        self, 
+        table: str, 
+        data: Dict[str, Any],
+        conditions: Optional[Dict[str, Any]] = None,
+        where: Optional[str] = None,
+        params: Optional[Tuple] = None
+    ) -> int:
+        """
+        Update every record matching a predicate with one statement.
+        
+        Args:
+            table: Table name
+            data: Dictionary of column names and new values
+            conditions: Optional dictionary of column:value pairs for WHERE clause
+            where: Optional extra SQL condition (e.g., "booking_date < ?")
+            params: Parameters for the placeholders in `where`
+            
+        Returns:
+            Number of records updated
+        """
+        if not data:
+            return 0
+        
+        clauses = []
+        values: List[Any] = list(data.values())
+        if conditions:
+            clauses.extend(f"{key} = ?" for key in conditions.keys())
+            values.extend(conditions.values())
+        if where:
+            clauses.append(f"({where})")
+            values.extend(params or ())
+        
+        set_clause = ', '.join([f"{key} = ?" for key in data.keys()])
+        query = f"UPDATE {table} SET {set_clause}"
+        if clauses:
+            query += f" WHERE {' AND '.join(clauses)}"
+        query += " RETURNING id"
+        
+        with self.transaction(immediate=True):
+            ids = [row[0] for row in self.execute(query, tuple(values)).fetchall()]
+            if ids:
+                self.notify_changed(table, "update", ids)
+        return len(ids)
+    
+    def update_many(
+        self, 
+        table: str, 
+        record_ids: List[int],
+        data: Dict[str, Any]
+    ) -> int:
+        """
+        Apply the same change to many records in one transaction.
+        
+        Args:
+            table: Table name
+            record_ids: IDs of the records to update
+            data: Dictionary of column names and new values
+            
+        Returns:
+            Number of records updated
+        """
+        if not data or not record_ids:
+            return 0
+        
+        set_clause = ', '.join([f"{key} = ?" for key in data.keys()])
+        updated: List[int] = []
+        with self.transaction(immediate=True):
+            for chunk in self._id_chunks(record_ids, reserved=len(data)):
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor = self.execute(
+                    f"UPDATE {table} SET {set_clause} "
+                    f"WHERE id IN ({placeholders}) RETURNING id",
+                    tuple(data.values()) + tuple(chunk)
+                )
+                updated.extend(row[0] for row in cursor.fetchall())
+            if updated:
+                self.notify_changed(table, "update", updated)
+        return len(updated)
+    
+    def delete_many(
+        self, 
+        table: str, 
+        record_ids: List[int]
+    ) -> int:
+        """
+        Delete many records in one transaction.
+        
+        Args:
+            table: Table name
+            record_ids: IDs of the records to delete
+            
+        Returns:
+            Number of records deleted
+        """
+        if not record_ids:
+            return 0
+        
+        deleted: List[int] = []
+        with self.transaction(immediate=True):
+            for chunk in self._id_chunks(record_ids):
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor = self.execute(
+                    f"DELETE FROM {table} WHERE id IN ({placeholders}) RETURNING id",
+                    tuple(chunk)
+                )
+                deleted.extend(row[0] for row in cursor.fetchall())
+            if deleted:
+                self.notify_changed(table, "delete", deleted)
+        return len(deleted)
+    
+    @staticmethod
+    def _id_chunks(record_ids: List[int], reserved: int = 0) -> Iterator[List[int]]:
+        """Split IDs into lists that fit in one statement next to `reserved` other variables."""
+        record_ids = list(dict.fromkeys(record_ids))
+        size = MAX_VARIABLES - reserved
+        for start in range(0, len(record_ids), size):
+            yield record_ids[start:start + size]
+    
     def create_table(self, table_name: str, schema: str):
         """
         Create a table with the specified schema.
@@ -269,6 +646,149 @@ class Database:
         cursor = self.execute(query, (table_name,))
         return cursor.fetchone() is not None
     
+    def attach_archive(self, archive_name: str = "taxi_booking_archive.db"):
+        """
+        Attach an archive database holding old bookings.
+        
+        The archive tables are created on first use and kept in step with
+        columns added to the live tables.
+        
+        Args:
+            archive_name: Name of the archive database file
+        """
+        root_dir = Path(__file__).parent.parent
+        self.archive_path = root_dir / archive_name
+        self._ensure_connection()
+        self._attach_archive()
+    
+    def _attach_archive(self):
+        """Attach the archive database and make sure its tables exist."""
+        connection = self.connection
+        attached = {row[1] for row in connection.execute("PRAGMA database_list")}
+        if "archive" not in attached:
+            connection.execute("ATTACH DATABASE ? AS archive", (str(self.archive_path),))
+        
+        for table in ARCHIVE_TABLES:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS archive.{table} AS SELECT * FROM main.{table} WHERE 0"
+            )
+            # Columns added to the live table since the archive was created
+            archive_columns = set(self.table_columns(table, "archive"))
+            for row in connection.execute(f"PRAGMA main.table_info({table})"):
+                if row[1] not in archive_columns:
+                    connection.execute(f"ALTER TABLE archive.{table} ADD COLUMN {row[1]} {row[2]}")
+        
+        connection.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_archive_bookings_id ON bookings(id)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS archive.idx_archive_bookings_booking_date ON bookings(booking_date)"
+        )
+        # UNIQUE(booking_id, customer_id) of the live table, which CREATE
+        # TABLE ... AS does not copy; duplicates from before it are dropped
+        has_unique = connection.execute(
+            "SELECT 1 FROM archive.sqlite_master "
+            "WHERE name = 'idx_archive_booking_customers_link'"
+        ).fetchone()
+        if not has_unique:
+            connection.execute(
+                "DELETE FROM archive.booking_customers WHERE rowid NOT IN ("
+                "SELECT min(rowid) FROM archive.booking_customers GROUP BY booking_id, customer_id)"
+            )
+            connection.execute("DROP INDEX IF EXISTS archive.idx_archive_booking_customers_booking_id")
+            connection.execute(
+                "CREATE UNIQUE INDEX archive.idx_archive_booking_customers_link "
+                "ON booking_customers(booking_id, customer_id)"
+            )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS archive.archive_meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        connection.commit()
+        
+        row = connection.execute(
+            "SELECT value FROM archive.archive_meta WHERE key = 'cutoff'"
+        ).fetchone()
+        self.archive_cutoff = row[0] if row else None
+    
+    def detach_archive(self):
+        """Detach the archive database."""
+        if self.connection and self.archive_path is not None:
+            self.connection.execute("DETACH DATABASE archive")
+        self.archive_path = None
+        self.archive_cutoff = None
+    
+    def table_columns(self, table: str, schema: str = "main") -> List[str]:
+        """
+        Get the column names of a table.
+        
+        Args:
+            table: Table name
+            schema: Schema name ("main" or "archive")
+            
+        Returns:
+            List of column names in declaration order
+        """
+        cursor = self.connection.execute(f"PRAGMA {schema}.table_info({table})")
+        return [row[1] for row in cursor.fetchall()]
+    
+    def backup_to(
+        self, 
+        target: "str | Path | sqlite3.Connection",
+        pages: int = 64,
+        sleep: float = 0.005,
+        progress: Optional[Callable[[int, int], None]] = None
+    ):
+        """
+        Copy the database online using the SQLite backup API.
+        
+        Pages are copied in small steps with a pause between steps, so
+        other work on the database is never blocked for long. File targets
+        are written to a temporary file first and renamed into place when
+        the copy is complete.
+        
+        Args:
+            target: Destination file path, or an open connection
+                (e.g. an in-memory replica)
+            pages: Pages copied per step (0 or less copies everything at once)
+            sleep: Seconds to pause between steps
+            progress: Optional callback receiving (remaining, total) pages
+        """
+        self._ensure_connection()
+        
+        def on_step(status, remaining, total):
+            if progress:
+                progress(remaining, total)
+            if remaining and sleep > 0:
+                time.sleep(sleep)
+        
+        if isinstance(target, sqlite3.Connection):
+            self.connection.backup(target, pages=pages, progress=on_step)
+            return
+        
+        target_path = Path(target)
+        temp_path = target_path.with_name(target_path.name + ".partial")
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        destination = sqlite3.connect(str(temp_path))
+        try:
+            self.connection.backup(destination, pages=pages, progress=on_step)
+        finally:
+            destination.close()
+        os.replace(temp_path, target_path)
+    
+    def count_queries(self) -> "QueryCounter":
+        """
+        Count the statements issued while the returned context is active.
+        
+        Example:
+            with db.count_queries() as counter:
+                model.fetch_page()
+            counter.assert_at_most(1)
+        
+        Returns:
+            QueryCounter context manager
+        """
+        return QueryCounter(self)
+    
     def close(self):
         """Close the database connection."""
         if self.connection:
@@ -283,3 +803,52 @@ class Database:
         """Context manager exit."""
         self.close()
 
+
+
+class QueryCounter:
+    """
+    Context manager counting statements issued through a Database.
+    Used to prove that read paths do not degrade into N+1 queries.
+    """
+    
+    def __init__(self, db: Database):
+        """
+        Initialize the counter.
+        
+        Args:
+            db: Database instance to observe
+        """
+        self.db = db
+        self._start = 0
+        self._end: Optional[int] = None
+    
+    @property
+    def count(self) -> int:
+        """Number of statements issued so far (or inside the block once exited)."""
+        end = self._end if self._end is not None else self.db.query_count
+        return end - self._start
+    
+    def assert_at_most(self, limit: int):
+        """
+        Assert that no more than `limit` statements were issued.
+        
+        Args:
+            limit: Maximum allowed number of statements
+            
+        Raises:
+            AssertionError: If more statements were issued
+        """
+        if self.count > limit:
+            raise AssertionError(
+                f"Expected at most {limit} queries, but {self.count} were issued"
+            )
+    
+    def __enter__(self):
+        """Start counting."""
+        self._start = self.db.query_count
+        self._end = None
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Stop counting."""
+        self._end = self.db.query_count
@@ -0,0 +1,226 @@
+"""
+Booking demand analytics for the student taxi booking application.
+
+Builds demand by hour and by map cell for dispatch planning. Only the
+needed columns (pickup time as a Unix epoch and pickup coordinates) are
+streamed from SQLite in batches into NumPy arrays and aggregated with
+vectorized operations, so millions of bookings never become Python
+dictionaries. Reports are cached per date range.
+"""
+
+import itertools
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Tuple, NamedTuple
+
+import numpy as np
+
+from .database import Database, MAX_VARIABLES
+
+
+# (min latitude, max latitude, min longitude, max longitude) of the service area
+DEFAULT_BOUNDS = (43.55, 43.90, -79.70, -79.10)
+
+# Missing coordinates are read as infinity (an overflowing SQL literal) and
+# masked out, so every batch converts to one float array
+_NO_COORDINATE = "9e999"
+
+_DEMAND_COLUMNS = f"""
+    SELECT
+        CAST(strftime('%s', booking_date) AS INTEGER),
+        COALESCE(pickup_latitude, {_NO_COORDINATE}),
+        COALESCE(pickup_longitude, {_NO_COORDINATE})
+    FROM {{source}}
+    WHERE booking_date >= ? AND booking_date < ?
+"""
+
+
+def to_epoch(value: str) -> int:
+    """Unix time of a booking_date-style string, read as UTC like strftime('%s')."""
+    parsed = datetime.fromisoformat(value)
+    return int((parsed - datetime(1970, 1, 1)).total_seconds())
+
+
+def rolling_mean(series: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing moving average.
+
+    Args:
+        series: 1-D array
+        window: Number of samples averaged
+
+    Returns:
+        Array of the same length; the first window - 1 values are NaN
+    """
+    result = np.full(len(series), np.nan)
+    if window <= 0 or len(series) < window:
+        return result
+    sums = np.cumsum(np.concatenate(([0.0], series.astype(float))))
+    result[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return result
+
+
+class DemandReport(NamedTuple):
+    """Booking demand within a date range."""
+    start: str
+    end: str
+    hour_starts: np.ndarray     # Unix time of each hourly bucket
+    hourly: np.ndarray          # Bookings per hour
+    by_hour_of_day: np.ndarray  # Bookings per hour of day (24 values)
+    heatmap: np.ndarray         # Pickups per (latitude row, longitude column) cell
+    lat_edges: np.ndarray
+    lon_edges: np.ndarray
+    total: int
+
+    def rolling(self, hours: int = 24) -> np.ndarray:
+        """Trailing average of hourly demand over the given number of hours."""
+        return rolling_mean(self.hourly, hours)
+
+
+class DemandAnalytics:
+    """
+    Hourly demand series and pickup heatmaps, cached per date range.
+
+    Example:
+        analytics = DemandAnalytics(db)
+        report = analytics.report("2024-01-01", "2024-01-08")
+        busiest_hour = report.by_hour_of_day.argmax()
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        bounds: Tuple[float, float, float, float] = DEFAULT_BOUNDS,
+        cells: Tuple[int, int] = (60, 80),
+        batch_size: int = 50000,
+        max_entries: int = 16,
+        listen: bool = True
+    ):
+        """
+        Initialize the analytics.
+
+        Args:
+            db: Database instance to read from
+            bounds: Heatmap area (min lat, max lat, min lon, max lon)
+            cells: Heatmap size as (latitude rows, longitude columns)
+            batch_size: Rows converted to arrays at a time
+            max_entries: Reports kept in the cache
+            listen: Invalidate cached reports on booking writes made through db
+        """
+        self.db = db
+        self.bounds = bounds
+        self.cells = cells
+        self.batch_size = batch_size
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, str], DemandReport]" = OrderedDict()
+        if listen:
+            db.add_listener(self._on_change)
+
+    def close(self):
+        """Stop listening to database writes."""
+        self.db.remove_listener(self._on_change)
+
+    def report(self, start: str, end: str) -> DemandReport:
+        """
+        Demand between two dates.
+
+        Args:
+            start: Lower bound on booking_date, inclusive (e.g. "2024-01-01")
+            end: Upper bound on booking_date, exclusive
+
+        Returns:
+            DemandReport (cached until bookings in the range change)
+        """
+        key = (start, end)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        report = self._compute(start, end)
+        self._cache[key] = report
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return report
+
+    def invalidate(self):
+        """Drop all cached reports."""
+        self._cache.clear()
+
+    def _compute(self, start: str, end: str) -> DemandReport:
+        """Stream the range and aggregate it batch by batch."""
+        first_hour = to_epoch(start) // 3600
+        hour_count = max(0, -(-to_epoch(end) // 3600) - first_hour)
+        hourly = np.zeros(hour_count, dtype=np.int64)
+        by_hour_of_day = np.zeros(24, dtype=np.int64)
+
+        lat_min, lat_max, lon_min, lon_max = self.bounds
+        lat_edges = np.linspace(lat_min, lat_max, self.cells[0] + 1)
+        lon_edges = np.linspace(lon_min, lon_max, self.cells[1] + 1)
+        heatmap = np.zeros(self.cells, dtype=np.int64)
+        total = 0
+
+        for query in self._queries(start):
+            for batch in self.db.iter_batches(query, (start, end), self.batch_size):
+                columns = np.fromiter(
+                    itertools.chain.from_iterable(batch),
+                    dtype=np.float64,
+                    count=3 * len(batch)
+                ).reshape(-1, 3)
+                epochs = columns[:, 0].astype(np.int64)
+                total += len(epochs)
+
+                hours = epochs // 3600
+                hourly += np.bincount(hours - first_hour, minlength=hour_count)[:hour_count]
+                by_hour_of_day += np.bincount(hours % 24, minlength=24)
+
+                placed = np.isfinite(columns[:, 1]) & np.isfinite(columns[:, 2])
+                counts, _, _ = np.histogram2d(
+                    columns[placed, 1], columns[placed, 2], bins=(lat_edges, lon_edges)
+                )
+                heatmap += counts.astype(np.int64)
+
+        return DemandReport(
+            start=start,
+            end=end,
+            hour_starts=(first_hour + np.arange(hour_count)) * 3600,
+            hourly=hourly,
+            by_hour_of_day=by_hour_of_day,
+            heatmap=heatmap,
+            lat_edges=lat_edges,
+            lon_edges=lon_edges,
+            total=total,
+        )
+
+    def _queries(self, start: str) -> List[str]:
+        """Column queries for the live table and, if the range reaches it, the archive."""
+        queries = [_DEMAND_COLUMNS.format(source="main.bookings")]
+        if self.db.archive_cutoff is not None and start < self.db.archive_cutoff:
+            queries.append(_DEMAND_COLUMNS.format(source="archive.bookings"))
+        return queries
+
+    def _on_change(self, table: str, operation: str, ids: List[int]):
+        """Drop cached reports whose range a booking write touched."""
+        if table != "bookings" or not self._cache:
+            return
+        if operation != "insert" or not ids:
+            # The previous booking dates are unknown
+            self._cache.clear()
+            return
+
+        first, last = None, None
+        for start in range(0, len(ids), MAX_VARIABLES):
+            chunk = ids[start:start + MAX_VARIABLES]
+            placeholders = ', '.join('?' for _ in chunk)
+            row = self.db.execute(
+                f"SELECT MIN(booking_date), MAX(booking_date) FROM bookings "
+                f"WHERE id IN ({placeholders})",
+                tuple(chunk)
+            ).fetchone()
+            if row[0] is not None:
+                first = row[0] if first is None else min(first, row[0])
+                last = row[1] if last is None else max(last, row[1])
+        if first is None:
+            return
+        for start, end in list(self._cache):
+            if start <= last and first < end:
+                del self._cache[(start, end)]
@@ -0,0 +1,195 @@
+"""
+Dispatch queue for the student taxi booking application.
+
+Pending bookings form a work queue for dispatchers. A worker claims the
+oldest pending bookings for a limited time (a lease); if it does not
+finish or release them before the lease runs out, they become claimable
+again. Claims are a single UPDATE ... RETURNING inside an immediate
+transaction, so several processes can claim from the same database
+without handing out a booking twice, and the partial index
+idx_bookings_dispatch keeps the cost proportional to the queue depth.
+"""
+
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Iterable
+
+from .database import Database, MAX_VARIABLES
+
+
+# Timestamps are written with microseconds so short leases compare correctly
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# A booking is claimable when it is pending and not under a live lease.
+# The partial index is named explicitly: the planner would otherwise pick
+# idx_bookings_status_date and look up every leased row in the table.
+_CLAIMABLE = (
+    "bookings INDEXED BY idx_bookings_dispatch "
+    "WHERE status = 'pending' AND (lease_expires_at IS NULL OR lease_expires_at <= ?)"
+)
+
+
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime (leases are stored without zone)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class DispatchQueue:
+    """
+    Lease-based queue over pending bookings.
+
+    Example:
+        queue = DispatchQueue(db)
+        for booking in queue.claim(10):
+            ...assign a driver...
+            queue.complete(booking["id"], status="confirmed")
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 30.0
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            db: Database instance
+            worker_id: Name recorded on claimed bookings (defaults to host:pid)
+            lease_seconds: How long a claim lasts unless extended
+        """
+        self.db = db
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+
+    def claim(self, limit: int = 1, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Claim the oldest claimable bookings.
+
+        Args:
+            limit: Maximum number of bookings to claim
+            now: Current time (defaults to now, UTC; mainly for testing)
+
+        Returns:
+            Claimed bookings, oldest first
+        """
+        now = now or _utcnow()
+        expires = now + timedelta(seconds=self.lease_seconds)
+        with self.db.transaction(immediate=True):
+            cursor = self.db.execute(
+                f"""
+                UPDATE bookings SET claimed_by = ?, lease_expires_at = ?
+                WHERE id IN (
+                    SELECT id FROM {_CLAIMABLE}
+                    ORDER BY booking_date
+                    LIMIT ?
+                )
+                RETURNING *
+                """,
+                (self.worker_id, expires.strftime(_TIME_FORMAT), now.strftime(_TIME_FORMAT), limit)
+            )
+            claimed = [dict(row) for row in cursor.fetchall()]
+            if claimed:
+                self.db.notify_changed("bookings", "update", [booking["id"] for booking in claimed])
+        # RETURNING does not follow the subquery's order
+        claimed.sort(key=lambda booking: (booking["booking_date"], booking["id"]))
+        return claimed
+
+    def extend(self, booking_ids: Iterable[int], now: Optional[datetime] = None) -> int:
+        """
+        Renew the lease on bookings this worker still holds.
+
+        Args:
+            booking_ids: IDs of claimed bookings
+            now: Current time (defaults to now, UTC)
+
+        Returns:
+            Number of leases renewed (lost leases are not renewed)
+        """
+        now = now or _utcnow()
+        expires = now + timedelta(seconds=self.lease_seconds)
+        return self._update_held(
+            booking_ids,
+            "lease_expires_at = ?",
+            (expires.strftime(_TIME_FORMAT),),
+            "AND lease_expires_at > ?",
+            (now.strftime(_TIME_FORMAT),),
+        )
+
+    def release(self, booking_ids: Iterable[int]) -> int:
+        """
+        Give bookings back to the queue without dispatching them.
+
+        Args:
+            booking_ids: IDs of claimed bookings
+
+        Returns:
+            Number of bookings released
+        """
+        return self._update_held(booking_ids, "claimed_by = NULL, lease_expires_at = NULL", ())
+
+    def complete(self, booking_id: int, status: str = "confirmed") -> bool:
+        """
+        Finish a claimed booking by moving it out of the pending state.
+
+        Only succeeds while this worker holds the claim, so a worker whose
+        lease expired cannot overwrite another worker's decision.
+
+        Args:
+            booking_id: ID of a claimed booking
+            status: New status (e.g. "confirmed" or "cancelled")
+
+        Returns:
+            True if the booking was updated
+        """
+        return self._update_held(
+            [booking_id],
+            "status = ?, claimed_by = NULL, lease_expires_at = NULL",
+            (status,),
+        ) == 1
+
+    def depth(self, now: Optional[datetime] = None) -> int:
+        """
+        Number of bookings waiting to be claimed.
+
+        Args:
+            now: Current time (defaults to now, UTC)
+
+        Returns:
+            Claimable booking count
+        """
+        now = now or _utcnow()
+        cursor = self.db.execute(
+            f"SELECT COUNT(*) FROM {_CLAIMABLE}",
+            (now.strftime(_TIME_FORMAT),)
+        )
+        return cursor.fetchone()[0]
+
+    def _update_held(
+        self,
+        booking_ids: Iterable[int],
+        set_clause: str,
+        set_params: tuple,
+        extra_where: str = "",
+        extra_params: tuple = ()
+    ) -> int:
+        """Update bookings claimed by this worker, in batches of IDs."""
+        booking_ids = list(dict.fromkeys(booking_ids))
+        updated: List[int] = []
+        size = MAX_VARIABLES - len(set_params) - len(extra_params) - 1
+        with self.db.transaction(immediate=True):
+            for start in range(0, len(booking_ids), size):
+                chunk = booking_ids[start:start + size]
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor = self.db.execute(
+                    f"UPDATE bookings SET {set_clause} "
+                    f"WHERE id IN ({placeholders}) AND status = 'pending' AND claimed_by = ? "
+                    f"{extra_where} RETURNING id",
+                    set_params + tuple(chunk) + (self.worker_id,) + extra_params
+                )
+                updated.extend(row[0] for row in cursor.fetchall())
+            if updated:
+                self.db.notify_changed("bookings", "update", updated)
+        return len(updated)
@@ -0,0 +1,339 @@
+"""
+Geocoding and route cache for the student taxi booking application.
+
+Pickup and dropoff locations are free text, but the same airports,
+campuses and stations come up constantly. Location text is normalized
+and its coordinates are kept in the geocode_cache table behind an
+in-memory LRU, and estimated distance/duration for origin-destination
+pairs is memoized in route_cache, so repeat bookings never reach the
+resolver. Resolver and route estimator are plain callables and can be
+replaced (e.g. by a stub in tests or a real geocoding service).
+"""
+
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, Callable, NamedTuple, Union
+
+from .database import Database
+
+
+Coordinates = Tuple[float, float]
+
+
+class Route(NamedTuple):
+    """Estimated trip between two locations."""
+    distance_km: float
+    duration_minutes: int
+
+
+# Resolver signature: normalized location text -> coordinates (or None if unknown)
+LocationResolver = Callable[[str], Optional[Coordinates]]
+
+# Route estimator signature: (origin, destination) coordinates -> Route
+RouteEstimator = Callable[[Coordinates, Coordinates], Route]
+
+EARTH_RADIUS_KM = 6371.0
+
+# Road distance is longer than the straight line; average city speed
+DETOUR_FACTOR = 1.3
+AVERAGE_SPEED_KMH = 30.0
+
+# Unknown locations are looked up again after this long, since a later
+# booking (or a better resolver) may place them
+NEGATIVE_TTL_SECONDS = 24 * 3600
+
+# Marks a cache miss, since None is a cached "unknown location"
+_MISSING = object()
+
+
+class _Unknown(NamedTuple):
+    """In-memory entry of an unknown location."""
+    retry_at: float
+
+
+def normalize_location(location: str) -> str:
+    """
+    Normalize location text so spelling variants share one cache entry.
+
+    Lowercases, drops punctuation and collapses whitespace, so
+    "Union Station, " and "union  station" are the same location.
+
+    Args:
+        location: Location as typed
+
+    Returns:
+        Normalized location text
+    """
+    location = re.sub(r"[^\w\s]", " ", location.lower())
+    return " ".join(location.split())
+
+
+def haversine_km(origin: Coordinates, destination: Coordinates) -> float:
+    """
+    Great-circle distance between two coordinates.
+
+    Args:
+        origin: (latitude, longitude) in degrees
+        destination: (latitude, longitude) in degrees
+
+    Returns:
+        Distance in kilometres
+    """
+    lat1, lon1 = map(math.radians, origin)
+    lat2, lon2 = map(math.radians, destination)
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def estimate_route(origin: Coordinates, destination: Coordinates) -> Route:
+    """
+    Default route estimator: straight-line distance with a detour factor.
+
+    Args:
+        origin: Origin coordinates
+        destination: Destination coordinates
+
+    Returns:
+        Estimated Route
+    """
+    distance = round(haversine_km(origin, destination) * DETOUR_FACTOR, 1)
+    return Route(distance, int(round(distance / AVERAGE_SPEED_KMH * 60)))
+
+
+class HistoryResolver:
+    """
+    Default resolver: places a location where past bookings recorded it.
+
+    Looks for a booking whose pickup or dropoff text normalizes to the
+    same location and carries coordinates. The lookup scans bookings, so
+    it is only meant to run on cache misses (unknown locations are cached
+    as well, so each one is looked up once per GeoCache.negative_ttl).
+    """
+
+    def __init__(self, db: Database):
+        """
+        Initialize the resolver.
+
+        Args:
+            db: Database instance to read past bookings from
+        """
+        self.db = db
+
+    def __call__(self, location: str) -> Optional[Coordinates]:
+        """Resolve normalized location text to coordinates."""
+        # LIKE narrows the candidates, normalization decides
+        pattern = "%" + "%".join(location.split()) + "%"
+        for column, latitude, longitude in (
+            ("pickup_location", "pickup_latitude", "pickup_longitude"),
+            ("dropoff_location", "dropoff_latitude", "dropoff_longitude"),
+        ):
+            cursor = self.db.execute(
+                f"""
+                SELECT {column} AS location, {latitude} AS latitude, {longitude} AS longitude
+                FROM bookings
+                WHERE {latitude} IS NOT NULL AND {longitude} IS NOT NULL
+                  AND lower({column}) LIKE ?
+                """,
+                (pattern,)
+            )
+            for row in cursor:
+                if normalize_location(row["location"]) == location:
+                    return (row["latitude"], row["longitude"])
+        return None
+
+
+class GeoCache:
+    """
+    Memoized location -> coordinates and location pair -> route lookups.
+
+    Example:
+        cache = GeoCache(db)
+        coordinates = cache.locate("Pearson Airport")
+        route = cache.route("Main Campus", "Pearson Airport")
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        resolver: Optional[LocationResolver] = None,
+        estimator: RouteEstimator = estimate_route,
+        max_entries: int = 2000,
+        negative_ttl: float = NEGATIVE_TTL_SECONDS
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            db: Database holding the geocode_cache and route_cache tables
+            resolver: Resolves locations missing from the cache
+                (defaults to HistoryResolver)
+            estimator: Estimates routes missing from the cache
+            max_entries: Entries kept in memory per cache (least recently
+                used entries are dropped first)
+            negative_ttl: Seconds an unknown location is remembered before
+                it is resolved again
+        """
+        self.db = db
+        self.resolver = resolver if resolver is not None else HistoryResolver(db)
+        self.estimator = estimator
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+
+        # Counters for monitoring
+        self.memory_hits = 0
+        self.table_hits = 0
+        self.resolved = 0
+
+        self._locations: "OrderedDict[str, Union[Coordinates, _Unknown]]" = OrderedDict()
+        self._routes: "OrderedDict[Tuple[str, str], Optional[Route]]" = OrderedDict()
+
+    def locate(self, location: str) -> Optional[Coordinates]:
+        """
+        Get the coordinates of a location.
+
+        Args:
+            location: Location text as typed
+
+        Returns:
+            (latitude, longitude), or None if the location is unknown
+        """
+        key = normalize_location(location)
+        cached = self._get(self._locations, key)
+        if isinstance(cached, _Unknown):
+            if time.time() < cached.retry_at:
+                return None
+        elif cached is not _MISSING:
+            return cached
+
+        # Unknown locations older than negative_ttl count as missing
+        row = self.db.execute(
+            "SELECT latitude, longitude, "
+            "(julianday('now') - julianday(updated_at)) * 86400 AS age "
+            "FROM geocode_cache WHERE location = ?",
+            (key,)
+        ).fetchone()
+        if row is not None and (row["latitude"] is not None or row["age"] < self.negative_ttl):
+            self.table_hits += 1
+            coordinates = None if row["latitude"] is None else (row["latitude"], row["longitude"])
+            age = row["age"]
+        else:
+            self.resolved += 1
+            coordinates = self.resolver(key)
+            self.db.execute(
+                "INSERT OR REPLACE INTO geocode_cache (location, latitude, longitude) "
+                "VALUES (?, ?, ?)",
+                (key,) + (coordinates if coordinates is not None else (None, None))
+            )
+            age = 0.0
+
+        if coordinates is None:
+            self._put(self._locations, key, _Unknown(time.time() + self.negative_ttl - age))
+        else:
+            self._put(self._locations, key, coordinates)
+        return coordinates
+
+    def route(self, origin: str, destination: str) -> Optional[Route]:
+        """
+        Get the estimated distance and duration between two locations.
+
+        Args:
+            origin: Origin location text
+            destination: Destination location text
+
+        Returns:
+            Route, or None if either location is unknown
+        """
+        key = (normalize_location(origin), normalize_location(destination))
+        cached = self._get(self._routes, key)
+        if cached is not _MISSING:
+            return cached
+
+        row = self.db.execute(
+            "SELECT distance_km, duration_minutes FROM route_cache "
+            "WHERE origin = ? AND destination = ?",
+            key
+        ).fetchone()
+        if row is not None:
+            self.table_hits += 1
+            route: Optional[Route] = Route(row["distance_km"], row["duration_minutes"])
+        else:
+            start = self.locate(origin)
+            end = self.locate(destination)
+            if start is None or end is None:
+                # Not persisted: the location may become known later
+                return None
+            route = self.estimator(start, end)
+            self.db.execute(
+                "INSERT OR REPLACE INTO route_cache "
+                "(origin, destination, distance_km, duration_minutes) VALUES (?, ?, ?, ?)",
+                key + tuple(route)
+            )
+
+        self._put(self._routes, key, route)
+        return route
+
+    def complete_booking(self, booking: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fill in missing coordinates, distance and duration of a booking.
+
+        Args:
+            booking: Booking data with pickup_location and dropoff_location
+
+        Returns:
+            The same dictionary, completed where the locations are known
+        """
+        for prefix in ("pickup", "dropoff"):
+            if booking.get(f"{prefix}_latitude") is None:
+                coordinates = self.locate(booking[f"{prefix}_location"])
+                if coordinates is not None:
+                    booking[f"{prefix}_latitude"], booking[f"{prefix}_longitude"] = coordinates
+
+        if booking.get("distance_km") is None or booking.get("duration_minutes") is None:
+            route = self.route(booking["pickup_location"], booking["dropoff_location"])
+            if route is not None:
+                if booking.get("distance_km") is None:
+                    booking["distance_km"] = route.distance_km
+                if booking.get("duration_minutes") is None:
+                    booking["duration_minutes"] = route.duration_minutes
+        return booking
+
+    def forget(self, location: str):
+        """
+        Drop a location (and routes using it) so it is resolved again.
+
+        Args:
+            location: Location text
+        """
+        key = normalize_location(location)
+        self._locations.pop(key, None)
+        for pair in [pair for pair in self._routes if key in pair]:
+            del self._routes[pair]
+        with self.db.transaction():
+            self.db.execute("DELETE FROM geocode_cache WHERE location = ?", (key,))
+            self.db.execute(
+                "DELETE FROM route_cache WHERE origin = ? OR destination = ?", (key, key)
+            )
+
+    def clear_memory(self):
+        """Drop the in-memory entries (the cache tables are kept)."""
+        self._locations.clear()
+        self._routes.clear()
+
+    def _get(self, cache: OrderedDict, key) -> Any:
+        """Look up an in-memory entry and mark it recently used."""
+        if key not in cache:
+            return _MISSING
+        cache.move_to_end(key)
+        self.memory_hits += 1
+        return cache[key]
+
+    def _put(self, cache: OrderedDict, key, value):
+        """Store an in-memory entry, evicting the least recently used ones."""
+        cache[key] = value
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
@@ -0,0 +1,301 @@
+"""
+Opt-in instrumentation for the student taxi booking application.
+
+Records timing spans (refresh handlers, queries, list population) and
+event-loop stalls as Chrome trace events, written to a JSON file that can
+be opened offline in chrome://tracing or https://ui.perfetto.dev.
+
+Enabled by environment variables, read when the first window is created:
+
+    TAXI_TRACE=trace.json   write the trace to this file on exit
+    TAXI_STALL_MS=100       report event-loop stalls longer than this
+
+When tracing is off, span() returns a shared no-op context manager, so
+a block costs a function call and an empty with statement.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator, ContextManager
+
+
+# Stop recording beyond this many events so a long session cannot exhaust memory
+MAX_EVENTS = 200000
+
+DEFAULT_STALL_MS = 100.0
+
+
+class Tracer:
+    """
+    Collects Chrome trace events ("X" complete events and "i" instant events).
+
+    Example:
+        tracer = Tracer()
+        with tracer.span("bookings.refresh"):
+            ...
+        tracer.save("trace.json")
+    """
+
+    def __init__(self, max_events: int = MAX_EVENTS):
+        """
+        Initialize the tracer.
+
+        Args:
+            max_events: Events kept before further events are dropped
+        """
+        self.max_events = max_events
+        self.events: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def now_us(self) -> float:
+        """Microseconds since the tracer was created (the trace clock)."""
+        return (time.perf_counter() - self._origin) * 1e6
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[None]:
+        """
+        Record the duration of a block.
+
+        Args:
+            name: Span name (e.g. "bookings.populate")
+            **args: Extra values shown with the span
+        """
+        start = self.now_us()
+        try:
+            yield
+        finally:
+            self.complete(name, start, self.now_us() - start, **args)
+
+    def complete(self, name: str, start_us: float, duration_us: float, **args):
+        """
+        Record a complete event.
+
+        Args:
+            name: Event name
+            start_us: Start on the trace clock
+            duration_us: Duration in microseconds
+            **args: Extra values shown with the event
+        """
+        self._append({
+            "name": name, "ph": "X", "ts": start_us, "dur": duration_us,
+            "pid": self._pid, "tid": threading.get_ident(), "args": args,
+        })
+
+    def instant(self, name: str, thread_id: Optional[int] = None, **args):
+        """
+        Record an instant event.
+
+        Args:
+            name: Event name
+            thread_id: Thread the event belongs to (defaults to the caller's)
+            **args: Extra values shown with the event
+        """
+        self._append({
+            "name": name, "ph": "i", "s": "t", "ts": self.now_us(),
+            "pid": self._pid, "tid": thread_id or threading.get_ident(), "args": args,
+        })
+
+    def save(self, path: "str | Path"):
+        """
+        Write the trace as Chrome trace-event JSON.
+
+        Args:
+            path: Output file
+        """
+        with self._lock:
+            events = list(self.events)
+        names = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": thread.ident,
+             "args": {"name": thread.name}}
+            for thread in threading.enumerate()
+        ]
+        Path(path).write_text(json.dumps({
+            "traceEvents": names + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": self.dropped},
+        }))
+
+    def _append(self, event: Dict[str, Any]):
+        """Store an event unless the limit is reached."""
+        with self._lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+            else:
+                self.events.append(event)
+
+
+class StallMonitor:
+    """
+    Event-loop latency watchdog.
+
+    A QTimer on the main thread ticks every `interval_ms`. A late tick
+    means the event loop was blocked; blocks longer than `threshold_ms` are
+    recorded as "event_loop.stall" spans. While a stall is in progress, a
+    watchdog thread captures the main thread's Python stack, so the trace
+    shows what the loop was busy with (a query, list population, layout).
+    """
+
+    def __init__(
+        self,
+        tracer: Tracer,
+        threshold_ms: float = DEFAULT_STALL_MS,
+        interval_ms: int = 20
+    ):
+        """
+        Initialize the monitor (call start() once a QApplication exists).
+
+        Args:
+            tracer: Tracer receiving the stall events
+            threshold_ms: Minimum stall length to report
+            interval_ms: Heartbeat interval of the main-thread timer
+        """
+        self.tracer = tracer
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self.stalls = 0
+
+        self._main_thread_id = threading.main_thread().ident
+        self._last_tick = time.perf_counter()
+        self._stacks: List[str] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = None
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the heartbeat timer and the watchdog thread."""
+        from PyQt6.QtCore import QTimer
+
+        self._last_tick = time.perf_counter()
+        self._timer = QTimer()
+        self._timer.setInterval(self.interval_ms)
+        self._timer.timeout.connect(self._tick)
+        self._timer.start()
+
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        """Stop monitoring."""
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def _tick(self):
+        """Main-thread heartbeat: report the previous gap if it was a stall."""
+        now = time.perf_counter()
+        with self._lock:
+            late_ms = (now - self._last_tick) * 1000 - self.interval_ms
+            stacks, self._stacks = self._stacks, []
+            self._last_tick = now
+        if late_ms >= self.threshold_ms:
+            self.stalls += 1
+            self.tracer.complete(
+                "event_loop.stall",
+                self.tracer.now_us() - late_ms * 1000,
+                late_ms * 1000,
+                late_ms=round(late_ms, 1),
+                stacks=stacks,
+            )
+
+    def _watch(self):
+        """Watchdog thread: capture the main thread's stack during a stall."""
+        period = self.threshold_ms / 2000
+        while not self._stop.wait(period):
+            with self._lock:
+                blocked_ms = (time.perf_counter() - self._last_tick) * 1000 - self.interval_ms
+                if blocked_ms < self.threshold_ms or len(self._stacks) >= 5:
+                    continue
+            frame = sys._current_frames().get(self._main_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            with self._lock:
+                first = not self._stacks
+                self._stacks.append(stack)
+            if not first:
+                continue
+            # The first sample is also recorded on its own, in case the
+            # loop never recovers
+            self.tracer.instant(
+                "event_loop.blocked",
+                thread_id=self._main_thread_id,
+                blocked_ms=round(blocked_ms, 1),
+                stack=stack,
+            )
+
+
+# Process-wide tracer, set by enable()
+_tracer: Optional[Tracer] = None
+_monitor: Optional[StallMonitor] = None
+_configured = False
+
+# Returned by span() when tracing is off (nullcontext is reusable)
+_NO_SPAN = nullcontext()
+
+
+def enable(
+    path: "str | Path",
+    stall_ms: float = DEFAULT_STALL_MS,
+    monitor_stalls: bool = True
+) -> Tracer:
+    """
+    Turn tracing on for the process and write the trace on exit.
+
+    Args:
+        path: Trace output file
+        stall_ms: Event-loop stall threshold in milliseconds
+        monitor_stalls: Start the StallMonitor (needs a QApplication)
+
+    Returns:
+        The process-wide Tracer
+    """
+    global _tracer, _monitor
+    if _tracer is None:
+        _tracer = Tracer()
+        atexit.register(_tracer.save, path)
+    if monitor_stalls and _monitor is None:
+        _monitor = StallMonitor(_tracer, threshold_ms=stall_ms)
+        _monitor.start()
+    return _tracer
+
+
+def configure_from_environment() -> Optional[Tracer]:
+    """
+    Enable tracing if TAXI_TRACE is set (only the first call has an effect).
+
+    Returns:
+        The process-wide Tracer, or None if tracing is off
+    """
+    global _configured
+    if not _configured:
+        _configured = True
+        path = os.environ.get("TAXI_TRACE")
+        if path:
+            enable(path, float(os.environ.get("TAXI_STALL_MS", DEFAULT_STALL_MS)))
+    return _tracer
+
+
+def span(name: str, **args) -> ContextManager[None]:
+    """
+    Record the duration of a block if tracing is on.
+
+    Args:
+        name: Span name
+        **args: Extra values shown with the span
+    """
+    if _tracer is None:
+        return _NO_SPAN
+    return _tracer.span(name, **args)
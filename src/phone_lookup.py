@@ -0,0 +1,233 @@
+"""
+Phone number lookup for the student taxi booking application.
+
+Customer phone numbers are free text. Each customer also carries a
+normalized, E.164-style copy (customers.phone_normalized) that is
+maintained by triggers on write and indexed, so an incoming caller is
+found with a single index lookup whatever the formatting. The same index
+drives duplicate detection and merging.
+"""
+
+from typing import Optional, List, Dict, Any, Iterable
+
+from .database import Database, MAX_VARIABLES
+
+
+# Numbers without a country prefix are assumed to be North American
+DEFAULT_COUNTRY_CODE = "1"
+NATIONAL_NUMBER_LENGTH = 10
+
+# Formatting characters dropped before comparing numbers
+_SEPARATORS = (" ", "-", "(", ")", ".", "+", "/")
+
+# Whitespace trimmed from both ends (str.strip() and SQL trim() disagree
+# on their defaults, so both sides are given this set)
+_TRIMMED = (" ", "\t", "\n", "\r")
+
+# Numbers phone_sql_mismatches() checks by default
+PHONE_SAMPLES = (
+    "416-555-0123", "+1 (416) 555 0123", "0044 20 7946 0958", "\t416.555.0123\r\n",
+    " +44/20/7946/0958 ", "5550123", "()", "", " \t ",
+)
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Normalize a phone number to an E.164-style string (e.g. "+14165550123").
+
+    Must stay in sync with phone_sql(), which the triggers use; the rules
+    are listed there.
+
+    Args:
+        phone: Phone number as typed
+
+    Returns:
+        Normalized number (bare digits if it cannot be made E.164), or
+        None if there are no digits to keep
+    """
+    if phone is None:
+        return None
+    phone = phone.strip("".join(_TRIMMED))
+    digits = phone
+    for separator in _SEPARATORS:
+        digits = digits.replace(separator, "")
+    if not digits:
+        return None
+    if phone.startswith("+"):
+        return "+" + digits
+    if digits.startswith("00"):
+        return "+" + digits[2:]
+    if len(digits) == NATIONAL_NUMBER_LENGTH:
+        return "+" + DEFAULT_COUNTRY_CODE + digits
+    return digits
+
+
+def phone_sql(column: str) -> str:
+    """
+    SQL expression normalizing a phone column the same way as normalize_phone().
+
+    Rules, after trimming _TRIMMED and dropping _SEPARATORS:
+
+    - no digits left: NULL
+    - written with a leading "+": "+" and the digits
+    - international "00" prefix: "+" and the digits after it
+    - NATIONAL_NUMBER_LENGTH digits: "+", DEFAULT_COUNTRY_CODE, the digits
+    - anything else (e.g. a 7-digit local number): the bare digits, so it
+      cannot pass for, or collide with, an international number
+
+    Args:
+        column: Column reference (e.g. "NEW.phone")
+
+    Returns:
+        SQL expression
+    """
+    trimmed = f"trim({column}, char({', '.join(str(ord(char)) for char in _TRIMMED)}))"
+    digits = trimmed
+    for separator in _SEPARATORS:
+        digits = f"replace({digits}, '{separator}', '')"
+    return (
+        f"CASE"
+        f" WHEN {column} IS NULL OR {digits} = '' THEN NULL"
+        f" WHEN substr({trimmed}, 1, 1) = '+' THEN '+' || {digits}"
+        f" WHEN substr({digits}, 1, 2) = '00' THEN '+' || substr({digits}, 3)"
+        f" WHEN length({digits}) = {NATIONAL_NUMBER_LENGTH}"
+        f" THEN '+{DEFAULT_COUNTRY_CODE}' || {digits}"
+        f" ELSE {digits}"
+        f" END"
+    )
+
+
+def phone_sql_mismatches(db: Database, phones: Iterable[str] = PHONE_SAMPLES) -> List[str]:
+    """
+    Numbers that normalize_phone() and phone_sql() normalize differently.
+
+    Args:
+        db: Database instance to evaluate phone_sql() in
+        phones: Numbers to check
+
+    Returns:
+        The numbers whose results differ (empty if both agree)
+    """
+    phones = list(phones)
+    mismatches = []
+    for start in range(0, len(phones), MAX_VARIABLES):
+        chunk = phones[start:start + MAX_VARIABLES]
+        values = ', '.join('(?)' for _ in chunk)
+        cursor = db.execute(
+            f"WITH samples(phone) AS (VALUES {values}) "
+            f"SELECT phone, {phone_sql('phone')} AS normalized FROM samples",
+            tuple(chunk)
+        )
+        mismatches.extend(
+            row["phone"] for row in cursor.fetchall()
+            if row["normalized"] != normalize_phone(row["phone"])
+        )
+    return mismatches
+
+
+def find_customers_by_phone(db: Database, phone: str) -> List[Dict[str, Any]]:
+    """
+    Find customers by phone number, ignoring formatting differences.
+
+    Args:
+        db: Database instance
+        phone: Phone number as typed or received from the telephony system
+
+    Returns:
+        Matching customers, oldest first
+    """
+    normalized = normalize_phone(phone)
+    if normalized is None:
+        return []
+    cursor = db.execute(
+        "SELECT * FROM customers WHERE phone_normalized = ? ORDER BY id",
+        (normalized,)
+    )
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def find_duplicate_customers(db: Database) -> List[List[int]]:
+    """
+    Group customers sharing a normalized phone number.
+
+    Returns:
+        Lists of customer IDs (ascending), one list per shared number
+    """
+    cursor = db.execute(
+        """
+        SELECT group_concat(id) AS ids FROM (
+            SELECT phone_normalized, id FROM customers
+            WHERE phone_normalized IS NOT NULL
+            ORDER BY phone_normalized, id
+        )
+        GROUP BY phone_normalized
+        HAVING COUNT(*) > 1
+        """
+    )
+    return [
+        sorted(int(customer_id) for customer_id in row["ids"].split(","))
+        for row in cursor.fetchall()
+    ]
+
+
+def merge_customers(db: Database, keep_id: int, duplicate_ids: Iterable[int]) -> int:
+    """
+    Merge duplicate customers into one.
+
+    Bookings and booking_customers entries (including archived ones when an
+    archive is attached) are moved to the kept customer and the duplicates
+    are deleted, all in one transaction. The moved live bookings are
+    reported to the change listeners as updated.
+
+    Args:
+        db: Database instance
+        keep_id: ID of the customer to keep
+        duplicate_ids: IDs of the customers merged into it
+
+    Returns:
+        Number of customers deleted
+    """
+    duplicate_ids = [customer_id for customer_id in duplicate_ids if customer_id != keep_id]
+    if not duplicate_ids:
+        return 0
+
+    schemas = ["main"] + (["archive"] if db.archive_path else [])
+    # One variable is taken by keep_id
+    chunk_size = MAX_VARIABLES - 1
+    deleted = 0
+    # Bookings whose customers changed, reported with the merge
+    booking_ids = set()
+
+    with db.transaction(immediate=True):
+        for start in range(0, len(duplicate_ids), chunk_size):
+            chunk = tuple(duplicate_ids[start:start + chunk_size])
+            placeholders = ', '.join('?' for _ in chunk)
+            for schema in schemas:
+                # Listeners only read live bookings
+                moved = booking_ids if schema == "main" else set()
+                cursor = db.execute(
+                    f"UPDATE {schema}.bookings SET customer_id = ? "
+                    f"WHERE customer_id IN ({placeholders}) RETURNING id",
+                    (keep_id,) + chunk
+                )
+                moved.update(row["id"] for row in cursor.fetchall())
+                # Bookings both customers rode in keep a single junction row
+                cursor = db.execute(
+                    f"UPDATE OR IGNORE {schema}.booking_customers SET customer_id = ? "
+                    f"WHERE customer_id IN ({placeholders}) RETURNING booking_id",
+                    (keep_id,) + chunk
+                )
+                moved.update(row["booking_id"] for row in cursor.fetchall())
+                cursor = db.execute(
+                    f"DELETE FROM {schema}.booking_customers "
+                    f"WHERE customer_id IN ({placeholders}) RETURNING booking_id",
+                    chunk
+                )
+                moved.update(row["booking_id"] for row in cursor.fetchall())
+            cursor = db.execute(f"DELETE FROM customers WHERE id IN ({placeholders})", chunk)
+            deleted += cursor.rowcount
+        db.notify_changed("customers", "delete", duplicate_ids)
+        db.notify_changed("customers", "update", [keep_id])
+        if booking_ids:
+            db.notify_changed("bookings", "update", sorted(booking_ids))
+    return deleted
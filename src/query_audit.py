@@ -0,0 +1,255 @@
+"""
+Query plan auditing for the student taxi booking application.
+
+Records every distinct statement issued through a Database and checks it
+with EXPLAIN QUERY PLAN, flagging full table scans of large tables and
+temporary B-trees used to sort them. Usable as a report or as a test
+assertion so missing indexes are caught early.
+"""
+
+import re
+import sqlite3
+from typing import Optional, List, Dict, Iterable, NamedTuple, Set, Tuple
+
+from .database import Database
+
+
+# Statements whose plans are worth checking
+_AUDITED_PREFIXES = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+# FROM/JOIN <table> [AS] <alias>, optionally schema-qualified
+_TABLE_REFERENCE = re.compile(
+    r"\b(?:FROM|JOIN)\s+(?:(\w+)\.)?(\w+)(?:\s+(?:AS\s+)?(\w+))?",
+    re.IGNORECASE
+)
+
+# SCAN/SEARCH <name> (SQLite >= 3.36) or SCAN/SEARCH TABLE <name> (older versions)
+_LOOP = re.compile(r"^(SCAN|SEARCH) (?:TABLE )?(\w+)(.*)$")
+
+# Words that can follow a table name but are not aliases
+_KEYWORDS = {
+    "where", "join", "left", "right", "inner", "outer", "cross", "on",
+    "using", "group", "order", "limit", "union", "natural", "set", "as",
+    "values", "select", "having", "window", "except", "intersect", "indexed",
+}
+
+# Index named in a plan line (e.g. "USING COVERING INDEX idx_name")
+_PLAN_INDEX = re.compile(r"\bINDEX (\w+)")
+
+
+class PlanIssue(NamedTuple):
+    """A problem found in a statement's query plan."""
+    kind: str           # "full_scan" or "temp_btree"
+    table: str
+    detail: str         # The EXPLAIN QUERY PLAN line
+    query: str
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so equivalent statements share one shape."""
+    return " ".join(query.split())
+
+
+class QueryPlanAuditor:
+    """
+    Collects statement shapes issued through a Database and audits their plans.
+
+    Example:
+        with QueryPlanAuditor(db, large_tables={"bookings"}) as auditor:
+            BookingReadModel(db).fetch_page()
+        auditor.assert_clean()
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        large_table_rows: int = 1000,
+        large_tables: Optional[Iterable[str]] = None,
+        allow: Optional[Iterable[str]] = None
+    ):
+        """
+        Initialize the auditor.
+
+        Args:
+            db: Database to observe
+            large_table_rows: Tables with at least this many rows count as large
+            large_tables: Tables always treated as large, regardless of size
+                (useful against small test databases)
+            allow: Regular expressions of statements whose plans are accepted
+                (e.g. deliberate full scans in rebuild jobs)
+        """
+        self.db = db
+        self.large_table_rows = large_table_rows
+        self.forced_large_tables: Set[str] = set(large_tables or ())
+        self.allow = [re.compile(pattern, re.IGNORECASE) for pattern in (allow or ())]
+        # Statement shape -> number of times it was issued
+        self.statements: Dict[str, int] = {}
+        self._row_counts: Dict[str, Optional[int]] = {}
+        self._partial_indexes: Dict[str, bool] = {}
+
+    def start(self):
+        """Start recording statements issued through the database."""
+        self.db.auditor = self
+
+    def stop(self):
+        """Stop recording statements."""
+        if self.db.auditor is self:
+            self.db.auditor = None
+
+    def record(self, query: str):
+        """
+        Record a statement (called by Database.execute).
+
+        Args:
+            query: SQL query string
+        """
+        shape = normalize_query(query)
+        self.statements[shape] = self.statements.get(shape, 0) + 1
+
+    def audit(self) -> List[PlanIssue]:
+        """
+        Run EXPLAIN QUERY PLAN for every recorded statement shape.
+
+        Returns:
+            List of issues found
+        """
+        issues: List[PlanIssue] = []
+        for query in self.statements:
+            issues.extend(self.check(query))
+        return issues
+
+    def check(self, query: str) -> List[PlanIssue]:
+        """
+        Check the plan of a single statement.
+
+        Args:
+            query: SQL query string
+
+        Returns:
+            List of issues found in its plan
+        """
+        query = normalize_query(query)
+        if not query.upper().startswith(_AUDITED_PREFIXES):
+            return []
+        if any(pattern.search(query) for pattern in self.allow):
+            return []
+
+        plan = self._explain(query)
+        if plan is None:
+            return []
+
+        aliases = self._aliases(query)
+        bounded = re.search(r"\bLIMIT\b", query, re.IGNORECASE) is not None
+
+        issues = []
+        # The first loop of each query block drives how many rows it produces
+        outer_loops: Dict[int, str] = {}
+        for parent, detail in plan:
+            match = _LOOP.match(detail)
+            if not match:
+                continue
+            kind, name, rest = match.groups()
+            outer_loops.setdefault(parent, name)
+            if kind != "SCAN" or not self._is_large(aliases.get(name, name)):
+                continue
+            # Walking an index in ORDER BY order and stopping at LIMIT is fine
+            if bounded and "INDEX" in rest:
+                continue
+            # A partial index only holds the rows its WHERE clause selects
+            index = _PLAN_INDEX.search(rest)
+            if index and self._is_partial_index(index.group(1)):
+                continue
+            issues.append(PlanIssue("full_scan", aliases.get(name, name), detail, query))
+
+        for parent, detail in plan:
+            if not detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+                continue
+            name = outer_loops.get(parent)
+            if name is not None and self._is_large(aliases.get(name, name)):
+                issues.append(PlanIssue("temp_btree", aliases.get(name, name), detail, query))
+        return issues
+
+    def report(self, issues: Optional[List[PlanIssue]] = None) -> str:
+        """
+        Format audit results.
+
+        Args:
+            issues: Issues to report (audits now if not given)
+
+        Returns:
+            Human readable report
+        """
+        if issues is None:
+            issues = self.audit()
+
+        lines = [f"Audited {len(self.statements)} distinct statements, {len(issues)} issue(s)"]
+        for issue in issues:
+            calls = self.statements.get(issue.query, 0)
+            lines.append(f"\n[{issue.kind}] {issue.table}: {issue.detail} (issued {calls}x)")
+            lines.append(f"  {issue.query}")
+        return "\n".join(lines)
+
+    def assert_clean(self):
+        """
+        Assert that no recorded statement scans or sorts a large table.
+
+        Raises:
+            AssertionError: With the report if any issue was found
+        """
+        issues = self.audit()
+        if issues:
+            raise AssertionError(self.report(issues))
+
+    def _explain(self, query: str) -> Optional[List[Tuple[int, str]]]:
+        """Return (parent, detail) plan lines of a statement, or None if it cannot be planned."""
+        # Plans do not depend on parameter values, so bind NULLs
+        params = (None,) * query.count("?")
+        try:
+            cursor = self.db.connection.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        except sqlite3.Error:
+            return None
+        return [(row[1], row[3]) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _aliases(query: str) -> Dict[str, str]:
+        """Map the names used in plan lines (aliases or table names) to tables."""
+        aliases: Dict[str, str] = {}
+        for _, table, alias in _TABLE_REFERENCE.findall(query):
+            aliases[table] = table
+            if alias and alias.lower() not in _KEYWORDS:
+                aliases[alias] = table
+        return aliases
+
+    def _is_large(self, table: str) -> bool:
+        """Check whether a table is large (CTEs and subqueries never are)."""
+        if table in self.forced_large_tables:
+            return True
+        if table not in self._row_counts:
+            try:
+                cursor = self.db.connection.execute(f"SELECT COUNT(*) FROM main.{table}")
+                self._row_counts[table] = cursor.fetchone()[0]
+            except sqlite3.Error:
+                # Not a real table (CTE or subquery)
+                self._row_counts[table] = None
+        count = self._row_counts[table]
+        return count is not None and count >= self.large_table_rows
+
+    def _is_partial_index(self, index: str) -> bool:
+        """Check whether an index has a WHERE clause."""
+        if index not in self._partial_indexes:
+            row = self.db.connection.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (index,)
+            ).fetchone()
+            self._partial_indexes[index] = bool(
+                row and row[0] and re.search(r"\bWHERE\b", row[0], re.IGNORECASE)
+            )
+        return self._partial_indexes[index]
+
+    def __enter__(self):
+        """Context manager entry: start recording."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit: stop recording."""
+        self.stop()
@@ -0,0 +1,360 @@
+"""
+Read models for the student taxi booking application.
+Fetch denormalized, view-ready records in a single query instead of
+loading rows table by table.
+"""
+
+import json
+from collections import OrderedDict
+from typing import Optional, List, Tuple, NamedTuple, Any, Dict, Iterable
+
+from .database import Database, MAX_VARIABLES
+
+
+class BookingSummary(NamedTuple):
+    """A booking together with its driver and customer names."""
+    id: int
+    booking_date: str
+    status: Optional[str]
+    pickup_location: str
+    dropoff_location: str
+    fare_amount: Optional[float]
+    driver_id: int
+    driver_name: Optional[str]
+    customer_names: Tuple[str, ...]
+
+    def display_text(self) -> str:
+        """Return a one-line description suitable for a list widget."""
+        driver = self.driver_name or "Unassigned"
+        customers = ", ".join(self.customer_names) or "No customers"
+        return (
+            f"#{self.id} {self.booking_date}  "
+            f"{self.pickup_location} → {self.dropoff_location}  "
+            f"| Driver: {driver} | Customers: {customers} "
+            f"[{self.status or 'pending'}]"
+        )
+
+
+# One statement per page: the page of bookings is selected first, then the
+# driver is joined and the customers (primary customer plus everyone in
+# booking_customers) are aggregated with json_group_array.
+_BOOKING_PAGE_QUERY = """
+    WITH page AS (
+        SELECT * FROM bookings
+        {where}
+        ORDER BY booking_date DESC, id DESC
+        LIMIT ? OFFSET ?
+    ),
+    page_customers AS (
+        SELECT id AS booking_id, customer_id FROM page
+        UNION
+        SELECT bc.booking_id, bc.customer_id
+        FROM booking_customers bc
+        JOIN page ON page.id = bc.booking_id
+    )
+    SELECT
+        p.id,
+        p.booking_date,
+        p.status,
+        p.pickup_location,
+        p.dropoff_location,
+        p.fare_amount,
+        p.driver_id,
+        d.name AS driver_name,
+        json_group_array(c.name) AS customer_names
+    FROM page p
+    LEFT JOIN drivers d ON d.id = p.driver_id
+    LEFT JOIN page_customers pc ON pc.booking_id = p.id
+    LEFT JOIN customers c ON c.id = pc.customer_id
+    GROUP BY p.id
+    ORDER BY p.booking_date DESC, p.id DESC
+"""
+
+
+class BookingReadModel:
+    """
+    Read model for the bookings list.
+    Returns pages of BookingSummary records using one query per page.
+    """
+
+    def __init__(self, db: Database):
+        """
+        Initialize the read model.
+
+        Args:
+            db: Database instance to read from
+        """
+        self.db = db
+
+    def fetch_page(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        status: Optional[str] = None
+    ) -> List[BookingSummary]:
+        """
+        Fetch a page of bookings, newest first.
+
+        Args:
+            limit: Maximum number of bookings to return
+            offset: Number of bookings to skip
+            status: Optional status filter (e.g., "pending")
+
+        Returns:
+            List of BookingSummary records
+        """
+        params: Tuple[Any, ...] = ()
+        where = ""
+        if status is not None:
+            where = "WHERE status = ?"
+            params = (status,)
+
+        query = _BOOKING_PAGE_QUERY.format(where=where)
+        cursor = self.db.execute(query, params + (limit, offset))
+        return [self._to_summary(row) for row in cursor.fetchall()]
+
+    def fetch_ids(self, booking_ids: Iterable[int]) -> Dict[int, BookingSummary]:
+        """
+        Fetch specific bookings, e.g. to patch rows after they changed.
+
+        Args:
+            booking_ids: Booking IDs
+
+        Returns:
+            Dictionary of booking ID to BookingSummary (missing IDs are left out)
+        """
+        booking_ids = list(dict.fromkeys(booking_ids))
+        result = {}
+        # Two variables are taken by LIMIT and OFFSET
+        chunk_size = MAX_VARIABLES - 2
+        for start in range(0, len(booking_ids), chunk_size):
+            chunk = booking_ids[start:start + chunk_size]
+            query = _BOOKING_PAGE_QUERY.format(
+                where=f"WHERE id IN ({', '.join('?' for _ in chunk)})"
+            )
+            cursor = self.db.execute(query, tuple(chunk) + (len(chunk), 0))
+            for row in cursor.fetchall():
+                result[row["id"]] = self._to_summary(row)
+        return result
+
+    def count(self, status: Optional[str] = None) -> int:
+        """
+        Count bookings, optionally filtered by status.
+
+        Args:
+            status: Optional status filter
+
+        Returns:
+            Number of matching bookings
+        """
+        if status is None:
+            cursor = self.db.execute("SELECT COUNT(*) FROM bookings")
+        else:
+            cursor = self.db.execute(
+                "SELECT COUNT(*) FROM bookings WHERE status = ?", (status,)
+            )
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def _to_summary(row) -> BookingSummary:
+        """Convert a result row into a BookingSummary."""
+        names = tuple(
+            name for name in json.loads(row["customer_names"]) if name is not None
+        )
+        return BookingSummary(
+            id=row["id"],
+            booking_date=row["booking_date"],
+            status=row["status"],
+            pickup_location=row["pickup_location"],
+            dropoff_location=row["dropoff_location"],
+            fare_amount=row["fare_amount"],
+            driver_id=row["driver_id"],
+            driver_name=row["driver_name"],
+            customer_names=names,
+        )
+
+
+class RideSummary(NamedTuple):
+    """A past or upcoming ride of a driver or car."""
+    id: int
+    booking_date: str
+    status: Optional[str]
+    pickup_location: str
+    dropoff_location: str
+    fare_amount: Optional[float]
+    rating: Optional[int]
+    driver_id: int
+
+    def display_text(self) -> str:
+        """Return a one-line description suitable for a details pane."""
+        rating = f", rated {self.rating}" if self.rating is not None else ""
+        fare = f"{self.fare_amount:.2f}" if self.fare_amount is not None else "-"
+        return (
+            f"{self.booking_date}  {self.pickup_location} → {self.dropoff_location} "
+            f"({self.status or 'pending'}, fare {fare}{rating})"
+        )
+
+
+# Last K bookings per driver or car. {entity} is the partition column,
+# {source} the FROM clause and {placeholders} the id list.
+_LAST_RIDES_QUERY = """
+    SELECT * FROM (
+        SELECT
+            b.id,
+            b.booking_date,
+            b.status,
+            b.pickup_location,
+            b.dropoff_location,
+            b.fare_amount,
+            b.rating,
+            b.driver_id,
+            {entity} AS entity_id,
+            ROW_NUMBER() OVER (
+                PARTITION BY {entity}
+                ORDER BY b.booking_date DESC, b.id DESC
+            ) AS position
+        FROM {source}
+        WHERE {entity} IN ({placeholders})
+    )
+    WHERE position <= ?
+    ORDER BY entity_id, position
+"""
+
+_LAST_RIDES_SOURCES = {
+    "driver": ("b.driver_id", "bookings b"),
+    # The booking's own car, like the daily statistics (see booking_stats)
+    "car": ("b.car_id", "bookings b"),
+}
+
+
+class LastRidesModel:
+    """
+    Most recent rides per driver or car, fetched for many entities at once.
+
+    Results are cached per entity and invalidated when bookings of that
+    driver or car are written.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        k: int = 5,
+        max_entries: int = 500,
+        listen: bool = True
+    ):
+        """
+        Initialize the model.
+
+        Args:
+            db: Database instance to read from
+            k: Number of rides kept per entity
+            max_entries: Number of entities kept in the cache (least recently
+                used entries are dropped first)
+            listen: Invalidate the cache on writes made through db
+        """
+        self.db = db
+        self.k = k
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, int], List[RideSummary]]" = OrderedDict()
+        if listen:
+            db.add_listener(self._on_change)
+
+    def close(self):
+        """Stop listening to database writes."""
+        self.db.remove_listener(self._on_change)
+
+    def for_drivers(self, driver_ids: Iterable[int]) -> Dict[int, List[RideSummary]]:
+        """
+        Last rides of several drivers.
+
+        Args:
+            driver_ids: Driver IDs
+
+        Returns:
+            Dictionary of driver ID to rides, newest first
+        """
+        return self._fetch("driver", driver_ids)
+
+    def for_cars(self, car_ids: Iterable[int]) -> Dict[int, List[RideSummary]]:
+        """
+        Last rides of several cars (the car recorded on each booking).
+
+        Args:
+            car_ids: Car IDs
+
+        Returns:
+            Dictionary of car ID to rides, newest first
+        """
+        return self._fetch("car", car_ids)
+
+    def invalidate(self):
+        """Drop all cached rides."""
+        self._cache.clear()
+
+    def _fetch(self, kind: str, ids: Iterable[int]) -> Dict[int, List[RideSummary]]:
+        """Serve cached entities and load the missing ones in batches."""
+        ids = list(dict.fromkeys(ids))
+        missing = [entity_id for entity_id in ids if (kind, entity_id) not in self._cache]
+
+        entity, source = _LAST_RIDES_SOURCES[kind]
+        # One variable is taken by the ride limit
+        chunk_size = MAX_VARIABLES - 1
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            query = _LAST_RIDES_QUERY.format(
+                entity=entity,
+                source=source,
+                placeholders=', '.join('?' for _ in chunk),
+            )
+            for entity_id in chunk:
+                self._cache[(kind, entity_id)] = []
+            cursor = self.db.execute(query, tuple(chunk) + (self.k,))
+            for row in cursor.fetchall():
+                self._cache[(kind, row["entity_id"])].append(RideSummary(
+                    id=row["id"],
+                    booking_date=row["booking_date"],
+                    status=row["status"],
+                    pickup_location=row["pickup_location"],
+                    dropoff_location=row["dropoff_location"],
+                    fare_amount=row["fare_amount"],
+                    rating=row["rating"],
+                    driver_id=row["driver_id"],
+                ))
+
+        result = {}
+        for entity_id in ids:
+            self._cache.move_to_end((kind, entity_id))
+            result[entity_id] = self._cache[(kind, entity_id)]
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return result
+
+    def _on_change(self, table: str, operation: str, ids: List[int]):
+        """Invalidate cached rides affected by a write."""
+        if not self._cache or table != "bookings":
+            return
+        if operation == "delete" or not ids:
+            # The deleted rows can no longer tell us their driver or car
+            self._cache.clear()
+            return
+
+        for start in range(0, len(ids), MAX_VARIABLES):
+            chunk = ids[start:start + MAX_VARIABLES]
+            placeholders = ', '.join('?' for _ in chunk)
+            cursor = self.db.execute(
+                f"""
+                SELECT DISTINCT driver_id, car_id FROM bookings
+                WHERE id IN ({placeholders})
+                """,
+                tuple(chunk)
+            )
+            for row in cursor.fetchall():
+                self._cache.pop(("driver", row["driver_id"]), None)
+                if row["car_id"] is not None:
+                    self._cache.pop(("car", row["car_id"]), None)
+        if operation == "update":
+            # The booking may have moved away from a cached driver or car
+            changed = set(ids)
+            for key, rides in list(self._cache.items()):
+                if any(ride.id in changed for ride in rides):
+                    del self._cache[key]
@@ -0,0 +1,74 @@
+"""
+In-memory read replica for the student taxi booking application.
+
+Mirrors the database into a ":memory:" database with the SQLite backup
+API. Dashboards and reports read from the replica, so their heavy queries
+never contend with the writer for the database file.
+"""
+
+import time
+from typing import Optional
+
+from .database import Database
+
+
+class ReadReplica:
+    """
+    In-memory copy of a database, refreshed when it gets older than max_age.
+
+    Example:
+        replica = ReadReplica(db, max_age=30)
+        stats = BookingStats(replica.db)   # refreshed lazily on access
+
+    The replica is refreshed on access rather than from a background
+    thread, because SQLite connections belong to the thread that opened
+    them; GUI code can also call refresh() from a QTimer.
+    """
+
+    def __init__(self, source: Database, max_age: float = 30.0, pages: int = 0):
+        """
+        Create the replica and take the first copy.
+
+        Args:
+            source: Database to mirror
+            max_age: Seconds after which the replica is refreshed on access
+            pages: Pages copied per backup step (0 copies everything at once)
+        """
+        self.source = source
+        self.max_age = max_age
+        self.pages = pages
+        self._replica = Database(":memory:")
+        self.refreshed_at: Optional[float] = None
+        self.refresh()
+
+    @property
+    def db(self) -> Database:
+        """The replica database, refreshed first if it is stale."""
+        self.refresh_if_stale()
+        return self._replica
+
+    @property
+    def age(self) -> float:
+        """Seconds since the last refresh."""
+        return time.monotonic() - (self.refreshed_at or 0.0)
+
+    def refresh(self):
+        """Copy the source database into the replica."""
+        self.source.backup_to(self._replica.connection, pages=self.pages, sleep=0)
+        self.refreshed_at = time.monotonic()
+
+    def refresh_if_stale(self) -> bool:
+        """
+        Refresh the replica if it is older than max_age.
+
+        Returns:
+            True if a refresh happened
+        """
+        if self.age < self.max_age:
+            return False
+        self.refresh()
+        return True
+
+    def close(self):
+        """Release the replica."""
+        self._replica.close()
@@ -0,0 +1,127 @@
+"""
+Shared identity-map cache of database rows for the student taxi booking
+application.
+
+Every open window reads drivers, cars and customers through one RowCache,
+so a record is loaded once and all windows hold the very same dictionary
+for it. When a write is reported (see ChangeBus), the cached dictionaries
+are reloaded in place, so every holder sees the new values without a
+reload of its own.
+"""
+
+from typing import Optional, List, Dict, Any, Iterable, Set
+
+from .database import Database, MAX_VARIABLES
+
+
+class RowCache:
+    """
+    Identity map of table rows keyed by (table, id).
+
+    Meant for the small reference tables shown in lists; bookings are
+    read through the read models instead.
+    """
+
+    def __init__(self, db: Database):
+        """
+        Initialize the cache.
+
+        Args:
+            db: Database instance to load rows from
+        """
+        self.db = db
+        self._rows: Dict[str, Dict[int, Dict[str, Any]]] = {}
+
+    def get(self, table: str, record_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get one row, loading it on first use.
+
+        Args:
+            table: Table name
+            record_id: ID of the record
+
+        Returns:
+            The shared row dictionary, or None if the record does not exist
+        """
+        return self.get_many(table, [record_id]).get(record_id)
+
+    def get_many(self, table: str, record_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Get several rows, loading the missing ones in batches.
+
+        Args:
+            table: Table name
+            record_ids: IDs of the records
+
+        Returns:
+            Dictionary of ID to shared row dictionary (missing records are left out)
+        """
+        rows = self._rows.setdefault(table, {})
+        record_ids = list(dict.fromkeys(record_ids))
+        self._load(table, [record_id for record_id in record_ids if record_id not in rows])
+        return {record_id: rows[record_id] for record_id in record_ids if record_id in rows}
+
+    def load_all(self, table: str, order_by: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Load every row of a table, reusing the dictionaries already handed out.
+
+        Args:
+            table: Table name
+            order_by: Optional ORDER BY clause
+
+        Returns:
+            List of shared row dictionaries
+        """
+        return [self._merge(table, row) for row in self.db.read_all(table, order_by=order_by)]
+
+    def apply(self, table: str, operation: str, record_ids: List[int]):
+        """
+        Bring cached rows up to date after a write.
+
+        Args:
+            table: Table written to
+            operation: "insert", "update" or "delete"
+            record_ids: IDs of the written records (empty if unknown)
+        """
+        rows = self._rows.get(table)
+        if not rows:
+            return
+        if not record_ids:
+            rows.clear()
+        elif operation == "delete":
+            for record_id in record_ids:
+                rows.pop(record_id, None)
+        elif operation == "update":
+            # Inserted rows are loaded when first asked for
+            cached = [record_id for record_id in record_ids if record_id in rows]
+            found = self._load(table, cached)
+            for record_id in set(cached) - found:
+                del rows[record_id]
+
+    def clear(self):
+        """Drop every cached row."""
+        self._rows.clear()
+
+    def _load(self, table: str, record_ids: List[int]) -> Set[int]:
+        """Load rows into the map (in place for cached ones) and return the IDs found."""
+        found = set()
+        for start in range(0, len(record_ids), MAX_VARIABLES):
+            chunk = record_ids[start:start + MAX_VARIABLES]
+            placeholders = ', '.join('?' for _ in chunk)
+            cursor = self.db.execute(
+                f"SELECT * FROM {table} WHERE id IN ({placeholders})", tuple(chunk)
+            )
+            for row in cursor.fetchall():
+                found.add(self._merge(table, dict(row))["id"])
+        return found
+
+    def _merge(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a loaded row, updating the existing dictionary if there is one."""
+        rows = self._rows.setdefault(table, {})
+        cached = rows.get(row["id"])
+        if cached is None:
+            rows[row["id"]] = row
+            return row
+        cached.clear()
+        cached.update(row)
+        return cached
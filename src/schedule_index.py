@@ -0,0 +1,454 @@
+"""
+Driver schedule index for the student taxi booking application.
+
+Keeps an interval tree per driver built from bookings (booking_date plus
+duration_minutes) so overlapping assignments can be detected, free slots
+found and large batches of proposed assignments validated without a
+range query per booking.
+"""
+
+import calendar
+import random
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Tuple, Iterable, NamedTuple, Union
+
+from .database import Database, MAX_VARIABLES
+
+
+# Duration assumed for bookings without duration_minutes
+DEFAULT_DURATION_MINUTES = 30
+
+# Bookings with these statuses do not occupy the driver
+NON_BLOCKING_STATUSES = ("cancelled",)
+
+TimeValue = Union[datetime, str, int]
+
+
+def to_timestamp(value: TimeValue) -> int:
+    """
+    Convert a booking time to seconds since the epoch.
+
+    Naive datetimes and "YYYY-MM-DD HH:MM:SS" strings are treated as UTC,
+    matching SQLite's strftime('%s', ...).
+
+    Args:
+        value: datetime, ISO-8601 string or epoch seconds
+
+    Returns:
+        Epoch seconds
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return calendar.timegm(value.utctimetuple())
+
+
+def _to_datetime(timestamp: int) -> datetime:
+    """Convert epoch seconds back to a naive UTC datetime."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+class _Node:
+    """Treap node holding one interval, augmented with the subtree max end."""
+
+    __slots__ = ("start", "end", "key", "priority", "left", "right", "max_end")
+
+    def __init__(self, start: int, end: int, key: int):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.max_end = end
+
+    def update(self):
+        """Recompute max_end from the children."""
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+class IntervalTree:
+    """
+    Interval tree over half-open [start, end) intervals identified by key.
+
+    Implemented as a treap ordered by (start, key) and augmented with the
+    maximum end of each subtree, giving expected O(log n) inserts and
+    removals and O(log n + k) overlap queries.
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._intervals: Dict[int, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._intervals
+
+    def insert(self, start: int, end: int, key: int):
+        """
+        Insert an interval, replacing any existing interval with the same key.
+
+        Args:
+            start: Interval start
+            end: Interval end (exclusive)
+            key: Unique key (e.g. booking ID)
+        """
+        if key in self._intervals:
+            self.remove(key)
+        self._intervals[key] = (start, end)
+        self._root = self._insert(self._root, _Node(start, end, key))
+
+    def remove(self, key: int) -> bool:
+        """
+        Remove the interval with the given key.
+
+        Args:
+            key: Interval key
+
+        Returns:
+            True if an interval was removed
+        """
+        interval = self._intervals.pop(key, None)
+        if interval is None:
+            return False
+        self._root = self._remove(self._root, interval[0], key)
+        return True
+
+    def overlapping(self, start: int, end: int) -> List[Tuple[int, int, int]]:
+        """
+        Find all intervals overlapping [start, end).
+
+        Args:
+            start: Query start
+            end: Query end (exclusive)
+
+        Returns:
+            List of (start, end, key) tuples ordered by start
+        """
+        found: List[Tuple[int, int, int]] = []
+        self._collect(self._root, start, end, found)
+        return found
+
+    def intervals(self) -> List[Tuple[int, int, int]]:
+        """Return all intervals as (start, end, key) tuples ordered by start."""
+        found: List[Tuple[int, int, int]] = []
+        self._walk(self._root, found)
+        return found
+
+    @classmethod
+    def _insert(cls, node: Optional[_Node], new: _Node) -> _Node:
+        if node is None:
+            return new
+        if (new.start, new.key) < (node.start, node.key):
+            node.left = cls._insert(node.left, new)
+            if node.left.priority > node.priority:
+                node = cls._rotate_right(node)
+        else:
+            node.right = cls._insert(node.right, new)
+            if node.right.priority > node.priority:
+                node = cls._rotate_left(node)
+        node.update()
+        return node
+
+    @classmethod
+    def _remove(cls, node: Optional[_Node], start: int, key: int) -> Optional[_Node]:
+        if node is None:
+            return None
+        if (start, key) < (node.start, node.key):
+            node.left = cls._remove(node.left, start, key)
+        elif (start, key) > (node.start, node.key):
+            node.right = cls._remove(node.right, start, key)
+        else:
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            # Rotate the higher-priority child up and keep descending
+            if node.left.priority > node.right.priority:
+                node = cls._rotate_right(node)
+                node.right = cls._remove(node.right, start, key)
+            else:
+                node = cls._rotate_left(node)
+                node.left = cls._remove(node.left, start, key)
+        node.update()
+        return node
+
+    @staticmethod
+    def _rotate_right(node: _Node) -> _Node:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        node.update()
+        pivot.update()
+        return pivot
+
+    @staticmethod
+    def _rotate_left(node: _Node) -> _Node:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        node.update()
+        pivot.update()
+        return pivot
+
+    @classmethod
+    def _collect(cls, node: Optional[_Node], start: int, end: int, found: List):
+        # Nothing in this subtree ends after the query starts
+        if node is None or node.max_end <= start:
+            return
+        cls._collect(node.left, start, end, found)
+        if node.start < end:
+            if node.end > start:
+                found.append((node.start, node.end, node.key))
+            cls._collect(node.right, start, end, found)
+
+    @classmethod
+    def _walk(cls, node: Optional[_Node], found: List):
+        if node is None:
+            return
+        cls._walk(node.left, found)
+        found.append((node.start, node.end, node.key))
+        cls._walk(node.right, found)
+
+
+class Proposal(NamedTuple):
+    """A proposed assignment of a driver to a time window."""
+    driver_id: int
+    start: TimeValue
+    duration_minutes: int = DEFAULT_DURATION_MINUTES
+    booking_id: Optional[int] = None  # set when reassigning an existing booking
+
+
+class Conflict(NamedTuple):
+    """Conflicts found for one proposal in validate_assignments()."""
+    index: int
+    booking_ids: Tuple[int, ...]
+    proposal_indexes: Tuple[int, ...]
+
+
+class DriverScheduleIndex:
+    """
+    Per-driver interval trees over the bookings table.
+
+    The index is built with a single query and kept current through
+    Database change notifications.
+    """
+
+    def __init__(self, db: Database, listen: bool = True):
+        """
+        Build the index.
+
+        Args:
+            db: Database instance to read bookings from
+            listen: Keep the index current by listening to writes on db
+        """
+        self.db = db
+        self._trees: Dict[int, IntervalTree] = {}
+        # booking_id -> driver_id, to find the tree when a booking changes
+        self._drivers: Dict[int, int] = {}
+        self.build()
+        if listen:
+            db.add_listener(self._on_change)
+
+    def close(self):
+        """Stop listening to database writes."""
+        self.db.remove_listener(self._on_change)
+
+    def build(self):
+        """(Re)build the index from the bookings table."""
+        self._trees.clear()
+        self._drivers.clear()
+        for batch in self.db.iter_batches(self._select(""), batch_size=5000):
+            for row in batch:
+                self._add(row)
+
+    def conflicts(
+        self,
+        driver_id: int,
+        start: TimeValue,
+        duration_minutes: int = DEFAULT_DURATION_MINUTES,
+        exclude_booking_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Find bookings of a driver overlapping a time window.
+
+        Args:
+            driver_id: Driver ID
+            start: Window start
+            duration_minutes: Window length in minutes
+            exclude_booking_id: Booking to ignore (e.g. the one being moved)
+
+        Returns:
+            IDs of overlapping bookings
+        """
+        tree = self._trees.get(driver_id)
+        if tree is None:
+            return []
+        begin = to_timestamp(start)
+        end = begin + duration_minutes * 60
+        return [
+            key for _, _, key in tree.overlapping(begin, end)
+            if key != exclude_booking_id
+        ]
+
+    def is_free(
+        self,
+        driver_id: int,
+        start: TimeValue,
+        duration_minutes: int = DEFAULT_DURATION_MINUTES
+    ) -> bool:
+        """
+        Check whether a driver has no booking in a time window.
+
+        Args:
+            driver_id: Driver ID
+            start: Window start
+            duration_minutes: Window length in minutes
+
+        Returns:
+            True if the driver is free
+        """
+        return not self.conflicts(driver_id, start, duration_minutes)
+
+    def free_slots(
+        self,
+        driver_id: int,
+        window_start: TimeValue,
+        window_end: TimeValue,
+        min_minutes: int = 0
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        List the gaps in a driver's schedule within a window.
+
+        Args:
+            driver_id: Driver ID
+            window_start: Start of the window
+            window_end: End of the window
+            min_minutes: Ignore gaps shorter than this
+
+        Returns:
+            List of (start, end) naive UTC datetimes
+        """
+        begin = to_timestamp(window_start)
+        end = to_timestamp(window_end)
+        tree = self._trees.get(driver_id)
+        busy = tree.overlapping(begin, end) if tree is not None else []
+
+        slots = []
+        cursor = begin
+        for busy_start, busy_end, _ in busy:
+            if busy_start > cursor:
+                slots.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+        if cursor < end:
+            slots.append((cursor, end))
+
+        return [
+            (_to_datetime(slot_start), _to_datetime(slot_end))
+            for slot_start, slot_end in slots
+            if slot_end - slot_start >= min_minutes * 60
+        ]
+
+    def validate_assignments(self, proposals: Iterable[Proposal]) -> List[Conflict]:
+        """
+        Validate many proposed assignments in one call.
+
+        Each proposal is checked against existing bookings and against the
+        other proposals in the batch.
+
+        Args:
+            proposals: Proposed assignments
+
+        Returns:
+            One Conflict per proposal that overlaps something
+        """
+        proposals = [Proposal(*proposal) for proposal in proposals]
+        windows = []
+        by_driver: Dict[int, List[int]] = {}
+        for index, proposal in enumerate(proposals):
+            begin = to_timestamp(proposal.start)
+            windows.append((begin, begin + proposal.duration_minutes * 60))
+            by_driver.setdefault(proposal.driver_id, []).append(index)
+
+        # Overlaps between proposals: sweep each driver's proposals by start
+        batch_conflicts: Dict[int, List[int]] = {}
+        for indexes in by_driver.values():
+            indexes.sort(key=lambda i: windows[i])
+            active: List[int] = []
+            for index in indexes:
+                begin = windows[index][0]
+                active = [other for other in active if windows[other][1] > begin]
+                for other in active:
+                    batch_conflicts.setdefault(index, []).append(other)
+                    batch_conflicts.setdefault(other, []).append(index)
+                active.append(index)
+
+        results = []
+        for index, proposal in enumerate(proposals):
+            begin, end = windows[index]
+            tree = self._trees.get(proposal.driver_id)
+            booking_ids = ()
+            if tree is not None:
+                booking_ids = tuple(
+                    key for _, _, key in tree.overlapping(begin, end)
+                    if key != proposal.booking_id
+                )
+            others = tuple(sorted(batch_conflicts.get(index, ())))
+            if booking_ids or others:
+                results.append(Conflict(index, booking_ids, others))
+        return results
+
+    @staticmethod
+    def _select(where: str) -> str:
+        """Query returning (id, driver_id, start, end) for active bookings."""
+        statuses = ', '.join(f"'{status}'" for status in NON_BLOCKING_STATUSES)
+        return f"""
+            SELECT
+                id,
+                driver_id,
+                CAST(strftime('%s', booking_date) AS INTEGER) AS start_ts,
+                COALESCE(duration_minutes, {DEFAULT_DURATION_MINUTES}) * 60 AS length
+            FROM bookings
+            WHERE COALESCE(status, 'pending') NOT IN ({statuses}) {where}
+        """
+
+    def _add(self, row):
+        """Insert a booking row from _select() into its driver's tree."""
+        if row["start_ts"] is None:
+            return
+        tree = self._trees.setdefault(row["driver_id"], IntervalTree())
+        tree.insert(row["start_ts"], row["start_ts"] + row["length"], row["id"])
+        self._drivers[row["id"]] = row["driver_id"]
+
+    def _discard(self, booking_id: int):
+        """Remove a booking from whichever tree holds it."""
+        driver_id = self._drivers.pop(booking_id, None)
+        if driver_id is not None:
+            self._trees[driver_id].remove(booking_id)
+
+    def _on_change(self, table: str, operation: str, ids: List[int]):
+        """Apply booking writes reported by the database."""
+        if table != "bookings":
+            return
+        if not ids:
+            # The written bookings are unknown (bulk or raw SQL writes)
+            self.build()
+            return
+        for booking_id in ids:
+            self._discard(booking_id)
+        if operation == "delete":
+            return
+        for start in range(0, len(ids), MAX_VARIABLES):
+            chunk = ids[start:start + MAX_VARIABLES]
+            placeholders = ', '.join('?' for _ in chunk)
+            cursor = self.db.execute(self._select(f"AND id IN ({placeholders})"), tuple(chunk))
+            for row in cursor.fetchall():
+                self._add(row)
@@ -0,0 +1,387 @@
+"""
+Offline-first replication for the student taxi booking application.
+
+Every booking station keeps working on its own database. Triggers record
+which rows changed in the changelog table (table, id and operation only;
+the row itself is read when it is pushed, so a row changed ten times is
+sent once). A SyncClient pushes gzip-compressed batches of changes to a
+central HTTP service and pulls the changes made by other stations,
+resuming from a cursor kept in sync_state. Conflicts are resolved by
+last writer wins on updated_at, which triggers keep current on every
+local update.
+
+Row IDs must not collide between stations: give each station its own ID
+block with reserve_id_block() before it creates rows. Rows that existed
+before replication was set up should live on one station only.
+
+scripts/sync_server.py is a local stand-in for the central service.
+"""
+
+import gzip
+import json
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple, NamedTuple
+
+from .database import Database, MAX_VARIABLES
+
+
+# Replicated tables, in the order remote changes are applied (parents first)
+SYNC_TABLES = ("customers", "cars", "drivers", "bookings", "booking_customers")
+
+# Station-local columns that are neither replicated nor count as a change
+LOCAL_COLUMNS = {
+    "bookings": ("claimed_by", "lease_expires_at"),
+}
+
+# Updates of these columns are replicated (tables not listed: any column).
+# Columns maintained by triggers travel with the row but are not a change
+# of their own: updated_at (whose touch trigger would otherwise log every
+# update twice), customers.phone_normalized and bookings.car_id. This also
+# keeps dispatch claims, which only touch local columns, out of the
+# changelog. New columns must be added here to be replicated.
+_REPLICATED_UPDATE_COLUMNS = {
+    "customers": ("name", "phone", "email", "address"),
+    "cars": (
+        "make", "model", "year", "license_plate", "color", "driver_id",
+        "average_rating", "total_rides",
+    ),
+    "drivers": ("name", "license_number", "phone", "email", "car_id"),
+    "bookings": (
+        "driver_id", "customer_id", "pickup_location", "dropoff_location",
+        "pickup_latitude", "pickup_longitude", "dropoff_latitude", "dropoff_longitude",
+        "booking_date", "status", "fare_amount", "distance_km", "duration_minutes",
+        "rating", "notes",
+    ),
+}
+
+# Tables without an updated_at column (rows are only inserted and deleted)
+_UNVERSIONED_TABLES = ("booking_customers",)
+
+# Row IDs per station block (see reserve_id_block)
+ID_BLOCK_SIZE = 1_000_000_000
+
+# Millisecond UTC timestamps; they sort after CURRENT_TIMESTAMP values of the same second
+NOW_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def changelog_sql() -> str:
+    """
+    Build the changelog and updated_at triggers for the replicated tables.
+
+    Returns:
+        SQL script (idempotent: triggers are dropped and recreated)
+    """
+    statements = []
+    for table in SYNC_TABLES:
+        columns = _REPLICATED_UPDATE_COLUMNS.get(table)
+        update_of = f"UPDATE OF {', '.join(columns)}" if columns else "UPDATE"
+        for op, event, row in (("I", "INSERT", "NEW"), ("U", update_of, "NEW"), ("D", "DELETE", "OLD")):
+            # Rows moved to the archive are not deletions
+            flags = "'applying_remote', 'archiving'" if op == "D" else "'applying_remote'"
+            name = f"trg_{table}_changelog_{op.lower()}"
+            statements.append(f"""
+DROP TRIGGER IF EXISTS {name};
+CREATE TRIGGER {name} AFTER {event} ON {table}
+WHEN NOT EXISTS (SELECT 1 FROM maintenance_flags WHERE name IN ({flags}))
+BEGIN
+    INSERT INTO changelog (table_name, row_id, op) VALUES ('{table}', {row}.id, '{op}');
+END;""")
+
+        if table in _UNVERSIONED_TABLES:
+            continue
+        # Stamp updated_at unless the statement set it itself
+        statements.append(f"""
+DROP TRIGGER IF EXISTS trg_{table}_touch;
+CREATE TRIGGER trg_{table}_touch AFTER {update_of} ON {table}
+WHEN NEW.updated_at IS OLD.updated_at
+ AND NOT EXISTS (SELECT 1 FROM maintenance_flags WHERE name = 'applying_remote')
+BEGIN
+    UPDATE {table} SET updated_at = {NOW_SQL} WHERE id = NEW.id;
+END;""")
+    return "\n".join(statements)
+
+
+def reserve_id_block(db: Database, station_number: int, block_size: int = ID_BLOCK_SIZE):
+    """
+    Make new rows of this station use IDs from its own block.
+
+    Station 1 creates IDs from 1 * block_size upward, station 2 from
+    2 * block_size and so on, so rows created offline never collide.
+
+    Args:
+        db: Station database
+        station_number: Number of the station (1 or more)
+        block_size: IDs per station
+    """
+    if station_number < 1:
+        raise ValueError("Station numbers start at 1")
+    floor = station_number * block_size
+    with db.transaction(immediate=True):
+        for table in SYNC_TABLES:
+            cursor = db.execute("UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = ?", (floor, table))
+            if cursor.rowcount == 0:
+                db.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, floor))
+        db.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('station_number', ?)",
+            (str(station_number),)
+        )
+
+
+class SyncStats(NamedTuple):
+    """Result of one sync run."""
+    pushed: int              # Changes sent
+    pulled: int              # Changes received
+    applied: int             # Received changes applied locally
+    skipped: int             # Received changes older than the local row
+    bytes_sent: int
+    bytes_received: int
+    seconds: float
+    push_lag: float          # Age in seconds of the oldest change pushed
+    pull_lag: float          # Seconds since the server received the oldest change pulled
+
+    @property
+    def changes_per_second(self) -> float:
+        """Replication throughput of the run."""
+        return (self.pushed + self.pulled) / self.seconds if self.seconds else 0.0
+
+
+class SyncClient:
+    """
+    Pushes local changes to a central service and pulls everyone else's.
+
+    Example:
+        client = SyncClient(db, "http://localhost:8765")
+        stats = client.sync()
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        url: str,
+        batch_size: int = 500,
+        timeout: float = 30.0
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            db: Station database
+            url: Base URL of the sync service
+            batch_size: Changes per request
+            timeout: Seconds to wait for the service
+        """
+        self.db = db
+        self.url = url.rstrip("/")
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.station_id = self._station_id()
+
+    def sync(self) -> SyncStats:
+        """
+        Push all local changes, then pull all remote ones.
+
+        Returns:
+            SyncStats of the run
+        """
+        start = time.perf_counter()
+        pushed, bytes_sent, push_lag = self.push()
+        pulled, applied, skipped, bytes_received, pull_lag = self.pull()
+        return SyncStats(
+            pushed, pulled, applied, skipped, bytes_sent, bytes_received,
+            time.perf_counter() - start, push_lag, pull_lag,
+        )
+
+    def pending(self) -> int:
+        """Number of changelog entries waiting to be pushed."""
+        return self.db.execute("SELECT COUNT(*) FROM changelog").fetchone()[0]
+
+    def push(self) -> Tuple[int, int, float]:
+        """
+        Send the changelog in batches, removing each batch once accepted.
+
+        Returns:
+            (changes pushed, bytes sent, age in seconds of the oldest change)
+        """
+        pushed = 0
+        bytes_sent = 0
+        lag = 0.0
+        while True:
+            entries = self.db.execute(
+                "SELECT seq, table_name, row_id, op, changed_at FROM changelog ORDER BY seq LIMIT ?",
+                (self.batch_size,)
+            ).fetchall()
+            if not entries:
+                break
+            if pushed == 0:
+                lag = max(0.0, time.time() - _parse_utc(entries[0]["changed_at"]))
+
+            changes = self._encode(entries)
+            body = gzip.compress(json.dumps({"station": self.station_id, "changes": changes}).encode("utf-8"))
+            self._request("POST", "/push", body)
+            bytes_sent += len(body)
+            pushed += len(changes)
+
+            self.db.execute("DELETE FROM changelog WHERE seq <= ?", (entries[-1]["seq"],))
+        return pushed, bytes_sent, lag
+
+    def pull(self) -> Tuple[int, int, int, int, float]:
+        """
+        Fetch and apply remote changes from the stored cursor onward.
+
+        Returns:
+            (changes pulled, applied, skipped as older, bytes received,
+             seconds since the server received the oldest change)
+        """
+        pulled = applied = skipped = bytes_received = 0
+        lag = 0.0
+        while True:
+            cursor_value = self._state("pull_cursor") or "0"
+            query = urllib.parse.urlencode({
+                "since": cursor_value, "station": self.station_id, "limit": self.batch_size,
+            })
+            body = self._request("GET", f"/pull?{query}")
+            bytes_received += len(body)
+            response = json.loads(gzip.decompress(body))
+            changes = response["changes"]
+            if changes and pulled == 0:
+                lag = max(0.0, time.time() - changes[0]["received_at"])
+
+            with self.db.transaction(immediate=True):
+                done, older = self._apply(changes)
+                self._set_state("pull_cursor", str(response["cursor"]))
+            pulled += len(changes)
+            applied += done
+            skipped += older
+            if not response["more"]:
+                break
+        return pulled, applied, skipped, bytes_received, lag
+
+    def _encode(self, entries: List) -> List[Dict[str, Any]]:
+        """Turn changelog entries into changes, one per row, with current row data."""
+        # Only the last entry per row matters
+        latest: Dict[Tuple[str, int], Any] = {}
+        for entry in entries:
+            latest.pop((entry["table_name"], entry["row_id"]), None)
+            latest[(entry["table_name"], entry["row_id"])] = entry
+
+        rows: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        by_table: Dict[str, List[int]] = {}
+        for table, row_id in latest:
+            by_table.setdefault(table, []).append(row_id)
+        for table, ids in by_table.items():
+            local = LOCAL_COLUMNS.get(table, ())
+            for start in range(0, len(ids), MAX_VARIABLES):
+                chunk = ids[start:start + MAX_VARIABLES]
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor = self.db.execute(f"SELECT * FROM {table} WHERE id IN ({placeholders})", tuple(chunk))
+                for row in cursor.fetchall():
+                    rows[(table, row["id"])] = {
+                        key: row[key] for key in row.keys() if key not in local
+                    }
+
+        changes = []
+        for key, entry in latest.items():
+            row = rows.get(key) if entry["op"] != "D" else None
+            changes.append({
+                "table": entry["table_name"],
+                "id": entry["row_id"],
+                # A row deleted after it was changed is sent as a deletion
+                "op": entry["op"] if row is not None or entry["op"] == "D" else "D",
+                "row": row,
+                "updated_at": (row or {}).get("updated_at") or entry["changed_at"],
+            })
+        return changes
+
+    def _apply(self, changes: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Apply remote changes with last-writer-wins; returns (applied, skipped)."""
+        applied = skipped = 0
+        notify: Dict[Tuple[str, str], List[int]] = {}
+        order = {table: position for position, table in enumerate(SYNC_TABLES)}
+        changes = sorted(changes, key=lambda change: order.get(change["table"], len(order)))
+
+        # Writes made here are not changes of this station
+        self.db.execute("INSERT OR IGNORE INTO maintenance_flags (name) VALUES ('applying_remote')")
+        try:
+            columns = {table: set(self.db.table_columns(table)) for table in SYNC_TABLES}
+            for change in changes:
+                table = change["table"]
+                if table not in columns:
+                    continue
+                current = self.db.execute(
+                    f"SELECT * FROM {table} WHERE id = ?", (change["id"],)
+                ).fetchone()
+                versioned = "updated_at" in columns[table]
+                if current is not None and versioned and current["updated_at"] is not None \
+                        and current["updated_at"] > change["updated_at"]:
+                    skipped += 1
+                    continue
+
+                if change["op"] == "D":
+                    if current is None:
+                        continue
+                    self.db.execute(f"DELETE FROM {table} WHERE id = ?", (change["id"],))
+                    operation = "delete"
+                else:
+                    row = {key: value for key, value in change["row"].items() if key in columns[table]}
+                    names = ', '.join(row)
+                    placeholders = ', '.join('?' for _ in row)
+                    if current is None:
+                        self.db.execute(
+                            f"INSERT OR IGNORE INTO {table} ({names}) VALUES ({placeholders})",
+                            tuple(row.values())
+                        )
+                        operation = "insert"
+                    else:
+                        assignments = ', '.join(f"{name} = ?" for name in row if name != "id")
+                        self.db.execute(
+                            f"UPDATE {table} SET {assignments} WHERE id = ?",
+                            tuple(value for name, value in row.items() if name != "id") + (change["id"],)
+                        )
+                        operation = "update"
+                applied += 1
+                notify.setdefault((table, operation), []).append(change["id"])
+        finally:
+            self.db.execute("DELETE FROM maintenance_flags WHERE name = 'applying_remote'")
+
+        for (table, operation), ids in notify.items():
+            self.db.notify_changed(table, operation, ids)
+        return applied, skipped
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> bytes:
+        """Send a request to the service and return the (gzip) response body."""
+        request = urllib.request.Request(self.url + path, data=body, method=method)
+        if body is not None:
+            request.add_header("Content-Type", "application/json")
+            request.add_header("Content-Encoding", "gzip")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read()
+
+    def _station_id(self) -> str:
+        """This station's ID, created on first use."""
+        station_id = self._state("station_id")
+        if station_id is None:
+            station_id = uuid.uuid4().hex
+            self._set_state("station_id", station_id)
+        return station_id
+
+    def _state(self, key: str) -> Optional[str]:
+        """Read a sync_state value."""
+        row = self.db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str):
+        """Write a sync_state value."""
+        self.db.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+
+def _parse_utc(timestamp: str) -> float:
+    """Unix time of a UTC timestamp written by SQLite."""
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
@@ -4,9 +4,40 @@ Shows a list of bookings with driver and associated customers,
 and displays a simple map.
 """
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QLabel
+from datetime import date, timedelta
+from typing import Optional, Dict
+
+import numpy as np
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QLabel
 from PyQt6.QtCore import QSize, Qt
+from PyQt6.QtGui import QImage, QPixmap
 from ..base_window import BaseWindow
+from ..instrumentation import span
+from ..database import Database
+from ..change_bus import ChangeBus
+from ..read_models import BookingReadModel, BookingSummary
+from ..demand_analytics import DemandAnalytics
+
+
+def heatmap_image(heatmap: np.ndarray) -> QImage:
+    """
+    Render a demand heatmap as a translucent red overlay.
+    
+    Args:
+        heatmap: Counts per (latitude row, longitude column), south row first
+        
+    Returns:
+        RGBA image, north up
+    """
+    peak = heatmap.max()
+    scaled = np.sqrt(heatmap / peak) if peak else np.zeros(heatmap.shape)
+    rgba = np.zeros(heatmap.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = 255
+    rgba[..., 3] = (scaled * 220).astype(np.uint8)
+    rgba = np.ascontiguousarray(np.flipud(rgba))
+    height, width = heatmap.shape
+    # copy() so the image owns its pixels once rgba is freed
+    return QImage(rgba.tobytes(), width, height, 4 * width, QImage.Format.Format_RGBA8888).copy()
 
 
 class BookingsWindow(BaseWindow):
@@ -15,12 +46,33 @@ class BookingsWindow(BaseWindow):
     Shows list of bookings with driver and customers, plus a map view.
     """
     
-    def __init__(self, parent=None):
+    # Number of bookings loaded per refresh
+    PAGE_SIZE = 200
+    # Days of bookings shown in the demand overlay
+    DEMAND_DAYS = 7
+    
+    def __init__(
+        self,
+        parent=None,
+        db: Optional[Database] = None,
+        bus: Optional[ChangeBus] = None
+    ):
+        # Shared database connection and change bus (created here if not provided)
+        self.db = db if db is not None else Database()
+        self.bus = bus if bus is not None else ChangeBus(self.db)
+        self.read_model = BookingReadModel(self.db)
+        self.demand = DemandAnalytics(self.db)
+        # Bookings currently listed, by ID
+        self._shown: Dict[int, BookingSummary] = {}
+        
         super().__init__(
             name="Bookings",
             size=QSize(1200, 700),
             parent=parent
         )
+        
+        self._refresh_bookings()
+        self.bus.changed.connect(self._on_data_changed, Qt.ConnectionType.QueuedConnection)
     
     def _setup_ui(self):
         """Setup the bookings UI with list and map."""
@@ -66,11 +118,122 @@ class BookingsWindow(BaseWindow):
         # Add action buttons
         self.add_button("Refresh", self._refresh_bookings, "Refresh bookings list")
         self.add_button("New Booking", self._new_booking, "Create a new booking")
+        self.add_button("Demand", self._show_demand, "Overlay recent pickup demand on the map")
     
     def _refresh_bookings(self):
         """Refresh the bookings list."""
-        # TODO: Implement database query to refresh bookings
-        print("Refreshing bookings...")
+        # One query for the whole page (driver and customers are joined in)
+        with span("bookings.query"):
+            bookings = self.read_model.fetch_page(limit=self.PAGE_SIZE)
+        
+        with span("bookings.populate", rows=len(bookings)):
+            self.bookings_list.clear()
+            self._shown = {}
+            for booking in bookings:
+                self._insert_item(self.bookings_list.count(), booking)
+    
+    def _insert_item(self, position: int, booking: BookingSummary):
+        """Insert a list item for a booking."""
+        item = QListWidgetItem(booking.display_text())
+        item.setData(Qt.ItemDataRole.UserRole, booking.id)
+        self.bookings_list.insertItem(position, item)
+        self._shown[booking.id] = booking
+    
+    def _on_data_changed(self, table: str, operation: str, ids: list):
+        """Patch the affected rows after a write made anywhere in the application."""
+        with span("bookings.patch", table=table, operation=operation, ids=len(ids)):
+            self._apply_change(table, operation, ids)
+    
+    def _apply_change(self, table: str, operation: str, ids: list):
+        """Route a reported write to the matching row patch."""
+        if table == "bookings":
+            if not ids:
+                self._refresh_bookings()
+            elif operation == "delete":
+                self._remove_rows(ids)
+            else:
+                self._patch_rows(ids, add_new=operation == "insert")
+        elif table == "drivers":
+            self._patch_rows([
+                booking.id for booking in self._shown.values()
+                if not ids or booking.driver_id in ids
+            ])
+        elif table in ("customers", "booking_customers"):
+            # Customer names are not kept per row; re-read the listed bookings
+            self._patch_rows(list(self._shown))
+    
+    def _remove_rows(self, ids: list):
+        """Remove deleted bookings from the list."""
+        ids = set(ids)
+        for position in reversed(range(self.bookings_list.count())):
+            booking_id = self.bookings_list.item(position).data(Qt.ItemDataRole.UserRole)
+            if booking_id in ids:
+                self.bookings_list.takeItem(position)
+                self._shown.pop(booking_id, None)
+    
+    def _patch_rows(self, ids: list, add_new: bool = False):
+        """
+        Re-read changed bookings (one query) and update their rows.
+        
+        Args:
+            ids: Booking IDs to re-read
+            add_new: Insert bookings that are not listed yet (new bookings)
+        """
+        if not add_new:
+            ids = [booking_id for booking_id in ids if booking_id in self._shown]
+        if not ids:
+            return
+        summaries = self.read_model.fetch_ids(ids)
+        # Bookings that no longer exist
+        self._remove_rows([booking_id for booking_id in ids if booking_id not in summaries])
+        
+        for booking in summaries.values():
+            listed = self._shown.get(booking.id)
+            if listed is not None and listed.booking_date == booking.booking_date:
+                # Same position: relabel in place (keeps the selection)
+                for position in range(self.bookings_list.count()):
+                    item = self.bookings_list.item(position)
+                    if item.data(Qt.ItemDataRole.UserRole) == booking.id:
+                        item.setText(booking.display_text())
+                        break
+                self._shown[booking.id] = booking
+                continue
+            
+            # New or rescheduled: (re)insert in date order
+            if listed is not None:
+                self._remove_rows([booking.id])
+            key = (booking.booking_date, booking.id)
+            position = 0
+            while position < self.bookings_list.count():
+                other = self._shown[self.bookings_list.item(position).data(Qt.ItemDataRole.UserRole)]
+                if (other.booking_date, other.id) < key:
+                    break
+                position += 1
+            self._insert_item(position, booking)
+        
+        # Keep the page size
+        while self.bookings_list.count() > self.PAGE_SIZE:
+            last = self.bookings_list.takeItem(self.bookings_list.count() - 1)
+            self._shown.pop(last.data(Qt.ItemDataRole.UserRole), None)
+    
+    def _show_demand(self):
+        """Show pickups of the last DEMAND_DAYS days as a heatmap on the map."""
+        end = date.today() + timedelta(days=1)
+        start = end - timedelta(days=self.DEMAND_DAYS)
+        # Cached per date range, so showing it again is instant
+        with span("bookings.demand"):
+            report = self.demand.report(start.isoformat(), end.isoformat())
+        
+        pixmap = QPixmap.fromImage(heatmap_image(report.heatmap)).scaled(
+            self.map_placeholder.size(),
+            Qt.AspectRatioMode.IgnoreAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        self.map_placeholder.setPixmap(pixmap)
+        self.map_placeholder.setToolTip(
+            f"{report.total} bookings, {start.isoformat()} to {end.isoformat()}; "
+            f"busiest hour of day: {int(report.by_hour_of_day.argmax()):02d}:00"
+        )
     
     def _new_booking(self):
         """Open dialog to create a new booking."""
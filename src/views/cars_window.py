@@ -3,9 +3,17 @@ Cars window for the student taxi booking application.
 Shows a registered list of cars with last rides and average rating.
 """
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QLabel, QTextEdit
-from PyQt6.QtCore import QSize
+from datetime import date, timedelta
+from typing import Optional
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QLabel, QTextEdit
+from PyQt6.QtCore import QSize, Qt
 from ..base_window import BaseWindow
+from ..instrumentation import span
+from ..database import Database
+from ..change_bus import ChangeBus, patch_list_widget, booking_owners
+from ..booking_stats import BookingStats, format_summary
+from ..read_models import LastRidesModel
 
 
 class CarsWindow(BaseWindow):
@@ -14,12 +22,33 @@ class CarsWindow(BaseWindow):
     Shows registered list of cars, last rides, and average rating.
     """
     
-    def __init__(self, parent=None):
+    # Number of recent rides shown in the details pane
+    LAST_RIDES = 5
+    # Number of listed entities whose last rides are loaded up front
+    PREFETCH_ROWS = 50
+    
+    def __init__(
+        self,
+        parent=None,
+        db: Optional[Database] = None,
+        bus: Optional[ChangeBus] = None
+    ):
+        # Shared database connection and change bus (created here if not provided)
+        self.db = db if db is not None else Database()
+        self.bus = bus if bus is not None else ChangeBus(self.db)
+        self.cache = self.bus.cache
+        self.stats = BookingStats(self.db)
+        self.last_rides = LastRidesModel(self.db, k=self.LAST_RIDES)
         super().__init__(
             name="Cars",
             size=QSize(1000, 600),
             parent=parent
         )
+        
+        self._refresh_cars()
+        # Queued so every database listener (e.g. the last rides cache) has
+        # seen the write before the window reads again
+        self.bus.changed.connect(self._on_data_changed, Qt.ConnectionType.QueuedConnection)
     
     def _setup_ui(self):
         """Setup the cars UI with list and details."""
@@ -68,23 +97,87 @@ class CarsWindow(BaseWindow):
         """Handle car selection change."""
         current_item = self.cars_list.currentItem()
         if current_item:
-            # TODO: Load car details from database
-            car_name = current_item.text()
+            car_id = current_item.data(Qt.ItemDataRole.UserRole)
+            car = self.cache.get("cars", car_id)
+            if car is None:
+                return
+            
+            driver = None
+            if car["driver_id"] is not None:
+                driver = self.cache.get("drivers", car["driver_id"])
+            
+            # Statistics come from the daily summary table, not from bookings
+            with span("cars.details", car_id=car_id):
+                week_start = (date.today() - timedelta(days=6)).isoformat()
+                all_time = self.stats.car_summary(car_id)
+                this_week = self.stats.car_summary(car_id, start_day=week_start)
+                rides = self.last_rides.for_cars([car_id])[car_id]
+            rides_text = "\n".join(f"  {ride.display_text()}" for ride in rides) or "  None"
+            
             self.car_details.setPlainText(
-                f"Car: {car_name}\n\n"
-                "Details will be loaded from database.\n"
-                "Will include:\n"
-                "- Car information (make, model, year)\n"
-                "- Registration details\n"
-                "- Last rides\n"
-                "- Average rating\n"
-                "- Associated driver"
+                f"Car: {car['make']} {car['model']} ({car['year'] or '-'})\n"
+                f"License plate: {car['license_plate']}\n"
+                f"Color: {car['color'] or '-'}\n"
+                f"Driver: {driver['name'] if driver else '-'}\n\n"
+                f"Completed rides (last 7 days):\n{format_summary(this_week)}\n\n"
+                f"Completed rides (all time):\n{format_summary(all_time)}\n\n"
+                f"Last rides:\n{rides_text}"
             )
     
     def _refresh_cars(self):
         """Refresh the cars list."""
-        # TODO: Implement database query to refresh cars
-        print("Refreshing cars...")
+        with span("cars.query"):
+            cars = self.cache.load_all("cars", order_by="make, model")
+        
+        with span("cars.populate", rows=len(cars)):
+            self.cars_list.clear()
+            for car in cars:
+                item = QListWidgetItem(self._car_label(car))
+                item.setData(Qt.ItemDataRole.UserRole, car["id"])
+                self.cars_list.addItem(item)
+        
+        # Load last rides for the first rows in one query so clicks are instant
+        with span("cars.prefetch_last_rides"):
+            self.last_rides.for_cars(car["id"] for car in cars[:self.PREFETCH_ROWS])
+    
+    @staticmethod
+    def _car_label(car) -> str:
+        """List text of a car."""
+        return f"{car['make']} {car['model']} - {car['license_plate']}"
+    
+    def _on_data_changed(self, table: str, operation: str, ids: list):
+        """Patch the affected rows after a write made anywhere in the application."""
+        if table == "cars":
+            if not ids:
+                self._refresh_cars()
+                return
+            patch_list_widget(self.cars_list, self.cache, "cars", operation, ids, self._car_label)
+        elif table not in ("bookings", "drivers"):
+            return
+        
+        if self._details_affected(table, operation, ids):
+            self._on_car_selected()
+    
+    def _details_affected(self, table: str, operation: str, ids: list) -> bool:
+        """Whether a reported write changes the selected car's details."""
+        current_item = self.cars_list.currentItem()
+        if current_item is None:
+            return False
+        car_id = current_item.data(Qt.ItemDataRole.UserRole)
+        if table == "cars":
+            return car_id in ids
+        if not ids:
+            return True
+        
+        if table == "drivers":
+            # Only the car's driver is shown; rides follow the bookings' car
+            car = self.cache.get("cars", car_id)
+            return car is not None and car["driver_id"] in ids
+        # Deleted and updated bookings can no longer tell us the car they
+        # had, so only new bookings are matched against the selection
+        if operation != "insert":
+            return True
+        return car_id in booking_owners(self.db, ids)[1]
     
     def _add_car(self):
         """Open dialog to register a new car."""
@@ -3,9 +3,14 @@ Customers window for the student taxi booking application.
 Shows a list of customers on the left and customer details on the right.
 """
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QLabel, QTextEdit
-from PyQt6.QtCore import QSize
+from typing import Optional
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QLabel, QTextEdit
+from PyQt6.QtCore import QSize, Qt
 from ..base_window import BaseWindow
+from ..instrumentation import span
+from ..database import Database
+from ..change_bus import ChangeBus, patch_list_widget
 
 
 class CustomersWindow(BaseWindow):
@@ -14,12 +19,25 @@ class CustomersWindow(BaseWindow):
     Shows list of customers on left and details on right when selected.
     """
     
-    def __init__(self, parent=None):
+    def __init__(
+        self,
+        parent=None,
+        db: Optional[Database] = None,
+        bus: Optional[ChangeBus] = None
+    ):
+        # Shared database connection and change bus (created here if not provided)
+        self.db = db if db is not None else Database()
+        self.bus = bus if bus is not None else ChangeBus(self.db)
+        self.cache = self.bus.cache
+        
         super().__init__(
             name="Customers",
             size=QSize(1000, 600),
             parent=parent
         )
+        
+        self._refresh_customers()
+        self.bus.changed.connect(self._on_data_changed, Qt.ConnectionType.QueuedConnection)
     
     def _setup_ui(self):
         """Setup the customers UI with list and details."""
@@ -68,22 +86,44 @@ class CustomersWindow(BaseWindow):
         """Handle customer selection change."""
         current_item = self.customers_list.currentItem()
         if current_item:
-            # TODO: Load customer details from database
-            customer_name = current_item.text()
+            customer = self.cache.get("customers", current_item.data(Qt.ItemDataRole.UserRole))
+            if customer is None:
+                return
+            
             self.customer_details.setPlainText(
-                f"Customer: {customer_name}\n\n"
-                "Details will be loaded from database.\n"
-                "Will include:\n"
-                "- Personal information\n"
-                "- Contact details\n"
-                "- Booking history\n"
-                "- Payment information"
+                f"Customer: {customer['name']}\n"
+                f"Phone: {customer['phone']}\n"
+                f"Email: {customer['email'] or '-'}\n"
+                f"Address: {customer['address'] or '-'}"
             )
     
     def _refresh_customers(self):
         """Refresh the customers list."""
-        # TODO: Implement database query to refresh customers
-        print("Refreshing customers...")
+        with span("customers.query"):
+            customers = self.cache.load_all("customers", order_by="name")
+        
+        with span("customers.populate", rows=len(customers)):
+            self.customers_list.clear()
+            for customer in customers:
+                item = QListWidgetItem(customer["name"])
+                item.setData(Qt.ItemDataRole.UserRole, customer["id"])
+                self.customers_list.addItem(item)
+    
+    def _on_data_changed(self, table: str, operation: str, ids: list):
+        """Patch the affected rows after a write made anywhere in the application."""
+        if table != "customers":
+            return
+        if not ids:
+            self._refresh_customers()
+            return
+        patch_list_widget(
+            self.customers_list, self.cache, "customers", operation, ids,
+            lambda customer: customer["name"]
+        )
+        
+        current_item = self.customers_list.currentItem()
+        if current_item is not None and current_item.data(Qt.ItemDataRole.UserRole) in ids:
+            self._on_customer_selected()
     
     def _add_customer(self):
         """Open dialog to add a new customer."""
@@ -3,9 +3,17 @@ Drivers window for the student taxi booking application.
 Shows a list of drivers and their associated cars.
 """
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QLabel, QTextEdit
-from PyQt6.QtCore import QSize
+from datetime import date, timedelta
+from typing import Optional
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QLabel, QTextEdit
+from PyQt6.QtCore import QSize, Qt
 from ..base_window import BaseWindow
+from ..instrumentation import span
+from ..database import Database
+from ..change_bus import ChangeBus, patch_list_widget, booking_owners
+from ..booking_stats import BookingStats, format_summary
+from ..read_models import LastRidesModel
 
 
 class DriversWindow(BaseWindow):
@@ -14,12 +22,33 @@ class DriversWindow(BaseWindow):
     Shows list of drivers and their associated cars.
     """
     
-    def __init__(self, parent=None):
+    # Number of recent rides shown in the details pane
+    LAST_RIDES = 5
+    # Number of listed entities whose last rides are loaded up front
+    PREFETCH_ROWS = 50
+    
+    def __init__(
+        self,
+        parent=None,
+        db: Optional[Database] = None,
+        bus: Optional[ChangeBus] = None
+    ):
+        # Shared database connection and change bus (created here if not provided)
+        self.db = db if db is not None else Database()
+        self.bus = bus if bus is not None else ChangeBus(self.db)
+        self.cache = self.bus.cache
+        self.stats = BookingStats(self.db)
+        self.last_rides = LastRidesModel(self.db, k=self.LAST_RIDES)
         super().__init__(
             name="Drivers",
             size=QSize(1000, 600),
             parent=parent
         )
+        
+        self._refresh_drivers()
+        # Queued so every database listener (e.g. the last rides cache) has
+        # seen the write before the window reads again
+        self.bus.changed.connect(self._on_data_changed, Qt.ConnectionType.QueuedConnection)
     
     def _setup_ui(self):
         """Setup the drivers UI with list and details."""
@@ -68,21 +97,76 @@ class DriversWindow(BaseWindow):
         """Handle driver selection change."""
         current_item = self.drivers_list.currentItem()
         if current_item:
-            # TODO: Load driver details from database
-            driver_name = current_item.text()
+            driver_id = current_item.data(Qt.ItemDataRole.UserRole)
+            driver = self.cache.get("drivers", driver_id)
+            if driver is None:
+                return
+            
+            # Statistics come from the daily summary table, not from bookings
+            with span("drivers.details", driver_id=driver_id):
+                week_start = (date.today() - timedelta(days=6)).isoformat()
+                all_time = self.stats.driver_summary(driver_id)
+                this_week = self.stats.driver_summary(driver_id, start_day=week_start)
+                rides = self.last_rides.for_drivers([driver_id])[driver_id]
+            rides_text = "\n".join(f"  {ride.display_text()}" for ride in rides) or "  None"
+            
             self.driver_details.setPlainText(
-                f"Driver: {driver_name}\n\n"
-                "Details will be loaded from database.\n"
-                "Will include:\n"
-                "- Driver information\n"
-                "- Associated cars\n"
-                "- Contact details"
+                f"Driver: {driver['name']}\n"
+                f"License: {driver['license_number']}\n"
+                f"Phone: {driver['phone']}\n"
+                f"Email: {driver['email'] or '-'}\n"
+                f"Car ID: {driver['car_id'] or '-'}\n\n"
+                f"Completed rides (last 7 days):\n{format_summary(this_week)}\n\n"
+                f"Completed rides (all time):\n{format_summary(all_time)}\n\n"
+                f"Last rides:\n{rides_text}"
             )
     
     def _refresh_drivers(self):
         """Refresh the drivers list."""
-        # TODO: Implement database query to refresh drivers
-        print("Refreshing drivers...")
+        with span("drivers.query"):
+            drivers = self.cache.load_all("drivers", order_by="name")
+        
+        with span("drivers.populate", rows=len(drivers)):
+            self.drivers_list.clear()
+            for driver in drivers:
+                item = QListWidgetItem(driver["name"])
+                item.setData(Qt.ItemDataRole.UserRole, driver["id"])
+                self.drivers_list.addItem(item)
+        
+        # Load last rides for the first rows in one query so clicks are instant
+        with span("drivers.prefetch_last_rides"):
+            self.last_rides.for_drivers(driver["id"] for driver in drivers[:self.PREFETCH_ROWS])
+    
+    def _on_data_changed(self, table: str, operation: str, ids: list):
+        """Patch the affected rows after a write made anywhere in the application."""
+        if table == "drivers":
+            if not ids:
+                self._refresh_drivers()
+                return
+            patch_list_widget(
+                self.drivers_list, self.cache, "drivers", operation, ids,
+                lambda driver: driver["name"]
+            )
+        elif table != "bookings":
+            # The details show no car data beyond the driver's car ID
+            return
+        
+        if self._details_affected(table, operation, ids):
+            self._on_driver_selected()
+    
+    def _details_affected(self, table: str, operation: str, ids: list) -> bool:
+        """Whether a reported write changes the selected driver's details."""
+        current_item = self.drivers_list.currentItem()
+        if current_item is None:
+            return False
+        driver_id = current_item.data(Qt.ItemDataRole.UserRole)
+        if table == "drivers":
+            return driver_id in ids
+        # Deleted and updated bookings can no longer tell us the driver they
+        # had, so only new bookings are matched against the selection
+        if not ids or operation != "insert":
+            return True
+        return driver_id in booking_owners(self.db, ids)[0]
     
     def _add_driver(self):
         """Open dialog to add a new driver."""
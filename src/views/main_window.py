@@ -6,6 +6,9 @@ Provides navigation between different windows.
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel
 from PyQt6.QtCore import QSize, Qt
 from ..base_window import BaseWindow
+from ..database import Database
+from ..row_cache import RowCache
+from ..change_bus import ChangeBus
 from .bookings_window import BookingsWindow
 from .drivers_window import DriversWindow
 from .customers_window import CustomersWindow
@@ -18,6 +21,11 @@ class MainWindow(BaseWindow):
     """
     
     def __init__(self, parent=None):
+        # Database connection, row cache and change bus shared by all child windows
+        self.db = Database()
+        self.cache = RowCache(self.db)
+        self.bus = ChangeBus(self.db, self.cache)
+        
         super().__init__(
             name="Student Taxi Booking - Main Menu",
             size=QSize(600, 400),
@@ -74,24 +82,24 @@ class MainWindow(BaseWindow):
     def _open_bookings(self):
         """Open the bookings window."""
         if self.bookings_window is None:
-            self.bookings_window = BookingsWindow()
+            self.bookings_window = BookingsWindow(db=self.db, bus=self.bus)
         self.bookings_window.show()
     
     def _open_drivers(self):
         """Open the drivers window."""
         if self.drivers_window is None:
-            self.drivers_window = DriversWindow()
+            self.drivers_window = DriversWindow(db=self.db, bus=self.bus)
         self.drivers_window.show()
     
     def _open_customers(self):
         """Open the customers window."""
         if self.customers_window is None:
-            self.customers_window = CustomersWindow()
+            self.customers_window = CustomersWindow(db=self.db, bus=self.bus)
         self.customers_window.show()
     
     def _open_cars(self):
         """Open the cars window."""
         if self.cars_window is None:
-            self.cars_window = CarsWindow()
+            self.cars_window = CarsWindow(db=self.db, bus=self.bus)
         self.cars_window.show()
 
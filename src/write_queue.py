@@ -0,0 +1,287 @@
+"""
+Write-behind queue for the student taxi booking application.
+
+A single writer thread owns its own database connection and drains a
+bounded queue of inserts and updates. Pending operations are grouped into
+one transaction (a "group commit") every few milliseconds or every N
+operations, so a burst of bookings costs a handful of commits instead of
+one commit per booking. Callers get a Future for each operation.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional, List, Dict, Any, Tuple
+
+from .database import Database
+
+
+# Durability mode -> PRAGMA synchronous setting (the database uses WAL).
+# "full": committed operations survive power loss.
+# "normal": committed operations survive an application crash; the last
+#           commits may be lost on power loss. Much faster than "full".
+# "off": leave syncing to the operating system. Only for bulk/test loads.
+DURABILITY_MODES = {
+    "full": "FULL",
+    "normal": "NORMAL",
+    "off": "OFF",
+}
+
+# Operation kinds placed on the queue
+_CREATE = "create"
+_UPDATE = "update"
+_FLUSH = "flush"
+_STOP = "stop"
+
+
+class WriteBehindQueue:
+    """
+    Group-commit writer for bookings (or any table).
+
+    Example:
+        with WriteBehindQueue() as writer:
+            future = writer.create("bookings", booking)
+            booking_id = future.result()
+    """
+
+    def __init__(
+        self,
+        db_name: str = "taxi_booking.db",
+        max_batch: int = 500,
+        flush_interval: float = 0.005,
+        max_pending: int = 10000,
+        durability: str = "normal"
+    ):
+        """
+        Start the writer thread.
+
+        Args:
+            db_name: Name of the database file
+            max_batch: Maximum number of operations per group commit
+            flush_interval: Seconds to wait for more operations before committing
+            max_pending: Queue capacity; submitting blocks when it is full
+            durability: One of DURABILITY_MODES
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+
+        self.db_name = db_name
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.durability = durability
+
+        # Counters for monitoring
+        self.commits = 0
+        self.operations = 0
+
+        self._queue: "queue.Queue[Tuple]" = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+        self._started.wait()
+        if self._start_error is not None:
+            raise self._start_error
+
+    def create(
+        self,
+        table: str,
+        data: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Future:
+        """
+        Queue an insert.
+
+        Args:
+            table: Table name
+            data: Dictionary of column names and values
+            timeout: Seconds to wait for queue space (None waits forever)
+
+        Returns:
+            Future resolving to the ID of the created record once committed
+
+        Raises:
+            queue.Full: If the queue stayed full for `timeout` seconds
+        """
+        return self._submit((_CREATE, table, dict(data)), timeout)
+
+    def update(
+        self,
+        table: str,
+        record_id: int,
+        data: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Future:
+        """
+        Queue an update. Updates to the same record within one group
+        commit are merged into a single statement.
+
+        Args:
+            table: Table name
+            record_id: ID of the record to update
+            data: Dictionary of column names and new values
+            timeout: Seconds to wait for queue space (None waits forever)
+
+        Returns:
+            Future resolving to True if a record was updated once committed
+
+        Raises:
+            queue.Full: If the queue stayed full for `timeout` seconds
+        """
+        return self._submit((_UPDATE, table, record_id, dict(data)), timeout)
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Block until every operation queued so far has been committed.
+
+        Args:
+            timeout: Maximum seconds to wait
+        """
+        self._submit((_FLUSH,), timeout).result(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Commit all pending operations and stop the writer thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread to finish
+        """
+        if self._closed:
+            return
+        self._submit((_STOP,), None)
+        self._closed = True
+        self._thread.join(timeout)
+
+    def pending(self) -> int:
+        """Approximate number of operations waiting in the queue."""
+        return self._queue.qsize()
+
+    def _submit(self, operation: Tuple, timeout: Optional[float]) -> Future:
+        """Put an operation on the queue and return its future."""
+        if self._closed:
+            raise RuntimeError("Write queue is closed")
+        future: Future = Future()
+        self._queue.put(operation + (future,), timeout=timeout)
+        return future
+
+    def _run(self):
+        """Writer thread: collect batches and group-commit them."""
+        try:
+            db = Database(self.db_name)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(f"PRAGMA synchronous={DURABILITY_MODES[self.durability]}")
+        except BaseException as e:
+            self._start_error = e
+            self._started.set()
+            return
+        self._started.set()
+
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.max_batch and batch[-1][0] not in (_FLUSH, _STOP):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                stopping = batch[-1][0] == _STOP
+                self._commit(db, batch)
+
+                # Drain whatever is left once asked to stop
+                if stopping:
+                    rest = []
+                    while not self._queue.empty():
+                        rest.append(self._queue.get_nowait())
+                    if rest:
+                        self._commit(db, rest)
+        finally:
+            db.close()
+
+    def _commit(self, db: Database, batch: List[Tuple]):
+        """Apply a batch in one transaction and resolve its futures."""
+        writes, barriers = self._coalesce(batch)
+
+        if writes:
+            try:
+                with db.transaction():
+                    results = [self._apply(db, write) for write in writes]
+                self.commits += 1
+            except Exception:
+                # A failed COMMIT can leave the transaction open; end it so
+                # the retries below start clean
+                if db.connection.in_transaction:
+                    db.connection.rollback()
+                # Retry one by one so a single bad row only fails its own future
+                results = []
+                for write in writes:
+                    try:
+                        with db.transaction():
+                            results.append(self._apply(db, write))
+                        self.commits += 1
+                    except Exception as e:
+                        results.append(e)
+            self.operations += sum(len(write[-1]) for write in writes)
+
+            for write, result in zip(writes, results):
+                for future in write[-1]:
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+        for future in barriers:
+            future.set_result(None)
+
+    @staticmethod
+    def _coalesce(batch: List[Tuple]) -> Tuple[List[Tuple], List[Future]]:
+        """
+        Merge updates to the same record and split off flush/stop barriers.
+
+        Returns:
+            (writes, barriers) where each write ends with its list of futures
+        """
+        writes: List[Tuple] = []
+        barriers: List[Future] = []
+        updates: Dict[Tuple[str, int], int] = {}
+
+        for operation in batch:
+            kind, future = operation[0], operation[-1]
+            if kind == _CREATE:
+                writes.append((_CREATE, operation[1], operation[2], [future]))
+            elif kind == _UPDATE:
+                key = (operation[1], operation[2])
+                if key in updates:
+                    merged = writes[updates[key]]
+                    merged[3].update(operation[3])
+                    merged[4].append(future)
+                else:
+                    updates[key] = len(writes)
+                    writes.append((_UPDATE, operation[1], operation[2], operation[3], [future]))
+            else:
+                barriers.append(future)
+
+        return writes, barriers
+
+    @staticmethod
+    def _apply(db: Database, write: Tuple) -> Any:
+        """Execute a single coalesced write."""
+        if write[0] == _CREATE:
+            return db.create(write[1], write[2])
+        return db.update(write[1], write[2], write[3])
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit (flushes pending operations)."""
+        self.close()
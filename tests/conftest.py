@@ -0,0 +1,64 @@
+"""
+Shared fixtures for the test suite.
+
+Tests run against in-memory databases carrying the full schema, so they
+need neither PyQt6 nor files in the working tree.
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pytest
+
+# Add parent directory to path to import src modules
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from src.database import Database
+from scripts.init_db import apply_schema
+
+
+@pytest.fixture
+def db() -> Database:
+    """Empty in-memory database with the current schema."""
+    database = Database(":memory:")
+    apply_schema(database)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def fleet(db: Database) -> Dict[str, int]:
+    """Two cars, a driver assigned to the first one and two customers."""
+    first_car = db.create("cars", {"make": "Toyota", "model": "Prius", "license_plate": "TAXI-1"})
+    second_car = db.create("cars", {"make": "Honda", "model": "Civic", "license_plate": "TAXI-2"})
+    driver = db.create("drivers", {
+        "name": "Dana", "license_number": "D-1", "phone": "416-555-0100", "car_id": first_car,
+    })
+    customer = db.create("customers", {"name": "Alex", "phone": "416-555-0123"})
+    other_customer = db.create("customers", {"name": "Sam", "phone": "647-555-0199"})
+    return {
+        "car": first_car, "other_car": second_car, "driver": driver,
+        "customer": customer, "other_customer": other_customer,
+    }
+
+
+@pytest.fixture
+def book(db: Database, fleet: Dict[str, int]) -> Callable[..., int]:
+    """Create a booking for the fleet's driver and customer; keyword arguments override fields."""
+    def create(**fields: Any) -> int:
+        booking = {
+            "driver_id": fleet["driver"],
+            "customer_id": fleet["customer"],
+            "pickup_location": "Main Campus",
+            "dropoff_location": "Union Station",
+            "booking_date": "2026-01-05 10:00:00",
+            "status": "completed",
+            "fare_amount": 12.5,
+            "distance_km": 4.0,
+            "rating": 5,
+        }
+        booking.update(fields)
+        return db.create("bookings", booking)
+    return create
@@ -0,0 +1,75 @@
+"""Trigger-maintained booking_daily_stats (src/booking_stats.py)."""
+
+from src.booking_stats import BOOKING_STATS_SELECT, BookingStats
+
+
+def stats_rows(db):
+    """Summary table contents, ordered."""
+    return [tuple(row) for row in db.execute(
+        "SELECT day, driver_id, car_id, status, rides, fare_total, distance_total, "
+        "rating_total, rating_count FROM booking_daily_stats WHERE rides > 0 ORDER BY 1, 2, 3, 4"
+    )]
+
+
+def recomputed_rows(db):
+    """What the summary table should hold, aggregated from bookings."""
+    select = BOOKING_STATS_SELECT.format(source="bookings")
+    return sorted(tuple(row) for row in db.execute(select))
+
+
+def test_triggers_match_full_aggregation(db, fleet, book):
+    first = book()
+    second = book(booking_date="2026-01-06 09:00:00", fare_amount=30.0, rating=None)
+    third = book(status="pending", fare_amount=None)
+    assert stats_rows(db) == recomputed_rows(db)
+
+    db.update("bookings", first, {"status": "cancelled", "fare_amount": 0.0})
+    db.update("bookings", second, {"booking_date": "2026-01-07 09:00:00", "rating": 3})
+    db.update("bookings", third, {"driver_id": fleet["driver"], "distance_km": 9.5})
+    assert stats_rows(db) == recomputed_rows(db)
+
+    db.delete("bookings", second)
+    assert stats_rows(db) == recomputed_rows(db)
+
+
+def test_rebuild_matches_triggers(db, book):
+    for day in range(1, 6):
+        book(booking_date=f"2026-02-0{day} 08:00:00", fare_amount=float(day))
+    maintained = stats_rows(db)
+    BookingStats(db).rebuild()
+    assert stats_rows(db) == maintained
+
+
+def test_summaries(db, fleet, book):
+    book(fare_amount=10.0, rating=4)
+    book(fare_amount=20.0, rating=None, booking_date="2026-01-06 10:00:00")
+    stats = BookingStats(db)
+
+    summary = stats.driver_summary(fleet["driver"])
+    assert summary["rides"] == 2
+    assert summary["revenue"] == 30.0
+    assert summary["average_rating"] == 4.0
+    assert stats.driver_summary(fleet["driver"], start_day="2026-01-06")["rides"] == 1
+    assert stats.car_summary(fleet["car"])["rides"] == 2
+
+
+def test_rides_stay_with_the_car_they_were_made_in(db, fleet, book):
+    book()
+    db.update("drivers", fleet["driver"], {"car_id": fleet["other_car"]})
+    book()
+
+    stats = BookingStats(db)
+    assert stats.car_summary(fleet["car"])["rides"] == 1
+    assert stats.car_summary(fleet["other_car"])["rides"] == 1
+    stats.rebuild()
+    assert stats.car_summary(fleet["car"])["rides"] == 1
+
+
+def test_unparseable_date_is_counted_under_empty_day(db, fleet, book):
+    booking_id = book(booking_date="next tuesday")
+    assert db.read_one("bookings", booking_id) is not None
+    assert stats_rows(db)[0][0] == ""
+    assert stats_rows(db) == recomputed_rows(db)
+
+    db.update("bookings", booking_id, {"booking_date": "2026-01-05 10:00:00"})
+    assert [row[0] for row in stats_rows(db)] == ["2026-01-05"]
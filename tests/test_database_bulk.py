@@ -0,0 +1,65 @@
+"""Bulk writes chunked under SQLite's variable limit (src/database.py)."""
+
+import sqlite3
+
+import pytest
+
+from src.database import MAX_VARIABLES, Database
+
+
+def test_id_chunks_fit_the_variable_limit():
+    ids = list(range(2 * MAX_VARIABLES + 5))
+    chunks = list(Database._id_chunks(ids, reserved=3))
+    assert all(len(chunk) <= MAX_VARIABLES - 3 for chunk in chunks)
+    assert [i for chunk in chunks for i in chunk] == ids
+    assert list(Database._id_chunks([])) == []
+
+
+def test_id_chunks_drop_duplicates_in_order():
+    assert list(Database._id_chunks([3, 1, 3, 2, 1])) == [[3, 1, 2]]
+
+
+def create_customers(db, count):
+    with db.transaction():
+        return [
+            db.create("customers", {"name": f"Customer {n}", "phone": f"555{n:04d}"})
+            for n in range(count)
+        ]
+
+
+def test_update_and_delete_many(db):
+    ids = create_customers(db, MAX_VARIABLES + 50)
+    changes = []
+    db.add_listener(lambda table, operation, ids: changes.append((table, operation, ids)))
+
+    assert db.update_many("customers", ids + ids[:10] + [10 ** 9], {"address": "Campus"}) == len(ids)
+    count = db.execute("SELECT COUNT(*) FROM customers WHERE address = 'Campus'").fetchone()[0]
+    assert count == len(ids)
+    assert changes == [("customers", "update", ids)]
+
+    changes.clear()
+    assert db.delete_many("customers", ids[:MAX_VARIABLES + 1]) == MAX_VARIABLES + 1
+    assert db.execute("SELECT COUNT(*) FROM customers").fetchone()[0] == 49
+    assert changes == [("customers", "delete", ids[:MAX_VARIABLES + 1])]
+
+
+def test_empty_bulk_calls_issue_no_queries(db):
+    changes = []
+    db.add_listener(lambda *change: changes.append(change))
+    with db.count_queries() as counter:
+        assert db.update_many("customers", [], {"address": "Campus"}) == 0
+        assert db.update_many("customers", [1], {}) == 0
+        assert db.delete_many("customers", []) == 0
+    assert counter.count == 0
+    assert changes == []
+
+
+def test_failed_bulk_write_rolls_back(db):
+    ids = create_customers(db, 3)
+    changes = []
+    db.add_listener(lambda *change: changes.append(change))
+    with pytest.raises(sqlite3.IntegrityError):
+        db.update_many("customers", ids, {"name": None})
+    names = [row[0] for row in db.execute("SELECT name FROM customers ORDER BY id")]
+    assert names == ["Customer 0", "Customer 1", "Customer 2"]
+    assert changes == []
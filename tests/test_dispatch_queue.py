@@ -0,0 +1,87 @@
+"""Lease-based dispatch queue (src/dispatch_queue.py)."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.dispatch_queue import DispatchQueue
+
+NOW = datetime(2026, 1, 5, 12, 0, 0)
+
+
+@pytest.fixture
+def pending(book):
+    """Three pending bookings, created out of date order."""
+    return [
+        book(status="pending", booking_date="2026-01-05 10:00:00"),
+        book(status="pending", booking_date="2026-01-05 09:00:00"),
+        book(status="pending", booking_date="2026-01-05 11:00:00"),
+    ]
+
+
+def test_claims_oldest_first_and_never_twice(db, pending, book):
+    book(status="confirmed", booking_date="2026-01-05 08:00:00")
+    first = DispatchQueue(db, worker_id="a", lease_seconds=30)
+    second = DispatchQueue(db, worker_id="b", lease_seconds=30)
+
+    claimed = first.claim(2, now=NOW)
+    assert [booking["id"] for booking in claimed] == [pending[1], pending[0]]
+    assert all(booking["claimed_by"] == "a" for booking in claimed)
+    assert [booking["id"] for booking in second.claim(5, now=NOW)] == [pending[2]]
+    assert second.claim(5, now=NOW) == []
+    assert first.depth(now=NOW) == 0
+
+
+def test_expired_lease_is_claimable_again(db, pending):
+    first = DispatchQueue(db, worker_id="a", lease_seconds=30)
+    second = DispatchQueue(db, worker_id="b", lease_seconds=30)
+    first.claim(1, now=NOW)
+
+    assert second.claim(3, now=NOW + timedelta(seconds=29)) != []
+    assert first.depth(now=NOW + timedelta(seconds=31)) == 1
+    retaken = second.claim(1, now=NOW + timedelta(seconds=31))
+    assert [booking["id"] for booking in retaken] == [pending[1]]
+
+    # The first worker lost the booking and cannot finish or renew it
+    assert not first.complete(pending[1])
+    assert first.extend([pending[1]], now=NOW + timedelta(seconds=31)) == 0
+    assert second.complete(pending[1], status="cancelled")
+    assert db.read_one("bookings", pending[1])["status"] == "cancelled"
+
+
+def test_extend_keeps_the_lease(db, pending):
+    queue = DispatchQueue(db, worker_id="a", lease_seconds=30)
+    other = DispatchQueue(db, worker_id="b", lease_seconds=30)
+    ids = [booking["id"] for booking in queue.claim(3, now=NOW)]
+
+    assert queue.extend(ids, now=NOW + timedelta(seconds=20)) == 3
+    assert other.claim(3, now=NOW + timedelta(seconds=45)) == []
+    # A lease that already ran out is not renewed
+    assert queue.extend(ids, now=NOW + timedelta(seconds=60)) == 0
+
+
+def test_release_and_complete(db, pending):
+    queue = DispatchQueue(db, worker_id="a")
+    other = DispatchQueue(db, worker_id="b")
+    ids = [booking["id"] for booking in queue.claim(3, now=NOW)]
+
+    assert other.release(ids) == 0
+    assert not other.complete(ids[0])
+    assert queue.release(ids[1:]) == 2
+    assert queue.depth(now=NOW) == 2
+
+    assert queue.complete(ids[0])
+    booking = db.read_one("bookings", ids[0])
+    assert (booking["status"], booking["claimed_by"], booking["lease_expires_at"]) == (
+        "confirmed", None, None
+    )
+    assert not queue.complete(ids[0])
+
+
+def test_claims_are_reported_to_listeners(db, pending):
+    changes = []
+    db.add_listener(lambda table, operation, ids: changes.append((table, operation, sorted(ids))))
+    queue = DispatchQueue(db, worker_id="a")
+    queue.claim(3, now=NOW)
+    queue.claim(3, now=NOW)
+    assert changes == [("bookings", "update", sorted(pending))]
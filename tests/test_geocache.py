@@ -0,0 +1,88 @@
+"""Negative caching of unknown locations (src/geocache.py)."""
+
+from src import geocache
+from src.geocache import GeoCache
+
+
+class CountingResolver:
+    """Resolver knowing a single location, counting its lookups."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, location):
+        self.calls += 1
+        return (43.68, -79.63) if location == "pearson airport" else None
+
+
+def age_entries(db, seconds):
+    db.execute(
+        "UPDATE geocode_cache SET updated_at = datetime(updated_at, ?)",
+        (f"-{seconds} seconds",)
+    )
+
+
+def test_unknown_location_is_cached_until_ttl(db):
+    resolver = CountingResolver()
+    cache = GeoCache(db, resolver=resolver, negative_ttl=3600)
+
+    assert cache.locate("Nowhere Lane") is None
+    assert cache.locate("  nowhere   lane ") is None
+    assert resolver.calls == 1
+    assert cache.memory_hits == 1
+
+    # A second process (empty memory) trusts the table while the entry is fresh
+    cache.clear_memory()
+    assert cache.locate("Nowhere Lane") is None
+    assert (resolver.calls, cache.table_hits) == (1, 1)
+
+    cache.clear_memory()
+    age_entries(db, 7200)
+    assert cache.locate("Nowhere Lane") is None
+    assert resolver.calls == 2
+
+
+def test_known_locations_do_not_expire(db):
+    resolver = CountingResolver()
+    cache = GeoCache(db, resolver=resolver, negative_ttl=60)
+    assert cache.locate("Pearson Airport") == (43.68, -79.63)
+
+    cache.clear_memory()
+    age_entries(db, 10 ** 6)
+    assert cache.locate("Pearson Airport") == (43.68, -79.63)
+    assert resolver.calls == 1
+
+
+def test_in_memory_unknown_entry_expires(db, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(geocache.time, "time", lambda: clock[0])
+    resolver = CountingResolver()
+    cache = GeoCache(db, resolver=resolver, negative_ttl=60)
+
+    assert cache.locate("Nowhere Lane") is None
+    clock[0] += 30
+    assert cache.locate("Nowhere Lane") is None
+    assert resolver.calls == 1
+
+    # Past the TTL in memory and in the table: resolved again
+    clock[0] += 60
+    age_entries(db, 90)
+    assert cache.locate("Nowhere Lane") is None
+    assert resolver.calls == 2
+
+
+def test_memory_expiry_counts_from_the_table_entry(db, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(geocache.time, "time", lambda: clock[0])
+    resolver = CountingResolver()
+    cache = GeoCache(db, resolver=resolver, negative_ttl=60)
+    cache.locate("Nowhere Lane")
+    cache.clear_memory()
+
+    # Loaded from a 50 second old row: only 10 seconds are left in memory
+    age_entries(db, 50)
+    cache.locate("Nowhere Lane")
+    clock[0] += 15
+    age_entries(db, 15)
+    cache.locate("Nowhere Lane")
+    assert resolver.calls == 2
@@ -0,0 +1,125 @@
+"""Resumable bulk import (scripts/import.py)."""
+
+import importlib
+import json
+import os
+import shutil
+
+import pytest
+
+from src.database import Database
+from scripts.init_db import ensure_schema
+
+importer = importlib.import_module("scripts.import")
+
+
+def write_bookings(path, count, fare=10.0):
+    """Write count bookings for driver 1 and customer 1 as JSON lines."""
+    with open(path, "w") as out:
+        for index in range(count):
+            out.write(json.dumps({
+                "driver_id": 1,
+                "customer_id": 1,
+                "pickup_location": f"Stop {index}",
+                "dropoff_location": "Union Station",
+                "booking_date": "2026-01-05 10:00:00",
+                "status": "completed",
+                "fare_amount": fare,
+            }) + "\n")
+
+
+@pytest.fixture
+def db_name(tmp_path):
+    """Database file with the schema, a car, a driver and a customer."""
+    name = str(tmp_path / "taxi.db")
+    ensure_schema(name)
+    with Database(name) as db:
+        car = db.create("cars", {"make": "Toyota", "model": "Prius", "license_plate": "TAXI-1"})
+        db.create("drivers", {"name": "Dana", "license_number": "D-1", "phone": "555", "car_id": car})
+        db.create("customers", {"name": "Alex", "phone": "416-555-0123"})
+    return name
+
+
+def booking_count(db_name):
+    with Database(db_name) as db:
+        return db.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+
+def interrupt_after(db_name, rows_done):
+    """Leave the database as an import killed after rows_done rows would."""
+    with Database(db_name) as db:
+        db.execute("DELETE FROM bookings WHERE id > ?", (rows_done,))
+        db.execute("UPDATE import_checkpoints SET rows_done = ?, completed = 0", (rows_done,))
+
+
+def test_interrupted_import_resumes(tmp_path, db_name):
+    source = tmp_path / "bookings.jsonl"
+    write_bookings(source, 25)
+    importer.import_bookings(str(source), db_name=db_name, chunk_size=10)
+    interrupt_after(db_name, 10)
+
+    result = importer.import_bookings(str(source), db_name=db_name, chunk_size=10)
+    assert result["skipped"] == 10
+    assert result["rows"] == 15
+    assert booking_count(db_name) == 25
+
+
+def test_completed_file_is_not_imported_again(tmp_path, db_name):
+    source = tmp_path / "bookings.jsonl"
+    write_bookings(source, 12)
+    assert importer.import_bookings(str(source), db_name=db_name)["rows"] == 12
+
+    result = importer.import_bookings(str(source), db_name=db_name)
+    assert result == {"rows": 0, "skipped": 12, "seconds": 0.0, "rows_per_second": 0.0}
+    assert importer.import_bookings(str(source), db_name=db_name, restart=True)["rows"] == 12
+    assert booking_count(db_name) == 24
+
+
+def test_checkpoint_follows_copied_and_touched_files(tmp_path, db_name):
+    source = tmp_path / "bookings.jsonl"
+    write_bookings(source, 30)
+    importer.import_bookings(str(source), db_name=db_name, chunk_size=10)
+    interrupt_after(db_name, 20)
+
+    copy = tmp_path / "copy.jsonl"
+    shutil.copy(source, copy)
+    os.utime(copy, (0, 0))
+    result = importer.import_bookings(str(copy), db_name=db_name, chunk_size=10)
+    assert result["skipped"] == 20
+    assert booking_count(db_name) == 30
+
+    # Both paths now map to a completed import of the same contents
+    assert importer.import_bookings(str(source), db_name=db_name)["rows"] == 0
+    assert booking_count(db_name) == 30
+
+
+def test_changed_contents_start_over(tmp_path, db_name):
+    source = tmp_path / "bookings.jsonl"
+    write_bookings(source, 5)
+    importer.import_bookings(str(source), db_name=db_name)
+
+    write_bookings(source, 5, fare=20.0)
+    result = importer.import_bookings(str(source), db_name=db_name)
+    assert result["skipped"] == 0
+    assert result["rows"] == 5
+
+
+def test_fingerprint_ignores_path_and_mtime(tmp_path):
+    source = tmp_path / "a.jsonl"
+    write_bookings(source, 3)
+    copy = tmp_path / "b.jsonl"
+    shutil.copy(source, copy)
+    os.utime(copy, (1, 1))
+    assert importer.file_fingerprint(source) == importer.file_fingerprint(copy)
+
+    write_bookings(copy, 3, fare=99.0)
+    assert importer.file_fingerprint(source) != importer.file_fingerprint(copy)
+
+
+def test_fingerprint_covers_both_ends_of_large_files(tmp_path):
+    head = b"x" * importer.FINGERPRINT_BYTES
+    first = tmp_path / "first.bin"
+    second = tmp_path / "second.bin"
+    first.write_bytes(head * 3 + b"a")
+    second.write_bytes(head * 3 + b"b")
+    assert importer.file_fingerprint(first) != importer.file_fingerprint(second)
@@ -0,0 +1,86 @@
+"""Phone normalization and duplicate customers (src/phone_lookup.py)."""
+
+import random
+
+import pytest
+
+from src.database import MAX_VARIABLES
+from src.phone_lookup import (
+    PHONE_SAMPLES, find_customers_by_phone, find_duplicate_customers,
+    merge_customers, normalize_phone, phone_sql_mismatches
+)
+
+
+@pytest.mark.parametrize("phone, expected", [
+    ("416-555-0123", "+14165550123"),
+    ("(416) 555.0123", "+14165550123"),
+    ("+1 416 555 0123", "+14165550123"),
+    ("0044 20 7946 0958", "+442079460958"),
+    (" +44/20/7946/0958 ", "+442079460958"),
+    ("5550123", "5550123"),
+    ("14165550123", "14165550123"),
+    ("()", None),
+    ("", None),
+    (None, None),
+])
+def test_normalize_phone(phone, expected):
+    assert normalize_phone(phone) == expected
+
+
+def test_sql_matches_python_on_samples(db):
+    assert phone_sql_mismatches(db) == []
+    assert phone_sql_mismatches(db, PHONE_SAMPLES * 2) == []
+
+
+def test_sql_matches_python_on_generated_numbers(db):
+    rng = random.Random(3)
+    alphabet = "0123456789 -().+/\t\r\nx"
+    phones = [
+        "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 16)))
+        for _ in range(MAX_VARIABLES + 500)
+    ]
+    assert phone_sql_mismatches(db, phones) == []
+
+
+def test_trigger_stores_normalized_phone(db, fleet):
+    db.update("customers", fleet["customer"], {"phone": " (905) 555-0111 "})
+    assert db.read_one("customers", fleet["customer"])["phone_normalized"] == "+19055550111"
+    assert [c["id"] for c in find_customers_by_phone(db, "905.555.0111")] == [fleet["customer"]]
+    assert find_customers_by_phone(db, "()") == []
+
+
+def test_merge_moves_bookings_and_notifies(db, fleet, book):
+    keep, duplicate = fleet["customer"], fleet["other_customer"]
+    db.update("customers", duplicate, {"phone": "+1 416 555 0123"})
+    assert find_duplicate_customers(db) == [[keep, duplicate]]
+    booking_id = book(customer_id=duplicate)
+    db.execute(
+        "INSERT INTO booking_customers (booking_id, customer_id) VALUES (?, ?), (?, ?)",
+        (booking_id, keep, booking_id, duplicate)
+    )
+
+    changes = []
+    db.add_listener(lambda table, operation, ids: changes.append((table, operation, ids)))
+    assert merge_customers(db, keep, [duplicate, keep]) == 1
+
+    assert db.read_one("customers", duplicate) is None
+    assert db.read_one("bookings", booking_id)["customer_id"] == keep
+    links = db.execute("SELECT customer_id FROM booking_customers").fetchall()
+    assert [row[0] for row in links] == [keep]
+    assert ("bookings", "update", [booking_id]) in changes
+    assert ("customers", "delete", [duplicate]) in changes
+    assert find_duplicate_customers(db) == []
+
+
+def test_merge_more_duplicates_than_fit_in_one_statement(db, fleet, book):
+    keep = fleet["customer"]
+    with db.transaction():
+        duplicates = [
+            db.create("customers", {"name": f"Alex {n}", "phone": "4165550123"})
+            for n in range(MAX_VARIABLES + 10)
+        ]
+    booking_id = book(customer_id=duplicates[-1])
+
+    assert merge_customers(db, keep, duplicates) == len(duplicates)
+    assert db.execute("SELECT COUNT(*) FROM customers").fetchone()[0] == 2
+    assert db.read_one("bookings", booking_id)["customer_id"] == keep
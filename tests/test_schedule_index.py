@@ -0,0 +1,110 @@
+"""Interval tree and driver schedule index (src/schedule_index.py)."""
+
+import random
+from datetime import datetime
+
+from src.schedule_index import DriverScheduleIndex, IntervalTree, Proposal
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(7)
+    tree = IntervalTree()
+    intervals = {}
+    for key in range(500):
+        start = rng.randrange(0, 10_000)
+        intervals[key] = (start, start + rng.randrange(1, 300))
+        tree.insert(*intervals[key], key)
+    for key in rng.sample(sorted(intervals), 200):
+        assert tree.remove(key)
+        del intervals[key]
+    assert not tree.remove(-1)
+    assert len(tree) == len(intervals)
+
+    for _ in range(300):
+        begin = rng.randrange(0, 10_000)
+        end = begin + rng.randrange(1, 500)
+        expected = sorted(
+            key for key, (start, stop) in intervals.items()
+            if start < end and begin < stop
+        )
+        assert sorted(key for _, _, key in tree.overlapping(begin, end)) == expected
+
+
+def test_interval_tree_touching_intervals_do_not_overlap():
+    tree = IntervalTree()
+    tree.insert(100, 200, 1)
+    assert tree.overlapping(200, 300) == []
+    assert tree.overlapping(0, 100) == []
+    assert [key for _, _, key in tree.overlapping(199, 201)] == [1]
+
+
+def test_conflicts_and_free_slots(db, fleet, book):
+    driver = fleet["driver"]
+    morning = book(booking_date="2026-01-05 09:00:00", duration_minutes=60)
+    book(booking_date="2026-01-05 11:00:00", duration_minutes=30, status="cancelled")
+    index = DriverScheduleIndex(db)
+
+    assert index.conflicts(driver, "2026-01-05 09:30:00") == [morning]
+    assert index.conflicts(driver, "2026-01-05 09:30:00", exclude_booking_id=morning) == []
+    assert index.is_free(driver, "2026-01-05 10:00:00")
+    # Cancelled bookings do not occupy the driver
+    assert index.is_free(driver, "2026-01-05 11:00:00")
+    assert index.free_slots(driver, "2026-01-05 08:00:00", "2026-01-05 12:00:00") == [
+        (datetime(2026, 1, 5, 8), datetime(2026, 1, 5, 9)),
+        (datetime(2026, 1, 5, 10), datetime(2026, 1, 5, 12)),
+    ]
+    assert index.free_slots(
+        driver, "2026-01-05 08:00:00", "2026-01-05 12:00:00", min_minutes=90
+    ) == [(datetime(2026, 1, 5, 10), datetime(2026, 1, 5, 12))]
+
+
+def test_validate_assignments(db, fleet, book):
+    driver = fleet["driver"]
+    existing = book(booking_date="2026-01-05 09:00:00", duration_minutes=60)
+    index = DriverScheduleIndex(db)
+
+    conflicts = index.validate_assignments([
+        Proposal(driver, "2026-01-05 09:30:00"),
+        Proposal(driver, "2026-01-05 12:00:00", 60),
+        Proposal(driver, "2026-01-05 12:30:00"),
+        Proposal(driver, "2026-01-05 09:00:00", 60, existing),
+    ])
+    assert [(c.index, c.booking_ids, c.proposal_indexes) for c in conflicts] == [
+        (0, (existing,), (3,)),
+        (1, (), (2,)),
+        (2, (), (1,)),
+        (3, (), (0,)),
+    ]
+
+
+def test_index_follows_writes(db, fleet, book):
+    driver = fleet["driver"]
+    index = DriverScheduleIndex(db)
+    booking_id = book(booking_date="2026-01-05 09:00:00")
+    assert index.conflicts(driver, "2026-01-05 09:00:00") == [booking_id]
+
+    db.update("bookings", booking_id, {"booking_date": "2026-01-05 15:00:00"})
+    assert index.is_free(driver, "2026-01-05 09:00:00")
+    assert index.conflicts(driver, "2026-01-05 15:00:00") == [booking_id]
+
+    db.update("bookings", booking_id, {"status": "cancelled"})
+    assert index.is_free(driver, "2026-01-05 15:00:00")
+    db.update("bookings", booking_id, {"status": "pending"})
+    db.delete("bookings", booking_id)
+    assert index.is_free(driver, "2026-01-05 15:00:00")
+
+
+def test_unknown_writes_rebuild_the_index(db, fleet, book):
+    driver = fleet["driver"]
+    index = DriverScheduleIndex(db)
+    booking_id = book(booking_date="2026-01-05 09:00:00")
+
+    db.execute("UPDATE bookings SET booking_date = '2026-01-05 17:00:00'")
+    db.notify_changed("bookings", "update", [])
+    assert index.is_free(driver, "2026-01-05 09:00:00")
+    assert index.conflicts(driver, "2026-01-05 17:00:00") == [booking_id]
+
+    index.close()
+    db.execute("DELETE FROM bookings")
+    db.notify_changed("bookings", "delete", [])
+    assert index.conflicts(driver, "2026-01-05 17:00:00") == [booking_id]
@@ -0,0 +1,119 @@
+"""Schema checksum and upgrades of existing databases (scripts/init_db.py)."""
+
+from src.database import Database
+from scripts.init_db import (
+    ADDED_COLUMNS, SCHEMA_CHECKSUM, apply_schema, ensure_schema, schema_is_current
+)
+
+
+# Tables as created by the first release, before any ADDED_COLUMNS
+BASELINE_SCHEMA_SQL = """
+CREATE TABLE customers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    email TEXT,
+    address TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE drivers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    license_number TEXT NOT NULL UNIQUE,
+    phone TEXT NOT NULL,
+    email TEXT,
+    car_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE cars (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    make TEXT NOT NULL,
+    model TEXT NOT NULL,
+    year INTEGER,
+    license_plate TEXT NOT NULL UNIQUE,
+    color TEXT,
+    driver_id INTEGER,
+    average_rating REAL DEFAULT 0.0,
+    total_rides INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    driver_id INTEGER NOT NULL,
+    customer_id INTEGER NOT NULL,
+    pickup_location TEXT NOT NULL,
+    dropoff_location TEXT NOT NULL,
+    pickup_latitude REAL,
+    pickup_longitude REAL,
+    dropoff_latitude REAL,
+    dropoff_longitude REAL,
+    booking_date TIMESTAMP NOT NULL,
+    status TEXT DEFAULT 'pending',
+    fare_amount REAL,
+    distance_km REAL,
+    duration_minutes INTEGER,
+    rating INTEGER,
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE booking_customers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    booking_id INTEGER NOT NULL,
+    customer_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(booking_id, customer_id)
+);
+INSERT INTO cars (make, model, license_plate) VALUES ('Toyota', 'Prius', 'TAXI-1');
+INSERT INTO drivers (name, license_number, phone, car_id) VALUES ('Dana', 'D-1', '555', 1);
+INSERT INTO customers (name, phone) VALUES ('Alex', '(416) 555-0123');
+INSERT INTO bookings (driver_id, customer_id, pickup_location, dropoff_location, booking_date, status, fare_amount)
+VALUES (1, 1, 'A', 'B', '2026-01-05 10:00:00', 'completed', 20.0),
+       (1, 1, 'B', 'A', '2026-01-05 18:00:00', 'completed', 15.0);
+"""
+
+
+def test_fresh_database_stores_checksum():
+    db = Database(":memory:")
+    assert not schema_is_current(db)
+    assert apply_schema(db)
+    assert db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_CHECKSUM
+    assert schema_is_current(db)
+    assert not apply_schema(db)
+
+
+def test_changed_checksum_reapplies_without_losing_rows(db, book):
+    booking_id = book()
+    db.execute("PRAGMA user_version = 1")
+    assert apply_schema(db)
+    assert db.read_one("bookings", booking_id) is not None
+    rides = db.execute("SELECT SUM(rides) FROM booking_daily_stats").fetchone()[0]
+    assert rides == 1
+
+
+def test_baseline_database_is_upgraded():
+    db = Database(":memory:")
+    db.executescript(BASELINE_SCHEMA_SQL)
+    assert apply_schema(db)
+
+    for table, column, _ in ADDED_COLUMNS:
+        assert column in db.table_columns(table)
+    customer = db.read_one("customers", 1)
+    assert customer["phone_normalized"] == "+14165550123"
+    # Existing bookings take their driver's car and are counted in the summary
+    assert {row["car_id"] for row in db.read_all("bookings")} == {1}
+    row = db.execute(
+        "SELECT day, driver_id, car_id, rides, fare_total FROM booking_daily_stats"
+    ).fetchone()
+    assert tuple(row) == ("2026-01-05", 1, 1, 2, 35.0)
+
+
+def test_ensure_schema_on_file(tmp_path):
+    path = tmp_path / "taxi.db"
+    assert ensure_schema(str(path))
+    assert not ensure_schema(str(path))
+    with Database(str(path)) as db:
+        assert schema_is_current(db)
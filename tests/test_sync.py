@@ -0,0 +1,147 @@
+"""Replication between stations through the central service (src/sync.py)."""
+
+import threading
+import time
+
+import pytest
+
+from src.database import Database
+from src.dispatch_queue import DispatchQueue
+from src.sync import SyncClient, reserve_id_block
+from scripts.init_db import apply_schema
+from scripts.sync_server import create_server
+
+
+@pytest.fixture
+def server_url(tmp_path):
+    """URL of a sync server running on a background thread."""
+    ready = threading.Event()
+    servers = []
+
+    def serve():
+        # The central database must be used on the serving thread
+        central = Database(str(tmp_path / "central.db"))
+        servers.append(create_server(central, port=0, quiet=True))
+        ready.set()
+        servers[0].serve_forever()
+        central.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    ready.wait()
+    yield f"http://127.0.0.1:{servers[0].server_address[1]}"
+    servers[0].shutdown()
+    thread.join()
+    servers[0].server_close()
+
+
+def make_station(tmp_path, number):
+    db = Database(str(tmp_path / f"station{number}.db"))
+    apply_schema(db)
+    reserve_id_block(db, number)
+    return db
+
+
+@pytest.fixture
+def stations(tmp_path, server_url):
+    """Two station databases and their sync clients."""
+    first = make_station(tmp_path, 1)
+    second = make_station(tmp_path, 2)
+    yield (first, SyncClient(first, server_url)), (second, SyncClient(second, server_url))
+    first.close()
+    second.close()
+
+
+def seed(db, count):
+    """A car, driver and customer with count bookings; returns the booking IDs."""
+    car = db.create("cars", {"make": "Toyota", "model": "Prius", "license_plate": "TAXI-1"})
+    driver = db.create("drivers", {"name": "Dana", "license_number": "D-1", "phone": "555", "car_id": car})
+    customer = db.create("customers", {"name": "Alex", "phone": "416-555-0123"})
+    return [
+        db.create("bookings", {
+            "driver_id": driver, "customer_id": customer,
+            "pickup_location": "Main Campus", "dropoff_location": "Union Station",
+            "booking_date": "2026-01-05 10:00:00", "fare_amount": 10.0,
+        })
+        for _ in range(count)
+    ]
+
+
+def count(db, table):
+    return db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_rows_replicate_with_station_ids(stations):
+    (first, first_client), (second, second_client) = stations
+    booking_ids = seed(first, 20)
+    assert all(booking_id > 1_000_000 for booking_id in booking_ids)
+
+    assert first_client.sync().pushed == 23
+    stats = second_client.sync()
+    assert (stats.pulled, stats.applied, stats.skipped) == (23, 23, 0)
+    assert count(second, "bookings") == 20
+    customer_id = second.read_one("bookings", booking_ids[0])["customer_id"]
+    assert second.read_one("customers", customer_id)["phone_normalized"] == "+14165550123"
+    # Applied remote changes are not logged to be pushed back
+    assert second_client.pending() == 0
+    stats_sql = "SELECT SUM(rides), SUM(fare_total) FROM booking_daily_stats"
+    assert tuple(second.execute(stats_sql).fetchone()) == (20, 200.0)
+
+    customer = second.create("customers", {"name": "Sam", "phone": "647-555-0199"})
+    second.delete("bookings", booking_ids[0])
+    second_client.sync()
+    first_client.sync()
+    assert first.read_one("customers", customer)["name"] == "Sam"
+    assert first.read_one("bookings", booking_ids[0]) is None
+
+
+def test_one_changelog_entry_per_update(stations):
+    (first, first_client), _ = stations
+    booking_id = seed(first, 1)[0]
+    first_client.sync()
+    assert first_client.pending() == 0
+
+    # The updated_at touch trigger does not log a second entry
+    for status in ("confirmed", "in_progress", "completed"):
+        first.update("bookings", booking_id, {"status": status})
+    assert first_client.pending() == 3
+    # A row changed several times is sent once
+    assert first_client.sync().pushed == 1
+    assert first_client.pending() == 0
+
+
+def test_claims_are_not_replicated(stations):
+    (first, first_client), (second, second_client) = stations
+    booking_id = seed(first, 1)[0]
+    first_client.sync()
+    second_client.sync()
+
+    DispatchQueue(first, worker_id="a").claim(1)
+    assert first_client.pending() == 0
+    assert first.read_one("bookings", booking_id)["claimed_by"] == "a"
+    first.update("bookings", booking_id, {"notes": "Gate 4"})
+    first_client.sync()
+    second_client.sync()
+
+    booking = second.read_one("bookings", booking_id)
+    assert booking["notes"] == "Gate 4"
+    assert (booking["claimed_by"], booking["lease_expires_at"]) == (None, None)
+
+
+def test_later_edit_wins(stations):
+    (first, first_client), (second, second_client) = stations
+    booking_id = seed(first, 1)[0]
+    first_client.sync()
+    second_client.sync()
+
+    first.update("bookings", booking_id, {"notes": "from first"})
+    time.sleep(0.01)
+    second.update("bookings", booking_id, {"notes": "from second"})
+
+    second_client.sync()
+    stats = first_client.sync()
+    assert stats.applied == 1
+    # The service keeps the later edit and drops the earlier one
+    assert second_client.sync().pulled == 0
+    assert first.read_one("bookings", booking_id)["notes"] == "from second"
+    assert second.read_one("bookings", booking_id)["notes"] == "from second"